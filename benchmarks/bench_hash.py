@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark how long :py:func:`~weblayer.utils.generate_hash` takes to hash
+  static files of different sizes, comparing the previous ``512`` byte block
+  reads with the default ``65536`` byte block reads and with hashing a memory
+  mapped file in one go, for each of a few ``hashlib`` algorithms.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_hash.py
+  
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from weblayer.utils import generate_hash
+
+SIZES = (1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024)
+ALGORITHMS = ('sha512', 'sha1', 'md5')
+
+def read_blocks_512(file_path, algorithm):
+    sock = open(file_path, 'rb')
+    try:
+        return generate_hash(s=sock, algorithm=algorithm, block_size=512)
+    finally:
+        sock.close()
+    
+
+def read_blocks_65536(file_path, algorithm):
+    sock = open(file_path, 'rb')
+    try:
+        return generate_hash(s=sock, algorithm=algorithm)
+    finally:
+        sock.close()
+    
+
+def memory_map(file_path, algorithm):
+    sock = open(file_path, 'rb')
+    try:
+        mapped = mmap.mmap(sock.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            hasher = getattr(hashlib, algorithm)()
+            hasher.update(mapped)
+            return hasher.hexdigest()
+        finally:
+            mapped.close()
+    finally:
+        sock.close()
+    
+
+STRATEGIES = [
+    ('512 blocks', read_blocks_512),
+    ('65536 blocks', read_blocks_65536),
+    ('mmap', memory_map)
+]
+
+def make_corpus(directory):
+    """ Write a file of each size in ``SIZES`` to ``directory`` and return
+      a list of ``(size, file_path)``.
+    """
+    
+    corpus = []
+    for size in SIZES:
+        file_path = os.path.join(directory, '%d.js' % size)
+        sock = open(file_path, 'wb')
+        sock.write(os.urandom(size))
+        sock.close()
+        corpus.append((size, file_path))
+    return corpus
+    
+
+def time_hash(f, file_path, algorithm, number):
+    """ Return the mean time in milliseconds to hash ``file_path``.
+    """
+    
+    timer = timeit.Timer(lambda: f(file_path, algorithm))
+    return min(timer.repeat(3, number)) / number * 1000
+    
+
+def main(number=20):
+    directory = tempfile.mkdtemp()
+    try:
+        corpus = make_corpus(directory)
+        row = u'%-8s %-14s %10s %12s'
+        print row % (u'alg', u'strategy', u'bytes', u'time')
+        for algorithm in ALGORITHMS:
+            for size, file_path in corpus:
+                for name, f in STRATEGIES:
+                    print row % (
+                        algorithm,
+                        name,
+                        size,
+                        u'%.3fms' % time_hash(f, file_path, algorithm, number)
+                    )
+    finally:
+        shutil.rmtree(directory)
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
+
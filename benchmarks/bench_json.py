@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark the throughput of each installed JSON backend, so that
+  ``settings['json_backend']`` can be chosen with data.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_json.py
+  
+"""
+
+import sys
+import timeit
+
+from weblayer.utils import available_json_backends, get_json_backend
+
+def make_payloads():
+    """ Return a list of ``(name, value)`` payloads that look like typical
+      api responses.
+    """
+    
+    record = {
+        'id': 12345,
+        'name': u'Jos\xe9 Mar\xeda',
+        'email': 'jose@example.com',
+        'active': True,
+        'score': 98.6,
+        'tags': ['a', 'b', 'c'],
+        'parent': None
+    }
+    return [
+        ('small', {'status': 'ok', 'id': 1}),
+        ('record', record),
+        ('records', [dict(record, id=i) for i in range(1000)]),
+        ('unicode', {'text': u'腾讯首页 ' * 500})
+    ]
+    
+
+def time_call(f, number):
+    """ Return the best number of calls to ``f`` per second.
+    """
+    
+    timer = timeit.Timer(f)
+    return number / min(timer.repeat(3, number))
+    
+
+def main(number=200):
+    row = u'%-12s %-10s %14s %14s'
+    print row % (u'backend', u'payload', u'encode/s', u'decode/s')
+    payloads = make_payloads()
+    for name in ['auto'] + available_json_backends():
+        dumps, loads = get_json_backend(name)
+        for payload_name, value in payloads:
+            try:
+                encoded = dumps(value, ensure_ascii=False)
+                loads(encoded)
+            except Exception, err:
+                print row % (name, payload_name, u'error', err.__class__.__name__)
+                continue
+            print row % (
+                name,
+                payload_name,
+                u'%.0f' % time_call(
+                    lambda: dumps(value, ensure_ascii=False),
+                    number
+                ),
+                u'%.0f' % time_call(lambda: loads(encoded), number)
+            )
+        
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
+
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark the memory the bundled adapters use per request, comparing
+  their ``__slots__`` layouts with equivalent ``__dict__`` layouts, and count
+  the objects the garbage collector has to track per request.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_memory.py
+  
+"""
+
+import gc
+import sys
+
+from mock import Mock
+
+from weblayer import Bootstrapper, RequestHandler
+from weblayer.auth import TrivialAuthenticationManager
+from weblayer.cookie import SignedSecureCookieWrapper
+from weblayer.method import ExposedMethodSelector
+from weblayer.normalise import DefaultToJSONResponseNormaliser
+from weblayer.static import MemoryCachedStaticURLGenerator
+from weblayer.template import MakoTemplateRenderer
+from weblayer.wsgi import WSGIApplication
+
+class Hello(RequestHandler):
+    def get(self, world):
+        return u'hello %s' % world
+        
+    
+
+mapping = [(r'/(.*)', Hello)]
+
+config = {
+    'cookie_secret': '...',
+    'static_files_path': '/var/www/static',
+    'template_directories': ['templates']
+}
+
+def make_adapters(settings):
+    """ Return a list of ``(adapter_class, args)``.
+    """
+    
+    request = Mock()
+    request.host_url = 'http://foo.com'
+    response = Mock()
+    return [
+        (TrivialAuthenticationManager, (request,)),
+        (SignedSecureCookieWrapper, (request, response, settings)),
+        (ExposedMethodSelector, (Hello(request, response, settings),)),
+        (DefaultToJSONResponseNormaliser, (response,)),
+        (MemoryCachedStaticURLGenerator, (request, settings)),
+        (MakoTemplateRenderer, (settings,))
+    ]
+    
+
+def instance_size(instance):
+    """ Return the size in bytes of ``instance`` and its ``__dict__``.
+    """
+    
+    size = sys.getsizeof(instance)
+    if hasattr(instance, '__dict__'):
+        size += sys.getsizeof(instance.__dict__)
+    return size
+    
+
+def objects_per_request(application, number):
+    """ Return the mean number of objects each request leaves for the cyclic
+      garbage collector to clean up.
+    """
+    
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': '/world',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http'
+    }
+    start_response = lambda status, headers, exc_info=None: None
+    application(dict(environ), start_response)
+    gc.collect()
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        for i in xrange(number):
+            application(dict(environ), start_response)
+        after = len(gc.get_objects())
+    finally:
+        gc.enable()
+    return float(after - before) / number
+    
+
+def main(number=1000):
+    settings, path_router = Bootstrapper(settings=config, url_mapping=mapping)()
+    row = u'%-34s %8s %8s'
+    print row % (u'adapter', u'slots', u'dict')
+    total_slots = total_dict = 0
+    for adapter_class, args in make_adapters(settings):
+        dict_class = type(adapter_class.__name__, (adapter_class,), {})
+        slots = instance_size(adapter_class(*args))
+        dict_ = instance_size(dict_class(*args))
+        total_slots += slots
+        total_dict += dict_
+        print row % (adapter_class.__name__, u'%dB' % slots, u'%dB' % dict_)
+    print row % (u'total', u'%dB' % total_slots, u'%dB' % total_dict)
+    print
+    application = WSGIApplication(settings, path_router)
+    print u'cyclic garbage objects per request: %.1f' % objects_per_request(
+        application,
+        number
+    )
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
+
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark how long :py:class:`~weblayer.normalise.DefaultToJSONResponseNormaliser`
+  takes to turn large, nested JSON data into a response body, comparing the
+  default ``unicode_body`` path with the ``json_ensure_ascii`` path, which
+  uses the encoder's ASCII ``str`` output as the body as it is.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_normalise.py
+  
+"""
+
+import sys
+import timeit
+
+from webob import Response
+
+from weblayer.normalise import DefaultToJSONResponseNormaliser
+
+def make_payload(count):
+    """ Return a nested payload with ``count`` records that contain both
+      ascii and non ascii text.
+    """
+    
+    return {
+        'meta': {'count': count, 'next': None},
+        'results': [
+            {
+                'id': i,
+                'title': u'Caf\xe9 r\xe9sum\xe9 %d' % i,
+                'body': u'Lorem ipsum dolor sit amet ' * 4,
+                'author': {'name': u'Jos\xe9', 'roles': ['a', 'b']},
+                'scores': [i, i * 2.5, None]
+            } for i in range(count)
+        ]
+    }
+    
+
+def default_normalise(handler_response):
+    normaliser = DefaultToJSONResponseNormaliser(Response())
+    return normaliser.normalise(handler_response)
+    
+
+def ascii_normalise(handler_response):
+    normaliser = DefaultToJSONResponseNormaliser(
+        Response(),
+        json_ensure_ascii=True
+    )
+    return normaliser.normalise(handler_response)
+    
+
+PATHS = [
+    ('unicode_body', default_normalise),
+    ('ensure_ascii', ascii_normalise)
+]
+RECORD_COUNTS = (10, 100, 1000, 10000)
+
+def time_normalise(f, payload, number):
+    """ Return the mean time in milliseconds to normalise ``payload``.
+    """
+    
+    timer = timeit.Timer(lambda: f(payload))
+    return min(timer.repeat(3, number)) / number * 1000
+    
+
+def main(number=20):
+    row = u'%-14s %8s %12s'
+    print row % (u'path', u'records', u'time')
+    for count in RECORD_COUNTS:
+        payload = make_payload(count)
+        for name, f in PATHS:
+            print row % (
+                name,
+                count,
+                u'%.3fms' % time_normalise(f, payload, number)
+            )
+        
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
+
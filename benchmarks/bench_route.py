@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark how :py:meth:`~weblayer.interfaces.IPathRouter.match` time scales
+  as the number of routes in the url mapping grows.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_route.py
+  
+"""
+
+import sys
+import timeit
+
+from zope.interface import implements
+
+from weblayer.interfaces import IRequestHandler
+from weblayer.route import CombinedRegExpPathRouter, PrefixTriePathRouter
+from weblayer.route import RegExpPathRouter
+
+ROUTERS = [
+    RegExpPathRouter,
+    CombinedRegExpPathRouter,
+    PrefixTriePathRouter
+]
+ROUTE_COUNTS = (10, 50, 100, 200, 400, 800)
+
+class Handler(object):
+    implements(IRequestHandler)
+    
+
+
+def make_mapping(count):
+    """ Return a url mapping with ``count`` routes that look like a real
+      application's api.
+    """
+    
+    mapping = []
+    for i in range(count):
+        mapping.append((r'/api/v2/section%d/(\d+)/(\w+)' % i, Handler))
+    return mapping
+    
+
+def time_match(path_router, path, number):
+    """ Return the mean time in microseconds to match ``path``.
+    """
+    
+    timer = timeit.Timer(lambda: path_router.match(path))
+    return min(timer.repeat(3, number)) / number * 1000000
+    
+
+def main(number=2000):
+    row = u'%-26s %6s %10s %10s %10s'
+    print row % (u'router', u'routes', u'first', u'last', u'miss')
+    for count in ROUTE_COUNTS:
+        mapping = make_mapping(count)
+        first = '/api/v2/section0/1/foo'
+        last = '/api/v2/section%d/1/foo' % (count - 1)
+        miss = '/not/found'
+        for router_class in ROUTERS:
+            path_router = router_class(mapping)
+            print row % (
+                router_class.__name__,
+                count,
+                u'%.2fus' % time_match(path_router, first, number),
+                u'%.2fus' % time_match(path_router, last, number),
+                u'%.2fus' % time_match(path_router, miss, number)
+            )
+        
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Benchmark requests per second through
+  :py:class:`~weblayer.wsgi.WSGIApplication` and
+  :py:class:`~weblayer.wsgi.FastPathWSGIApplication` using a hello world
+  request handler.
+  
+  Run with ``weblayer`` on your ``sys.path``, e.g.::
+  
+      PYTHONPATH=src python benchmarks/bench_wsgi.py
+  
+"""
+
+import sys
+import time
+
+from weblayer import Bootstrapper, RequestHandler
+from weblayer.wsgi import FastPathWSGIApplication, WSGIApplication
+
+class Hello(RequestHandler):
+    def get(self, world):
+        return u'hello %s' % world
+        
+    
+
+mapping = [(r'/(.*)', Hello)]
+
+config = {
+    'cookie_secret': '...',
+    'static_files_path': '/var/www/static',
+    'template_directories': ['templates']
+}
+
+APPLICATIONS = [
+    WSGIApplication,
+    FastPathWSGIApplication
+]
+
+def start_response(status, headers, exc_info=None):
+    pass
+    
+
+def make_environ(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http'
+    }
+    
+
+def requests_per_second(application, number):
+    """ Return the best of three runs of ``number`` requests.
+    """
+    
+    best = None
+    for i in range(3):
+        start = time.time()
+        for j in xrange(number):
+            ''.join(application(make_environ('/world'), start_response))
+        duration = time.time() - start
+        if best is None or duration < best:
+            best = duration
+    return number / best
+    
+
+def main(number=5000):
+    bootstrapper = Bootstrapper(settings=config, url_mapping=mapping)
+    settings, path_router = bootstrapper()
+    row = u'%-26s %12s'
+    print row % (u'application', u'requests/s')
+    for application_class in APPLICATIONS:
+        application = application_class(settings, path_router)
+        print row % (
+            application_class.__name__,
+            u'%.0f' % requests_per_second(application, number)
+        )
+        
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main(*[int(arg) for arg in sys.argv[1:]])
+
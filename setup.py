@@ -65,7 +65,9 @@ setup(
             "foobar = setuptools_git:gitlsfiles"
         ],
         'console_scripts': [
-            "weblayer-demo = weblayer.examples.helloworld:main"
+            "weblayer-demo = weblayer.examples.helloworld:main",
+            "weblayer-compile-templates = weblayer.template:main",
+            "weblayer-build-static-manifest = weblayer.static:main"
         ]
     }
 )
@@ -42,6 +42,8 @@ class TrivialAuthenticationManager(object):
       .. _`the standard place`: http://wsgi.org/wsgi/Specifications/simple_authentication
     """
     
+    __slots__ = ('request',)
+    
     adapts(IRequest)
     implements(IAuthenticationManager)
     
@@ -22,10 +22,10 @@
       >>> settings, path_router = bootstrapper() #doctest: +NORMALIZE_WHITESPACE
       Traceback (most recent call last):
       ...
-      KeyError: u'Required setting `template_directories` () is missing, 
+      KeyError: u'Required setting `cookie_secret` (a long, random sequence 
+                of bytes) is missing, 
                 Required setting `static_files_path` () is missing, 
-                Required setting `cookie_secret` (a long, random sequence 
-                of bytes) is missing'
+                Required setting `template_directories` () is missing'
   
   Whereas if the required settings are provided, all is well::
   
@@ -84,9 +84,12 @@ from cookie import SignedSecureCookieWrapper
 from method import ExposedMethodSelector
 from normalise import DefaultToJSONResponseNormaliser
 from route import RegExpPathRouter
-from settings import RequirableSettings
+from settings import RequirableSettings, require_setting
 from static import MemoryCachedStaticURLGenerator
 from template import MakoTemplateRenderer
+from utils import use_json_backend
+
+require_setting('json_backend', default='auto')
 
 class Bootstrapper(object):
     """ Simplifies setting up and registering :ref:`weblayer` components.
@@ -122,11 +125,21 @@ class Bootstrapper(object):
             scan_framework=True, 
             extra_categories=None,
             require_settings=True,
+            precompile_templates=False,
+            load_static_manifest=False,
             **kwargs
         ):
         """ If ``require_settings`` is ``True`` and ``settings`` isn't provided
           as a keyword argument, call :py:meth:`require_settings`, 
           :py:meth:`register_components` and return ``settings, path_router``.
+          
+          If ``precompile_templates`` is ``True``, compiles the templates in
+          ``settings['template_directories']`` up front, so the first 
+          requests a worker handles don't have to.
+          
+          If ``load_static_manifest`` is ``True``, calls ``load_manifest()``
+          on the registered static url generator, so static files are hashed
+          once, up front, rather than inside requests.
         """
         
         if 'settings' in kwargs or not require_settings:
@@ -144,6 +157,28 @@ class Bootstrapper(object):
         settings = registry.getUtility(ISettings)
         path_router = registry.getUtility(IPathRouter)
         
+        if precompile_templates:
+            template_renderer = registry.queryAdapter(
+                settings, 
+                ITemplateRenderer
+            )
+            precompile = getattr(template_renderer, 'precompile', None)
+            if precompile is not None:
+                precompile()
+        
+        if load_static_manifest:
+            static_url_generator = registry.adapters.lookup(
+                [IRequest, ISettings], 
+                IStaticURLGenerator
+            )
+            load_manifest = getattr(
+                static_url_generator, 
+                'load_manifest', 
+                None
+            )
+            if load_manifest is not None:
+                load_manifest(settings)
+        
         return settings, path_router
         
     
@@ -199,6 +234,10 @@ class Bootstrapper(object):
         """ Setup component registrations. Pass in alternative implementations
           here to override, or pass in ``False`` to avoid registering a
           component.
+          
+          Registering ``settings`` also selects the JSON backend named by
+          ``settings['json_backend']`` (see 
+          :py:func:`~weblayer.utils.use_json_backend`).
         """
         
         if settings is not False:
@@ -206,6 +245,7 @@ class Bootstrapper(object):
                 settings = RequirableSettings()
             settings(self._user_settings)
             registry.registerUtility(settings, ISettings)
+            use_json_backend(settings.get('json_backend', 'auto'))
         
         if path_router is not False:
             if path_router is None:
@@ -55,11 +55,140 @@
       ... )
       True
   
+  ``registry`` is a :py:class:`CachingComponents` instance, which also
+  provides :py:meth:`~CachingComponents.getCachedAdapter` and
+  :py:meth:`~CachingComponents.getCachedMultiAdapter` to look up adapters
+  using factories cached against a key, like a request handler class.
+  
   .. _`zope.component.registry.Components`: http://pypi.python.org/pypi/zope.component#component-management-objects
   .. _`utilities`: http://pypi.python.org/pypi/zope.component#id6
   .. _`adapters`: http://pypi.python.org/pypi/zope.component#id7
   
 """
 
+__all__ = [
+    'CachingComponents',
+    'registry'
+]
+
+from zope.component.interfaces import ComponentLookupError
 from zope.component.registry import Components
-registry = Components('weblayer')
+from zope.interface import providedBy
+
+class CachingComponents(Components):
+    """ A `zope.component.registry.Components`_ registry that can cache the 
+      adapter factories it looks up against a key, so that subsequent lookups
+      using the same key are a single dictionary lookup.
+      
+          >>> from mock import Mock
+          >>> from weblayer.interfaces import ISettings, ITemplateRenderer
+          >>> from weblayer.settings import RequirableSettings
+          >>> components = CachingComponents('test')
+          >>> MockTemplateRenderer = Mock()
+          >>> MockTemplateRenderer.return_value = 'mock_template_renderer'
+          >>> components.registerAdapter(
+          ...     MockTemplateRenderer, 
+          ...     required=[ISettings],
+          ...     provided=ITemplateRenderer
+          ... )
+          >>> settings = RequirableSettings()
+          >>> components.getCachedAdapter(settings, ITemplateRenderer, 'key')
+          'mock_template_renderer'
+          >>> MockTemplateRenderer.assert_called_with(settings)
+      
+      The factory is now cached against the key::
+      
+          >>> cache_key = ('key', ITemplateRenderer, u'')
+          >>> components._adapter_factories[cache_key] == MockTemplateRenderer
+          True
+      
+      Changing the adapter registrations clears the cache::
+      
+          >>> components.unregisterAdapter(
+          ...     required=[ISettings], 
+          ...     provided=ITemplateRenderer
+          ... )
+          True
+          >>> components._adapter_factories
+          {}
+      
+      If there's no adapter, raises a ``ComponentLookupError``, just like 
+      ``getAdapter``::
+      
+          >>> components.getCachedAdapter(settings, ITemplateRenderer, 'key') #doctest: +ELLIPSIS
+          Traceback (most recent call last):
+          ...
+          ComponentLookupError: ...
+      
+      .. note::
+      
+          The cache assumes that the objects adapted using a given key always
+          provide the same interfaces.  Don't use keys that can be shared by
+          objects that need different adapters.
+      
+      .. _`zope.component.registry.Components`: http://pypi.python.org/pypi/zope.component#component-management-objects
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self._adapter_factories = {}
+        Components.__init__(self, *args, **kwargs)
+        
+    
+    def _setBases(self, bases):
+        self._adapter_factories.clear()
+        Components._setBases(self, bases)
+        
+    
+    __bases__ = property(
+        lambda self: self.__dict__.get('__bases__', ()),
+        lambda self, bases: self._setBases(bases)
+    )
+    
+    def registerAdapter(self, *args, **kwargs):
+        """ Register an adapter factory, clearing the cache.
+        """
+        
+        self._adapter_factories.clear()
+        return Components.registerAdapter(self, *args, **kwargs)
+        
+    
+    def unregisterAdapter(self, *args, **kwargs):
+        """ Unregister an adapter factory, clearing the cache.
+        """
+        
+        self._adapter_factories.clear()
+        return Components.unregisterAdapter(self, *args, **kwargs)
+        
+    
+    def getCachedMultiAdapter(self, objects, interface, key, name=u''):
+        """ Look up a multi-adapter, caching the factory against 
+          ``(key, interface, name)``.
+        """
+        
+        cache_key = (key, interface, name)
+        try:
+            factory = self._adapter_factories[cache_key]
+        except KeyError:
+            required = [providedBy(item) for item in objects]
+            factory = self.adapters.lookup(required, interface, name)
+            self._adapter_factories[cache_key] = factory
+        
+        adapter = None
+        if factory is not None:
+            adapter = factory(*objects)
+        if adapter is None:
+            raise ComponentLookupError(objects, interface, name)
+        return adapter
+        
+    
+    def getCachedAdapter(self, object, interface, key, name=u''):
+        """ Look up an adapter, caching the factory against 
+          ``(key, interface, name)``.
+        """
+        
+        return self.getCachedMultiAdapter((object,), interface, key, name=name)
+        
+    
+    
+
+registry = CachingComponents('weblayer')
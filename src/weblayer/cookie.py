@@ -16,6 +16,31 @@
   serve your application over `HTTPS`_ and that is a matter for web server 
   configuration, outside the scope of :ref:`weblayer`.
   
+  Cookie values that have been verified are cached in a thread safe, size
+  bounded, least recently used cache, so that repeated requests carrying the
+  same cookie (e.g.: a session or ``_xsrf`` cookie) don't have to recompute 
+  its signature.  Cached values still expire with their timestamp.
+  
+  Cookies are signed using HMAC with ``settings['cookie_digest']``, which 
+  defaults to ``'sha1'``.  To rotate secrets, set ``settings['cookie_secret']``
+  to a list of secrets:  cookies are signed with the first and those signed
+  with any of them are accepted.
+  
+  By default, cookie values are written as 
+  ``base64(value)|timestamp|hex signature``.  Set ``settings['cookie_format']``
+  to ``'compact'`` to write them as URL safe base64, without padding, of a
+  version byte, a packed timestamp, the value and the raw signature, which
+  is smaller and cheaper to parse.  Cookies in either format can always be
+  read, so switching format doesn't invalidate existing cookies.
+  
+  Cookies signed more than ``settings['cookie_max_age_days']`` (which 
+  defaults to ``31``) days ago are rejected.  Pass ``max_age_days`` to
+  :py:meth:`~SignedSecureCookieWrapper.get` and 
+  :py:meth:`~SignedSecureCookieWrapper.set` to override this per cookie and
+  use :py:meth:`~SignedSecureCookieWrapper.refresh` to re-sign cookies only
+  when they're getting old, rather than on every request.  Unless you pass
+  ``expires_days``, cookies are set to expire after ``max_age_days``.
+  
   .. _`sidejacking`: http://codebutler.com/firesheep
   .. _`https`: http://techcrunch.com/2010/10/25/firesheep/
 """
@@ -29,6 +54,7 @@ import datetime
 import hashlib
 import hmac
 import logging
+import struct
 import time
 
 from zope.component import adapts
@@ -37,9 +63,24 @@ from zope.interface import implements
 from interfaces import IRequest, IResponse, ISettings
 from interfaces import ISecureCookieWrapper
 from settings import require_setting
-from utils import encode_to_utf8
+from utils import encode_to_utf8, LRUCache
 
 require_setting('cookie_secret', help='a long, random sequence of bytes')
+require_setting('cookie_digest', default='sha1')
+require_setting('cookie_format', default='text')
+require_setting('cookie_max_age_days', default=31)
+
+try: # pragma: no cover
+    _compare_digest = hmac.compare_digest
+except AttributeError: # pragma: no cover
+    _compare_digest = None
+
+_hmac_prototypes = {}
+
+_MAX_AGE_DAYS = object()
+_COMPACT_VERSION = 1
+_COMPACT_HEADER = '!BI'
+_COMPACT_HEADER_SIZE = struct.calcsize(_COMPACT_HEADER)
 
 def _time_independent_equals(a, b):
     """ Logically equal to ``a == b``::
@@ -66,6 +107,8 @@ def _time_independent_equals(a, b):
       
       But not vulnerable to 
       `timing attacks <http://seb.dbzteam.org/crypto/python-oauth-timing-hmac.pdf>`_.
+      Uses :py:func:`hmac.compare_digest`, where available, rather than
+      comparing in Python.
     """
     
     if not isinstance(a, basestring):
@@ -74,6 +117,9 @@ def _time_independent_equals(a, b):
     if not isinstance(b, basestring):
         raise ValueError(u'`%s` must be a `basestring`' % b)
     
+    if _compare_digest is not None:
+        return _compare_digest(encode_to_utf8(a), encode_to_utf8(b))
+    
     if len(a) != len(b):
         return False
     
@@ -84,7 +130,39 @@ def _time_independent_equals(a, b):
     return result == 0
     
 
-def _generate_cookie_signature(cookie_secret, *parts):
+def _get_hmac(cookie_secret, digest='sha1'):
+    """ Returns a copy of an HMAC object for ``cookie_secret`` and the
+      ``hashlib`` algorithm named ``digest``, which is prepared once and 
+      stored in ``_hmac_prototypes``, so the key isn't processed per call::
+      
+          >>> _hmac_prototypes.clear()
+          >>> hasher = _get_hmac('secret')
+          >>> _hmac_prototypes.keys()
+          [('secret', 'sha1')]
+          >>> hasher is _get_hmac('secret')
+          False
+          >>> hasher.update('a')
+          >>> expected = hmac.new('secret', 'a', hashlib.sha1)
+          >>> hasher.hexdigest() == expected.hexdigest()
+          True
+          >>> _get_hmac('secret', digest='sha256').digest_size
+          32
+          >>> _hmac_prototypes.clear()
+      
+    """
+    
+    key = (cookie_secret, digest)
+    prototype = _hmac_prototypes.get(key)
+    if prototype is None:
+        prototype = hmac.new(
+            encode_to_utf8(cookie_secret), 
+            digestmod=getattr(hashlib, digest)
+        )
+        _hmac_prototypes[key] = prototype
+    return prototype.copy()
+    
+
+def _generate_cookie_signature(cookie_secret, *parts, **kwargs):
     """ Generate a secure cookie signature::
       
           >>> cookie_secret = ''
@@ -106,9 +184,16 @@ def _generate_cookie_signature(cookie_secret, *parts):
           ...
           ValueError: [] must be a `basestring`
       
+      The ``hashlib`` algorithm can be passed in as ``digest``, which 
+      defaults to ``'sha1'``::
+      
+          >>> signature = _generate_cookie_signature('', 'a', digest='sha256')
+          >>> len(signature)
+          64
+      
     """
     
-    hasher = hmac.new(cookie_secret, digestmod=hashlib.sha1)
+    hasher = _get_hmac(cookie_secret, kwargs.get('digest', 'sha1'))
     
     parts = [encode_to_utf8(part) for part in parts]
     for part in parts:
@@ -117,6 +202,30 @@ def _generate_cookie_signature(cookie_secret, *parts):
     return hasher.hexdigest()
     
 
+def _generate_compact_signature(cookie_secret, name, payload, digest='sha1'):
+    """ Generate the raw signature of a compact cookie ``payload``, prefixed
+      with the length of the cookie ``name``, so the two can't run into each
+      other::
+      
+          >>> signature = _generate_compact_signature('', 'name', 'payload')
+          >>> len(signature)
+          20
+          >>> signature == _generate_compact_signature('', 'nam', 'epayload')
+          False
+          >>> signature = _generate_compact_signature('', u'n', 'p', 'sha256')
+          >>> len(signature)
+          32
+      
+    """
+    
+    name = encode_to_utf8(name)
+    hasher = _get_hmac(cookie_secret, digest)
+    hasher.update(struct.pack('!H', len(name)))
+    hasher.update(name)
+    hasher.update(payload)
+    return hasher.digest()
+    
+
 
 class SignedSecureCookieWrapper(object):
     """ Adapts an :py:class:`~weblayer.interfaces.IRequest`, 
@@ -125,31 +234,82 @@ class SignedSecureCookieWrapper(object):
       and set cookies that can't be forged.
     """
     
+    __slots__ = (
+        'request', 
+        'response', 
+        '_cookie_secret', 
+        '_cookie_secrets', 
+        '_cookie_digest',
+        '_cookie_format',
+        '_max_age_days',
+        '_decoded'
+    )
+    
+    _verified = LRUCache(max_size=1000)
+    
     adapts(IRequest, IResponse, ISettings)
     implements(ISecureCookieWrapper)
     
     def __init__(self, request, response, settings):
         self.request = request
         self.response = response
-        self._cookie_secret = settings['cookie_secret']
+        
+        cookie_secrets = settings['cookie_secret']
+        if isinstance(cookie_secrets, basestring):
+            cookie_secrets = (cookie_secrets,)
+        self._cookie_secrets = tuple(cookie_secrets)
+        self._cookie_secret = self._cookie_secrets[0]
+        self._cookie_digest = settings.get('cookie_digest', 'sha1')
+        self._cookie_format = settings.get('cookie_format', 'text')
+        self._max_age_days = settings.get('cookie_max_age_days', 31)
+        self._decoded = {}
         
     
-    def set(self, name, value, timestamp=None, expires_days=30, **kwargs):
-        """ Signs and timestamps a cookie so it cannot be forged.
+    def set(
+            self, 
+            name, 
+            value, 
+            timestamp=None, 
+            expires_days=_MAX_AGE_DAYS, 
+            max_age_days=None,
+            **kwargs
+        ):
+        """ Signs and timestamps a cookie so it cannot be forged, writing it
+          in ``self._cookie_format``.
+          
+          The cookie is set to expire after ``expires_days``, which defaults
+          to ``max_age_days`` (which defaults to ``self._max_age_days``).
+          Pass ``expires_days=None`` to set a session cookie.  As 
+          :py:meth:`get` rejects cookies signed more than ``max_age_days``
+          ago, ``expires_days`` is capped at ``max_age_days``.
         """
         
+        if max_age_days is None:
+            max_age_days = self._max_age_days
+        if expires_days is _MAX_AGE_DAYS:
+            expires_days = max_age_days
+        
         timestamp = timestamp and timestamp or str(int(time.time()))
-        value = base64.b64encode(value)
-        args = (name, value, timestamp)
-        signature = _generate_cookie_signature(self._cookie_secret, *args)
-        value = "|".join([value, timestamp, signature])
+        if self._cookie_format == 'compact':
+            value = self._encode_compact(name, value, int(timestamp))
+        else:
+            value = base64.b64encode(value)
+            signature = _generate_cookie_signature(
+                self._cookie_secret, 
+                name, 
+                value, 
+                timestamp,
+                digest=self._cookie_digest
+            )
+            value = "|".join([value, timestamp, signature])
         
         max_age = None
         if expires_days:
             if not isinstance(expires_days, int):
                 raise TypeError(u'%s must be an `int`' % expires_days)
-            max_age = expires_days * 24 * 60 * 60
+            max_age = min(expires_days, max_age_days) * 24 * 60 * 60
         
+        self._forget(name)
         return self.response.set_cookie(
             name, 
             value=value, 
@@ -158,42 +318,222 @@ class SignedSecureCookieWrapper(object):
         )
         
     
-    def get(self, name, value=None):
-        """ Returns the given signed cookie if it validates, or ``None``.
+    def get(self, name, value=None, max_age_days=None):
+        """ Returns the given signed cookie if it validates and was signed
+          less than ``max_age_days`` (which defaults to 
+          ``self._max_age_days``) ago, or ``None``.
+          
+          When ``value`` isn't provided, it's read from the request cookies
+          and the result is memoised in ``self._decoded`` (i.e.: for the
+          rest of the request) until the cookie is set or deleted.
         """
         
-        if value is None:
+        verified = self._get_verified(name, value, max_age_days)
+        if verified is None:
+            return None
+        return verified[1]
+        
+    
+    def refresh(self, name, refresh_after_days, max_age_days=None, **kwargs):
+        """ Returns the given signed cookie, like :py:meth:`get`, but if it
+          was signed more than ``refresh_after_days`` ago, :py:meth:`set` it
+          again, passing through ``max_age_days`` and ``kwargs``, so it 
+          doesn't expire (and, unless ``kwargs`` includes ``expires_days``,
+          keeps a lifetime of ``max_age_days``).  Cookies that are still fresh
+          aren't re-set, which avoids a ``Set-Cookie`` header on every
+          response.
+        """
+        
+        verified = self._get_verified(name, None, max_age_days)
+        if verified is None:
+            return None
+        
+        timestamp, value = verified
+        if timestamp < time.time() - refresh_after_days * 86400:
+            self.set(name, value, max_age_days=max_age_days, **kwargs)
+        return value
+        
+    
+    def _get_verified(self, name, value, max_age_days):
+        """ Returns ``(timestamp, decoded value)`` for the cookie called
+          ``name`` if it validates, or ``None``, memoising the result if the
+          value is read from the request.
+        """
+        
+        if max_age_days is None:
+            max_age_days = self._max_age_days
+        
+        if value is not None:
+            return self._verify(name, value, max_age_days)
+        
+        key = (name, max_age_days)
+        if not key in self._decoded:
             value = self.request.cookies.get(name, None)
+            self._decoded[key] = self._verify(name, value, max_age_days)
+        return self._decoded[key]
+        
+    
+    def _forget(self, name):
+        """ Clear the memoised results for the cookie called ``name``.
+        """
+        
+        for key in self._decoded.keys():
+            if key[0] == name:
+                del self._decoded[key]
+        
+    
+    def _verify(self, name, value, max_age_days):
+        """ Returns ``(timestamp, decoded value)`` for the cookie called
+          ``name`` if ``value`` was signed less than ``max_age_days`` ago and
+          its signature validates, or ``None``.
+          
+          The signature is checked against each of ``self._cookie_secrets``
+          in turn.  Values that validate are cached in ``self._verified``, 
+          against the secrets, digest, ``name`` and ``value``, along with 
+          their timestamp.  To change the size of the cache, replace it, e.g.::
+          
+              SignedSecureCookieWrapper._verified = LRUCache(max_size=10000)
+          
+        """
         
         if value is None:
             return None
         
+        oldest = time.time() - max_age_days * 86400
+        
+        key = (self._cookie_secrets, self._cookie_digest, name, value)
+        cached = self._verified.get(key)
+        if cached is not None:
+            if cached[0] < oldest:
+                logging.warning("Expired cookie %r", value)
+                return None
+            return cached
+        
         parts = value.split("|")
-        if len(parts) != 3: 
+        if len(parts) == 1:
+            verified = self._verify_compact(name, value, oldest)
+        elif len(parts) == 3:
+            verified = self._verify_text(name, value, parts, oldest)
+        else:
             return None
         
+        if verified is not None:
+            self._verified.set(key, verified)
+        return verified
+        
+    
+    def _verify_text(self, name, value, parts, oldest):
+        """ Returns ``(timestamp, decoded value)`` if the ``parts`` of a
+          ``base64(value)|timestamp|hex signature`` cookie validate and the
+          timestamp isn't older than ``oldest``, or ``None``.
+        """
+        
         timestamp = int(parts[1])
-        if timestamp < time.time() - 31 * 86400:
+        if timestamp < oldest:
             logging.warning("Expired cookie %r", value)
             return None
         
-        args = (name, parts[0], parts[1])
-        signature = _generate_cookie_signature(self._cookie_secret, *args)
-        
-        if not _time_independent_equals(parts[2], signature):
+        for cookie_secret in self._cookie_secrets:
+            signature = _generate_cookie_signature(
+                cookie_secret, 
+                name, 
+                parts[0], 
+                parts[1],
+                digest=self._cookie_digest
+            )
+            if _time_independent_equals(parts[2], signature):
+                break
+        else:
             logging.warning("Invalid cookie signature %r", value)
             return None
         
         try:
-            return base64.b64decode(parts[0])
+            return timestamp, base64.b64decode(parts[0])
         except TypeError:
             return None
         
     
+    def _encode_compact(self, name, value, timestamp):
+        """ Returns URL safe base64, without padding, of a version byte, 
+          the packed ``timestamp``, ``value`` and the raw signature::
+          
+              >>> from mock import Mock
+              >>> settings = {'cookie_secret': '', 'cookie_format': 'compact'}
+              >>> wrapper = SignedSecureCookieWrapper(Mock(), Mock(), settings)
+              >>> wrapper._encode_compact('name', 'value', 1)
+              'AQAAAAF2YWx1Za6hOrINRGvFkz48TEhhLt-eeFmg'
+              >>> now = int(time.time())
+              >>> encoded = wrapper._encode_compact('name', 'value', now)
+              >>> oldest = now - 60
+              >>> wrapper._verify_compact('name', encoded, oldest) == (now, 'value')
+              True
+          
+        """
+        
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        payload = struct.pack(_COMPACT_HEADER, _COMPACT_VERSION, timestamp)
+        payload += value
+        signature = _generate_compact_signature(
+            self._cookie_secret, 
+            name, 
+            payload, 
+            self._cookie_digest
+        )
+        return base64.urlsafe_b64encode(payload + signature).rstrip('=')
+        
+    
+    def _verify_compact(self, name, value, oldest):
+        """ Returns ``(timestamp, decoded value)`` if a compact cookie
+          ``value`` validates and its timestamp isn't older than ``oldest``,
+          or ``None``.  As request cookie values are ``unicode``, ``value``
+          is converted to an ASCII ``str`` before it's decoded.
+        """
+        
+        try:
+            value = str(value)
+            data = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        except (TypeError, UnicodeEncodeError):
+            return None
+        
+        hasher = _get_hmac(self._cookie_secret, self._cookie_digest)
+        digest_size = hasher.digest_size
+        if len(data) < _COMPACT_HEADER_SIZE + digest_size:
+            return None
+        
+        payload = data[:-digest_size]
+        version, timestamp = struct.unpack(
+            _COMPACT_HEADER, 
+            payload[:_COMPACT_HEADER_SIZE]
+        )
+        if version != _COMPACT_VERSION:
+            return None
+        
+        if timestamp < oldest:
+            logging.warning("Expired cookie %r", value)
+            return None
+        
+        for cookie_secret in self._cookie_secrets:
+            signature = _generate_compact_signature(
+                cookie_secret, 
+                name, 
+                payload, 
+                self._cookie_digest
+            )
+            if _time_independent_equals(data[-digest_size:], signature):
+                break
+        else:
+            logging.warning("Invalid cookie signature %r", value)
+            return None
+        
+        return timestamp, payload[_COMPACT_HEADER_SIZE:]
+        
+    
     def delete(self, name, path="/", domain=None):
         """ Convenience method to clear a cookie.
         """
         
+        self._forget(name)
         self.response.set_cookie(
             name, 
             '', 
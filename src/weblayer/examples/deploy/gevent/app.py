@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" An example showing how to serve :ref:`weblayer` with `gevent`_, so that a
+  single process can handle thousands of concurrent requests that spend most
+  of their time waiting on backend HTTP or database calls.
+  
+  Request handler methods stay as plain ``def get()`` methods.  Patching the
+  standard library with `gevent.monkey`_ *before* anything else is imported
+  makes blocking socket calls (and ``time.sleep``) yield to other requests
+  rather than blocking the process.
+  
+  To serve the application on http://localhost:8080, run::
+  
+      python app.py serve
+  
+  To fire ``concurrency`` slow requests at the application, in process, and
+  see how long they take to complete, run::
+  
+      python app.py test 1000
+  
+  .. _`gevent`: http://www.gevent.org/
+  .. _`gevent.monkey`: http://www.gevent.org/gevent.monkey.html
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+import sys
+import time
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from webob import Request
+
+from weblayer import Bootstrapper, RequestHandler, WSGIApplication
+
+class Slow(RequestHandler):
+    """ Stands in for a handler waiting on a slow backend call.
+    """
+    
+    def get(self, seconds):
+        time.sleep(float(seconds))
+        return {'slept': float(seconds)}
+        
+    
+
+
+mapping = [(r'/slow/([\d.]+)', Slow)]
+
+config = {
+    'cookie_secret': '...',
+    'static_files_path': '/var/www/static',
+    'template_directories': ['templates']
+}
+
+bootstrapper = Bootstrapper(settings=config, url_mapping=mapping)
+application = WSGIApplication(*bootstrapper())
+
+def serve(port=8080):
+    WSGIServer(('', port), application).serve_forever()
+    
+
+def load_test(concurrency=1000, seconds=1.0):
+    """ Make ``concurrency`` simultaneous in process requests that each wait
+      for ``seconds``.
+    """
+    
+    def get(i):
+        request = Request.blank('/slow/%s' % seconds)
+        return request.get_response(application).status_int
+    
+    pool = Pool(concurrency)
+    start = time.time()
+    statuses = pool.map(get, range(concurrency))
+    duration = time.time() - start
+    
+    print u'%d requests, %d ok, in %.2fs' % (
+        concurrency,
+        statuses.count(200),
+        duration
+    )
+    
+
+if __name__ == '__main__': # pragma: no cover
+    if sys.argv[1:2] == ['test']:
+        load_test(*[int(arg) for arg in sys.argv[2:3]])
+    else:
+        serve()
+    
+
@@ -19,6 +19,7 @@ __all__ = [
     'IResponseNormaliser',
     'ISecureCookieWrapper',
     'ISettings',
+    'IStaticDigestStore',
     'IStaticURLGenerator',
     'ITemplateRenderer',
     'IWSGIApplication'
@@ -109,6 +110,11 @@ class IRequestHandler(Interface):
         """ Render the template called ``tmpl_name``.
         """
         
+    def stream(tmpl_name, **kwargs):
+        """ Render the template called ``tmpl_name`` as an iterable of 
+          encoded chunks.
+        """
+        
     
     def redirect(url, status=302, content_type=None):
         """ Redirect to ``url``.
@@ -173,13 +179,21 @@ class ISecureCookieWrapper(Interface):
       :py:class:`~weblayer.cookie.SignedSecureCookieWrapper`.
     """
     
-    def set(name, value, expires_days=30, **kwargs):
-        """ Set cookie.
+    def set(name, value, max_age_days=None, **kwargs):
+        """ Set cookie, to expire after ``max_age_days``, unless 
+          ``expires_days`` is passed (``expires_days=None`` sets a session 
+          cookie).
+        """
+        
+    
+    def get(name, include_name=True, value=None, max_age_days=None):
+        """ Get cookie, if it was signed less than ``max_age_days`` ago.
         """
         
     
-    def get(name, include_name=True, value=None):
-        """ Get cookie.
+    def refresh(name, refresh_after_days, **kwargs):
+        """ Get cookie, setting it again if it was set more than
+          ``refresh_after_days`` ago.
         """
         
     
@@ -310,6 +324,26 @@ class ISettings(Interface):
 
 
     
+class IStaticDigestStore(Interface):
+    """ A store of static file hash digests, shared between processes.
+      Implementations include 
+      :py:class:`~weblayer.static.SQLiteStaticDigestStore` and 
+      :py:class:`~weblayer.static.MmapStaticDigestStore`.
+    """
+    
+    def get(file_path):
+        """ Return the ``(signature, digest)`` stored against ``file_path``,
+          or ``None``.
+        """
+        
+    
+    def set(file_path, signature, digest):
+        """ Store ``signature`` and ``digest`` against ``file_path``.
+        """
+        
+    
+    
+
 class IStaticURLGenerator(Interface):
     """ Static url generator.  Default implementation is 
       :py:class:`~weblayer.static.MemoryCachedStaticURLGenerator`.
@@ -331,6 +365,11 @@ class ITemplateRenderer(Interface):
         """ Render the template called ``tmpl_name``.
         """
         
+    def stream(tmpl_name, **kwargs):
+        """ Render the template called ``tmpl_name`` as an iterable of 
+          encoded chunks.
+        """
+        
     
     
 
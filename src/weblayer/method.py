@@ -29,6 +29,15 @@
       >>> callable(selector.select_method('POST'))
       False
   
+  The exposed methods of each request handler class are worked out once, the
+  first time the class is adapted, so selecting a method is a single 
+  dictionary lookup on the request method.  The methods a request handler
+  allows are available, ready to use as an ``Allow`` header, as 
+  ``selector.allow``::
+  
+      >>> selector.allow
+      'GET'
+  
 """
 
 __all__ = [
@@ -40,17 +49,77 @@ from zope.interface import implements
 
 from interfaces import IRequestHandler, IMethodSelector
 
+def _method_table(handler_class):
+    """ Returns ``methods, allow`` for ``handler_class``, where ``methods``
+      maps upper case request methods to the names of the exposed methods
+      that handle them and ``allow`` is the value of an ``Allow`` header::
+      
+          >>> class Handler(object):
+          ...     __all__ = ('head', 'get', 'post', 'Put')
+          ...     def get(self):
+          ...         pass
+          ...     def put(self):
+          ...         pass
+          ... 
+          >>> methods, allow = _method_table(Handler)
+          >>> sorted(methods.items())
+          [('GET', 'get'), ('HEAD', 'get')]
+          >>> allow
+          'GET, HEAD'
+      
+      Returns ``None, None`` if ``handler_class`` doesn't have an ``__all__``::
+      
+          >>> _method_table(object)
+          (None, None)
+      
+    """
+    
+    exposed = getattr(handler_class, '__all__', None)
+    if exposed is None:
+        return None, None
+    
+    if isinstance(exposed, basestring):
+        exposed = (exposed,)
+    
+    methods = {}
+    for name in exposed:
+        if name == name.lower() and hasattr(handler_class, name):
+            methods[name.upper()] = name
+    
+    if not 'HEAD' in methods and 'head' in exposed: # special case
+        if 'GET' in methods:
+            methods['HEAD'] = methods['GET']
+    
+    return methods, ', '.join(sorted(methods))
+    
+
 class ExposedMethodSelector(object):
     """ Method selector adapter that works in tandem with the
       ``RequestHandler.__all__`` attribute.
     """
     
+    __slots__ = ('context', '_methods', 'allow')
+    
+    _tables = {}
+    
     adapts(IRequestHandler)
     implements(IMethodSelector)
     
     def __init__(self, context):
+        """ Looks up the methods exposed by ``context.__class__``, working 
+          them out if this is the first time the class has been adapted.
+        """
+        
         self.context = context
         
+        handler_class = context.__class__
+        try:
+            self._methods, self.allow = self._tables[handler_class]
+        except KeyError:
+            table = _method_table(handler_class)
+            self._tables[handler_class] = table
+            self._methods, self.allow = table
+        
     
     def select_method(self, method_name):
         """ Returns ``getattr(self, method_name)`` iff the method exists
@@ -74,19 +143,20 @@ class ExposedMethodSelector(object):
           
         """
         
-        if not isinstance(method_name, basestring):
-            raise ValueError
-        
-        if not hasattr(self.context, '__all__'):
+        if self._methods is None:
+            if not isinstance(method_name, basestring):
+                raise ValueError
             return None
         
-        method_name = method_name.lower()
-        if method_name in self.context.__all__:
-            method = getattr(self.context, method_name, None)
-            if method_name == 'head' and method is None: # special case
-                if 'get' in self.context.__all__:
-                    method = getattr(self.context, 'get', None)
-            return method
+        try:
+            name = self._methods[method_name]
+        except (KeyError, TypeError):
+            if not isinstance(method_name, basestring):
+                raise ValueError
+            name = self._methods.get(method_name.upper())
+            if name is None:
+                return None
+        return getattr(self.context, name, None)
         
     
     
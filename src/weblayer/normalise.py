@@ -33,8 +33,34 @@
       >>> r == normaliser.response
       True
   
-  If the argument provided isn't ``callable()``, a ``basestring`` or ``None``,
-  the default implementation tries to `JSON`_ encode it::
+  Generators and other iterables (that aren't a ``list``, ``tuple`` or 
+  ``dict``), like the one returned by
+  :py:meth:`~weblayer.request.BaseHandler.stream`, are used as the response's
+  ``app_iter``, without being joined.  Any ``unicode`` chunks are encoded as
+  they're sent and the ``Content-Length`` is left unset::
+  
+      >>> from webob import Response
+      >>> streaming_normaliser = DefaultToJSONResponseNormaliser(Response())
+      >>> r = streaming_normaliser.normalise(s for s in ['a', u'\\xe9'])
+      >>> list(r.app_iter)
+      ['a', '\\xc3\\xa9']
+      >>> r.content_length is None
+      True
+  
+  To stream a large number of records as a `JSON`_ array, wrap them in a 
+  :py:class:`JSONArrayStream`.  Each record is encoded as it's sent, so the
+  whole array is never held in memory::
+  
+      >>> streaming_normaliser = DefaultToJSONResponseNormaliser(Response())
+      >>> records = ({'id': i} for i in range(3))
+      >>> r = streaming_normaliser.normalise(JSONArrayStream(records))
+      >>> r.content_type
+      'application/json'
+      >>> ''.join(r.app_iter)
+      '[{"id": 0}, {"id": 1}, {"id": 2}]'
+  
+  If the argument provided isn't ``callable()``, a ``basestring``, an iterable
+  or ``None``, the default implementation tries to `JSON`_ encode it::
   
       >>> r = normaliser.normalise({'a': u'b'})
       >>> r.content_type
@@ -42,23 +68,111 @@
       >>> r.unicode_body
       u'{"a": "b"}'
   
+  Pass ``json_ensure_ascii=True`` to escape non ASCII characters instead.
+  The encoder then returns an ASCII ``str``, which is used as the response
+  ``body`` as it is, without being transcoded::
+  
+      >>> normaliser = DefaultToJSONResponseNormaliser(
+      ...     Mock(), 
+      ...     json_ensure_ascii=True
+      ... )
+      >>> r = normaliser.normalise({'a': u'\\xe9'})
+      >>> r.body
+      '{"a": "\\\\u00e9"}'
+  
   .. _`json`: http://www.json.org/
 """
 
 __all__ = [
-    'DefaultToJSONResponseNormaliser'
+    'DefaultToJSONResponseNormaliser',
+    'JSONArrayStream'
 ]
 
+import re
+
 from zope.component import adapts
 from zope.interface import implements
 
 from interfaces import IResponse, IResponseNormaliser
 from utils import json_encode as utils_json_encode
 
+_CHARSET = re.compile(r'charset=([^;\s]+)', re.I)
+
+def _encode_chunks(chunks, charset):
+    """ Yields ``chunks``, encoding any ``unicode`` chunks using ``charset``::
+      
+          >>> list(_encode_chunks(['a', u'\\xe9'], 'utf-8'))
+          ['a', '\\xc3\\xa9']
+      
+    """
+    
+    for chunk in chunks:
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode(charset)
+        yield chunk
+    
+
+def _iter_json_array(records, json_encode, charset, chunk_size=8192):
+    """ Yields a `JSON`_ array of ``records``, encoding one record at a time
+      and coalescing the output into chunks of at least ``chunk_size``::
+      
+          >>> from utils import json_encode
+          >>> list(_iter_json_array(iter([1, {}]), json_encode, 'utf-8'))
+          ['[1, {}]']
+          >>> list(_iter_json_array([1, 2], json_encode, 'utf-8', chunk_size=1))
+          ['[1', ', 2', ']']
+          >>> list(_iter_json_array([], json_encode, 'utf-8'))
+          ['[]']
+      
+    """
+    
+    pending = ['[']
+    size = 1
+    separator = ''
+    for record in records:
+        chunk = json_encode(record)
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode(charset)
+        pending.append(separator)
+        pending.append(chunk)
+        size += len(separator) + len(chunk)
+        separator = ', '
+        if size >= chunk_size:
+            yield ''.join(pending)
+            pending = []
+            size = 0
+    pending.append(']')
+    yield ''.join(pending)
+    
+
+class JSONArrayStream(object):
+    """ Marks an iterable of ``records`` to be sent as a `JSON`_ array, 
+      encoding one record at a time::
+      
+          >>> stream = JSONArrayStream([1, 2])
+          >>> stream.records
+          [1, 2]
+      
+    """
+    
+    def __init__(self, records):
+        self.records = records
+        
+    
+    
+
 class DefaultToJSONResponseNormaliser(object):
     """ Adapter to normalise a response.
     """
     
+    __slots__ = (
+        'response', 
+        '_json_encode', 
+        '_json_content_type', 
+        '_json_charset', 
+        '_json_ensure_ascii'
+    )
+    
     adapts(IResponse)
     implements(IResponseNormaliser)
     
@@ -66,7 +180,8 @@ class DefaultToJSONResponseNormaliser(object):
             self, 
             response, 
             json_encode=None,
-            json_content_type='application/json; charset=UTF-8'
+            json_content_type='application/json; charset=UTF-8',
+            json_ensure_ascii=False
         ):
         """ Initialise a `DefaultToJSONResponseNormaliser`::
           
@@ -104,6 +219,24 @@ class DefaultToJSONResponseNormaliser(object):
               >>> normaliser._json_content_type == default
               True
           
+          The ``charset`` of the ``json_content_type`` (which defaults to 
+          ``'utf-8'``) is available as ``self._json_charset``::
+          
+              >>> normaliser._json_charset
+              'UTF-8'
+              >>> normaliser = DefaultToJSONResponseNormaliser(
+              ...     response,
+              ...     json_content_type='application/json'
+              ... )
+              >>> normaliser._json_charset
+              'utf-8'
+          
+          ``json_ensure_ascii`` is available as ``self._json_ensure_ascii``,
+          defaulting to ``False``::
+          
+              >>> normaliser._json_ensure_ascii
+              False
+          
         """
         
         self.response = response
@@ -112,6 +245,39 @@ class DefaultToJSONResponseNormaliser(object):
         else:
             self._json_encode = json_encode
         self._json_content_type = json_content_type
+        match = _CHARSET.search(json_content_type)
+        self._json_charset = match and match.group(1) or 'utf-8'
+        self._json_ensure_ascii = json_ensure_ascii
+        
+    
+    def _encode_json(self, value):
+        """ JSON encode ``value`` using ``self._json_encode``::
+          
+              >>> from mock import Mock
+              >>> json_encode = Mock()
+              >>> json_encode.return_value = u'"\\xe9"'
+              >>> normaliser = DefaultToJSONResponseNormaliser(
+              ...     None,
+              ...     json_encode=json_encode
+              ... )
+              >>> normaliser._encode_json(u'\\xe9')
+              u'"\\xe9"'
+          
+          If ``self._json_ensure_ascii`` then passes ``ensure_ascii=True`` 
+          through to ``self._json_encode``::
+          
+              >>> normaliser._json_ensure_ascii = True
+              >>> json_encode.return_value = '"\\\\u00e9"'
+              >>> normaliser._encode_json(u'\\xe9')
+              '"\\\\u00e9"'
+              >>> json_encode.call_args[1]
+              {'ensure_ascii': True}
+          
+        """
+        
+        if self._json_ensure_ascii:
+            return self._json_encode(value, ensure_ascii=True)
+        return self._json_encode(value)
         
     
     def normalise(self, handler_response):
@@ -155,6 +321,37 @@ class DefaultToJSONResponseNormaliser(object):
               >>> r.unicode_body == u'a'
               True
           
+          If it's a :py:class:`JSONArrayStream`, use a `JSON`_ array of its
+          ``records``, encoded one at a time, as the response's ``app_iter``::
+          
+              >>> response = Mock()
+              >>> response.charset = None
+              >>> normaliser = DefaultToJSONResponseNormaliser(
+              ...     response,
+              ...     json_encode=None
+              ... )
+              >>> r = normaliser.normalise(JSONArrayStream(iter([{}])))
+              >>> r.content_type == normaliser._json_content_type
+              True
+              >>> list(r.app_iter)
+              ['[{}]']
+              >>> r.content_length is None
+              True
+          
+          If it's any other iterable, apart from a ``list``, ``tuple`` or 
+          ``dict``, use it as the response's ``app_iter``, encoding
+          ``unicode`` chunks with the response's ``charset`` (which defaults
+          to ``'utf-8'``) and leaving the ``Content-Length`` unset::
+          
+              >>> r = normaliser.normalise(s for s in [u'\\xe9'])
+              >>> list(r.app_iter)
+              ['\\xc3\\xa9']
+              >>> r = normaliser.normalise(iter(['a', 'b']))
+              >>> list(r.app_iter)
+              ['a', 'b']
+              >>> r.content_length is None
+              True
+          
           If it's ``None`` then just return the origin ``response``::
           
               >>> normaliser = DefaultToJSONResponseNormaliser(
@@ -182,10 +379,10 @@ class DefaultToJSONResponseNormaliser(object):
               True
               >>> r.body
               '{"a": "b"}'
-              >>> json_encode.return_value = u'{"a": "b"}'
-              >>> r = normaliser.normalise({'a': u'b'})
+              >>> json_encode.return_value = u'{"a": "\\xe9"}'
+              >>> r = normaliser.normalise({'a': u'\\xe9'})
               >>> r.unicode_body
-              u'{"a": "b"}'
+              u'{"a": "\\xe9"}'
           
         """
         
@@ -195,11 +392,24 @@ class DefaultToJSONResponseNormaliser(object):
             self.response.body = handler_response
         elif isinstance(handler_response, unicode):
             self.response.unicode_body = handler_response
+        elif isinstance(handler_response, JSONArrayStream):
+            self.response.content_type = self._json_content_type
+            self.response.app_iter = _iter_json_array(
+                handler_response.records, 
+                self._encode_json, 
+                self._json_charset
+            )
+            self.response.content_length = None
+        elif hasattr(handler_response, '__iter__') and \
+                not isinstance(handler_response, (list, tuple, dict)):
+            charset = self.response.charset or 'utf-8'
+            self.response.app_iter = _encode_chunks(handler_response, charset)
+            self.response.content_length = None
         elif handler_response is None: # leave self.response alone
             pass
         else: # assume it's json data
             self.response.content_type = self._json_content_type
-            json_string = self._json_encode(handler_response)
+            json_string = self._encode_json(handler_response)
             if isinstance(json_string, str):
                 self.response.body = json_string
             else: # isinstance(json_string, unicode):
@@ -49,6 +49,47 @@ class XSRFError(ValueError):
     """
     
 
+class _lazy_attribute(object):
+    """ Decorates a method so that it is called the first time the attribute 
+      with the same name is accessed and the return value is stored as an
+      instance attribute, i.e.: it's only ever called once and the attribute
+      can still be set directly::
+      
+          >>> class Foo(object):
+          ...     @_lazy_attribute
+          ...     def bar(self):
+          ...         print 'called'
+          ...         return 'bar'
+          ...     
+          ... 
+          >>> foo = Foo()
+          >>> foo.bar
+          called
+          'bar'
+          >>> foo.bar
+          'bar'
+          >>> foo.bar = 'baz'
+          >>> foo.bar
+          'baz'
+      
+    """
+    
+    def __init__(self, method):
+        self._method = method
+        self.__name__ = method.__name__
+        self.__doc__ = method.__doc__
+        
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self._method(instance)
+        instance.__dict__[self.__name__] = value
+        return value
+        
+    
+    
+
 class BaseHandler(object):
     """ A request handler (aka view class) implementation.
     """
@@ -70,59 +111,29 @@ class BaseHandler(object):
             method_selector_adapter=None,
             response_normaliser_adapter=None
         ):
-        """
+        """ Adapters that aren't passed in are looked up from the 
+          :py:mod:`~weblayer.component` ``registry``, with the factories 
+          cached against the request handler class.
+          
+          Apart from the method selector, the adapters aren't called until
+          the attribute they provide is first accessed.
         """
         
         self.request = request
         self.response = response
         self.settings = settings
         
-        if template_renderer_adapter is None:
-            self.template_renderer = registry.getAdapter(
-                self.settings, 
-                ITemplateRenderer
-            )
-        else:
-            self.template_renderer = template_renderer_adapter(self.settings)
-        
-        if static_url_generator_adapter is None:
-            self.static = registry.getMultiAdapter((
-                    self.request, 
-                    self.settings
-                ),
-                IStaticURLGenerator
-            )
-        else:
-            self.static = static_url_generator_adapter(
-                self.request, 
-                self.settings
-            )
-        
-        if authentication_manager_adapter is None:
-            self.auth = registry.getAdapter(
-                self.request, 
-                IAuthenticationManager
-            )
-        else:
-            self.auth = authentication_manager_adapter(self.request)
-        
-        if secure_cookie_wrapper_adapter is None:
-            self.cookies = registry.getMultiAdapter((
-                    self.request,
-                    self.response,
-                    self.settings
-                ),
-                ISecureCookieWrapper
-            )
-        else:
-            self.cookies = secure_cookie_wrapper_adapter(
-                self.request,
-                self.response,
-                self.settings
-            )
+        self._template_renderer_adapter = template_renderer_adapter
+        self._static_url_generator_adapter = static_url_generator_adapter
+        self._authentication_manager_adapter = authentication_manager_adapter
+        self._secure_cookie_wrapper_adapter = secure_cookie_wrapper_adapter
         
         if method_selector_adapter is None:
-            self._method_selector = registry.getAdapter(self, IMethodSelector)
+            self._method_selector = registry.getCachedAdapter(
+                self, 
+                IMethodSelector,
+                self.__class__
+            )
         else:
             self._method_selector = method_selector_adapter(self)
         
@@ -154,9 +165,10 @@ class BaseHandler(object):
                     handler_response = self.handle_system_error(err)
             
         if self._response_normaliser_adapter is None:
-            response_normaliser = registry.getAdapter(
+            response_normaliser = registry.getCachedAdapter(
                 self.response, 
-                IResponseNormaliser
+                IResponseNormaliser,
+                self.__class__
             )
         else:
             response_normaliser = self._response_normaliser_adapter(
@@ -167,6 +179,74 @@ class BaseHandler(object):
         
     
     
+    @_lazy_attribute
+    def template_renderer(self):
+        """ Template renderer, adapted from ``self.settings``.
+        """
+        
+        if self._template_renderer_adapter is None:
+            return registry.getCachedAdapter(
+                self.settings, 
+                ITemplateRenderer,
+                self.__class__
+            )
+        return self._template_renderer_adapter(self.settings)
+        
+    
+    @_lazy_attribute
+    def static(self):
+        """ Static url generator, adapted from ``self.request`` and 
+          ``self.settings``.
+        """
+        
+        if self._static_url_generator_adapter is None:
+            return registry.getCachedMultiAdapter((
+                    self.request, 
+                    self.settings
+                ),
+                IStaticURLGenerator,
+                self.__class__
+            )
+        return self._static_url_generator_adapter(self.request, self.settings)
+        
+    
+    @_lazy_attribute
+    def auth(self):
+        """ Authentication manager, adapted from ``self.request``.
+        """
+        
+        if self._authentication_manager_adapter is None:
+            return registry.getCachedAdapter(
+                self.request, 
+                IAuthenticationManager,
+                self.__class__
+            )
+        return self._authentication_manager_adapter(self.request)
+        
+    
+    @_lazy_attribute
+    def cookies(self):
+        """ Secure cookie wrapper, adapted from ``self.request``,
+          ``self.response`` and ``self.settings``.
+        """
+        
+        if self._secure_cookie_wrapper_adapter is None:
+            return registry.getCachedMultiAdapter((
+                    self.request,
+                    self.response,
+                    self.settings
+                ),
+                ISecureCookieWrapper,
+                self.__class__
+            )
+        return self._secure_cookie_wrapper_adapter(
+            self.request,
+            self.response,
+            self.settings
+        )
+        
+    
+    
     @property
     def xsrf_token(self):
         """ A token we can check to prevent `XSRF`_ attacks.
@@ -216,9 +296,8 @@ class BaseHandler(object):
         
     
     
-    def render(self, tmpl_name, **kwargs):
-        """ Render the template called ``tmpl_name``, passing through the
-          ``params`` and ``kwargs``.
+    def _template_params(self, kwargs):
+        """ Returns the default template ``params``, updated with ``kwargs``.
         """
         
         params = dict(
@@ -228,9 +307,29 @@ class BaseHandler(object):
             xsrf_input=self.xsrf_input
         )
         params.update(kwargs)
+        return params
+        
+    
+    def render(self, tmpl_name, **kwargs):
+        """ Render the template called ``tmpl_name``, passing through the
+          ``params`` and ``kwargs``.
+        """
+        
+        params = self._template_params(kwargs)
         return self.template_renderer.render(tmpl_name, **params)
         
     
+    def stream(self, tmpl_name, **kwargs):
+        """ Render the template called ``tmpl_name`` as an iterable of 
+          encoded chunks, passing through the ``params`` and ``kwargs``.
+          Return the result from a request handler method to send it as the
+          ``response.app_iter``.
+        """
+        
+        params = self._template_params(kwargs)
+        return self.template_renderer.stream(tmpl_name, **params)
+        
+    
     def redirect(self, location, permanent=False, **kwargs):
         """ Redirect to ``location``.  The response status defaults to ``302``
           unless ``permanent`` is ``True``.
@@ -276,11 +375,15 @@ class BaseHandler(object):
     
     
     def handle_method_not_found(self, method_name):
-        """ Log a warning and return "405 Method Not Allowed".
+        """ Log a warning and return "405 Method Not Allowed", with an
+          ``Allow`` header if the method selector provides one.
         """
         
         logging.warning(u'%s method not found' % method_name)
-        return self.error(status=405)
+        allow = getattr(self._method_selector, 'allow', None)
+        if allow is None:
+            return self.error(status=405)
+        return self.error(status=405, headers=[('Allow', allow)])
         
     
     def handle_xsrf_error(self, err):
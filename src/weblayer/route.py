@@ -51,20 +51,87 @@
       >>> path_router.match('/')
       (None, None, None)
   
+  If you pass ``converters``, patterns can also declare
+  ``<name:converter>`` placeholders, which are compiled into named groups and
+  returned as ``kwargs``, converted to Python values using the named
+  converter::
+  
+      >>> class DummyItem(object):
+      ...     implements(IRequestHandler)
+      ... 
+      >>> path_router = RegExpPathRouter(
+      ...     [(r'/items/<item_id:int>/<name:slug>', DummyItem)],
+      ...     converters={}
+      ... )
+      >>> path_router.match('/items/42/foo-bar') == (
+      ...     DummyItem, 
+      ...     (), 
+      ...     {'item_id': 42, 'name': 'foo-bar'}
+      ... )
+      True
+      >>> path_router.match('/items/foo/bar')
+      (None, None, None)
+  
+  The converters available by default are::
+  
+      CONVERTERS = {
+          'int': (r'\d+', int),
+          'path': (r'.+', None),
+          'slug': (r'[-a-zA-Z0-9_]+', None),
+          'string': (r'[^/]+', None),
+          'uuid': (r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}', UUID)
+      }
+  
+  With ``<name>`` using the ``'string'`` converter and ``converters``
+  extending or overriding ``CONVERTERS``.  To use named groups in 
+  regular expression patterns as ``kwargs``, pass ``named_groups_as_kwargs``::
+  
+      >>> path_router = RegExpPathRouter(
+      ...     [(r'/items/(?P<item_id>\d+)/(\w+)', DummyItem)],
+      ...     named_groups_as_kwargs=True
+      ... )
+      >>> path_router.match('/items/42/foo') == (
+      ...     DummyItem, 
+      ...     ('foo',), 
+      ...     {'item_id': '42'}
+      ... )
+      True
+  
   .. _`regular expression`: http://docs.python.org/library/re.html
 """
 
 __all__ = [
+    'CombinedRegExpPathRouter',
+    'LRUCachedPathRouter',
+    'PrefixTriePathRouter',
     'RegExpPathRouter'
 ]
 
 import re
 
+from uuid import UUID
+
 from zope.interface import implements
 
 from interfaces import IPathRouter, IRequestHandler
+from utils import LRUCache
 
 _RE_TYPE = type(re.compile(r''))
+_NUMBERED_BACKREFERENCE = re.compile(r'\\[1-9]')
+_MAX_GROUPS = 99
+_SPECIAL_CHARS = '.^$*+?{}[]|()'
+_OPTIONAL_QUANTIFIERS = '*?{'
+_PLACEHOLDER = re.compile(r'(?<!\(\?P)<([a-zA-Z_]\w*)(?::(\w+))?>')
+
+CONVERTERS = {
+    'int': (r'\d+', int),
+    'path': (r'.+', None),
+    'slug': (r'[-a-zA-Z0-9_]+', None),
+    'string': (r'[^/]+', None),
+    'uuid': (r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}', UUID)
+}
+
+
 def _compile_top_and_tailed(string_or_compiled_pattern):
     """ If ``string_or_compiled_pattern`` is a compiled pattern,
       just return it::
@@ -113,6 +180,160 @@ def _compile_top_and_tailed(string_or_compiled_pattern):
     return re.compile(s)
     
 
+def _literal_prefix(regexp):
+    """ Returns the literal text that any path ``regexp`` matches must start
+      with, up to and including the last ``'/'``, as the same type of string
+      as the pattern::
+      
+          >>> _literal_prefix(re.compile(r'^/api/v2/users/(\d+)$'))
+          '/api/v2/users/'
+          >>> _literal_prefix(re.compile(r'^/api/v2/use'))
+          '/api/v2/'
+          >>> _literal_prefix(re.compile(r'^/(.*)$'))
+          '/'
+      
+      Escaped characters are literal, unless they're character classes::
+      
+          >>> _literal_prefix(re.compile(r'^/foo\.js/bar\/baz/'))
+          '/foo.js/bar/baz/'
+          >>> _literal_prefix(re.compile(r'^/foo/\d/'))
+          '/foo/'
+      
+      Characters made optional by a quantifier don't count::
+      
+          >>> _literal_prefix(re.compile(r'^/foo/?bar/'))
+          '/'
+      
+      Patterns that use alternation or flags that change what literal text
+      matches have no prefix::
+      
+          >>> _literal_prefix(re.compile(r'^/foo/|/bar/'))
+          ''
+          >>> _literal_prefix(re.compile(r'^/foo/', re.I))
+          ''
+      
+    """
+    
+    pattern = regexp.pattern
+    if regexp.flags & (re.IGNORECASE | re.VERBOSE) or '|' in pattern:
+        return pattern[:0]
+    
+    literal = []
+    i = pattern.startswith('^') and 1 or 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            char = pattern[i + 1:i + 2]
+            if not char or char.isalnum():
+                break
+            literal.append(char)
+            i += 2
+        elif char in _SPECIAL_CHARS:
+            if char in _OPTIONAL_QUANTIFIERS and literal:
+                literal.pop()
+            break
+        else:
+            literal.append(char)
+            i += 1
+    
+    literal = pattern[:0].join(literal)
+    return literal[:literal.rfind('/') + 1]
+    
+
+def _expand_placeholders(pattern, converters):
+    """ Expands ``<name:converter>`` placeholders in ``pattern`` into named
+      groups, returning the expanded pattern and a dict mapping each name to
+      its converter's ``to_python`` function::
+      
+          >>> pattern, to_python = _expand_placeholders(
+          ...     r'/<a:int>/<b>/(?P<c>.*)', 
+          ...     CONVERTERS
+          ... )
+          >>> pattern
+          '/(?P<a>\\\\d+)/(?P<b>[^/]+)/(?P<c>.*)'
+          >>> to_python == {'a': int, 'b': None}
+          True
+      
+      Unknown converters raise a ``ValueError``::
+      
+          >>> _expand_placeholders(r'/<a:foo>', CONVERTERS)
+          Traceback (most recent call last):
+          ...
+          ValueError: Unknown converter `foo`
+      
+    """
+    
+    to_python = {}
+    
+    def expand(match):
+        name, converter = match.group(1), match.group(2) or 'string'
+        if not converter in converters:
+            raise ValueError(u'Unknown converter `%s`' % converter)
+        regexp, to_python[name] = converters[converter]
+        return '(?P<%s>%s)' % (name, regexp)
+        
+    
+    return _PLACEHOLDER.sub(expand, pattern), to_python
+    
+
+def _arguments_spec(regexp, to_python):
+    """ Returns a ``(positional, named)`` tuple that describes how to build
+      ``args`` and ``kwargs`` from ``regexp``'s match groups, where 
+      ``positional`` is the (zero based) indexes of the unnamed groups and 
+      ``named`` is a tuple of ``(name, index, to_python)`` for each named
+      group::
+      
+          >>> regexp = re.compile(r'/(?P<a>\d+)/(\w+)/(?P<b>\w+)')
+          >>> _arguments_spec(regexp, {'a': int})
+          ((1,), (('a', 0, <type 'int'>), ('b', 2, None)))
+      
+    """
+    
+    named_indexes = {}
+    for name, index in regexp.groupindex.iteritems():
+        named_indexes[index - 1] = name
+    
+    positional = []
+    named = []
+    for index in range(regexp.groups):
+        if index in named_indexes:
+            name = named_indexes[index]
+            named.append((name, index, to_python.get(name)))
+        else:
+            positional.append(index)
+    
+    return tuple(positional), tuple(named)
+    
+
+def _arguments(groups, offset, spec):
+    """ Uses ``spec`` (see :py:func:`_arguments_spec`) to build ``args`` and
+      ``kwargs`` from the match ``groups``, starting at ``offset``::
+      
+          >>> spec = ((1,), (('a', 0, int), ('b', 2, None)))
+          >>> _arguments(('x', '1', 'foo', 'bar'), 1, spec)
+          (('foo',), {'a': 1, 'b': 'bar'})
+      
+      Unmatched named groups are passed through as ``None``::
+      
+          >>> _arguments((None, 'foo', None), 0, spec)
+          (('foo',), {'a': None, 'b': None})
+      
+    """
+    
+    positional, named = spec
+    
+    args = tuple([groups[offset + index] for index in positional])
+    
+    kwargs = {}
+    for name, index, to_python in named:
+        value = groups[offset + index]
+        if to_python is not None and value is not None:
+            value = to_python(value)
+        kwargs[name] = value
+    
+    return args, kwargs
+    
+
 
 class RegExpPathRouter(object):
     """ Routes paths to request handlers using regexp patterns.
@@ -120,7 +341,13 @@ class RegExpPathRouter(object):
     
     implements(IPathRouter)
     
-    def __init__(self, raw_mapping, compile_=None):
+    def __init__(
+            self, 
+            raw_mapping, 
+            compile_=None, 
+            converters=None,
+            named_groups_as_kwargs=False
+        ):
         """ Takes a list of raw regular expressions mapped to request 
           handler classes, compiles the regular expressions and 
           provides ``self._mapping``.
@@ -170,10 +397,52 @@ class RegExpPathRouter(object):
               ...
               TypeError: `<class ... must implement ....IRequestHandler>`
           
+          If ``converters`` is passed, ``<name:converter>`` placeholders in
+          string patterns are expanded before they're compiled, using
+          ``converters`` to extend or override the default ``CONVERTERS``::
+          
+              >>> converters = {'year': (r'\d{4}', int)}
+              >>> path_router = RegExpPathRouter(
+              ...     [(r'/<year:year>', MockHandler)],
+              ...     converters=converters
+              ... )
+              >>> path_router._mapping[0][0].pattern
+              '^/(?P<year>\\\\d{4})$'
+          
+          Otherwise patterns are compiled as they are, so hand written
+          regular expressions containing a literal ``<...>`` keep matching
+          literally::
+          
+              >>> path_router = RegExpPathRouter([(r'/<year>', MockHandler)])
+              >>> path_router._mapping[0][0].pattern
+              '^/<year>$'
+              >>> path_router.match('/<year>') == (MockHandler, (), {})
+              True
+              >>> path_router.match('/2011')
+              (None, None, None)
+          
+          The third item of each entry in ``self._mapping`` is the spec used to
+          build ``args`` and ``kwargs`` from the match groups, which is 
+          ``None`` unless the pattern contains placeholders or 
+          ``named_groups_as_kwargs`` is ``True``::
+          
+              >>> path_router = RegExpPathRouter(
+              ...     [(r'/<year:year>', MockHandler)],
+              ...     converters=converters
+              ... )
+              >>> path_router._mapping[0][2]
+              ((), (('year', 0, <type 'int'>),))
+              >>> path_router = RegExpPathRouter([(r'/(\d+)', MockHandler)])
+              >>> path_router._mapping[0][2] is None
+              True
+          
         """
         
         compile_ = compile_ is None and _compile_top_and_tailed or compile_
         
+        if converters is not None:
+            converters = dict(CONVERTERS, **converters)
+        
         self._mapping = []
         
         for regexp, handler_class in raw_mapping:
@@ -184,7 +453,17 @@ class RegExpPathRouter(object):
                 )
                 raise TypeError(error_msg)
             
-            self._mapping.append((compile_(regexp), handler_class))
+            to_python = {}
+            if converters is not None and isinstance(regexp, basestring):
+                regexp, to_python = _expand_placeholders(regexp, converters)
+            
+            compiled = compile_(regexp)
+            
+            spec = None
+            if to_python or named_groups_as_kwargs:
+                spec = _arguments_spec(compiled, to_python)
+            
+            self._mapping.append((compiled, handler_class, spec))
             
         
     
@@ -197,19 +476,484 @@ class RegExpPathRouter(object):
               >>> path_router = RegExpPathRouter([])
               >>> handler_class, args, kwargs = path_router.match('/foo')
           
+          Unless the pattern has an arguments spec, in which case named groups
+          are returned as ``kwargs`` (see :py:func:`_arguments_spec`).
+          
           Otherwise return ``(None, None, None)``.
           
           .. _`regular expression`: http://docs.python.org/library/re.html
           .. _`groups`: http://docs.python.org/library/re.html#re.MatchObject.groups
         """
         
-        for regexp, handler_class in self._mapping:
+        for regexp, handler_class, spec in self._mapping:
             match = regexp.match(path)
             if match:
-                return handler_class, match.groups(), {}
+                if spec is None:
+                    return handler_class, match.groups(), {}
+                args, kwargs = _arguments(match.groups(), 0, spec)
+                return handler_class, args, kwargs
         
         return None, None, None
         
     
     
 
+class CombinedRegExpPathRouter(RegExpPathRouter):
+    """ Routes paths to request handlers by combining the mapping's regexp
+      patterns into as few alternations as possible, so that a single
+      ``match`` call picks the first matching entry::
+      
+          >>> class DummyIndex(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class DummyItem(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class Dummy404(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> mapping = [
+          ...     (r'/', DummyIndex),
+          ...     (r'/items/(\d+)/(\w+)', DummyItem),
+          ...     (r'/(.*)', Dummy404)
+          ... ]
+          >>> path_router = CombinedRegExpPathRouter(mapping)
+          >>> len(path_router._combined)
+          1
+      
+      Matches return exactly what :py:class:`RegExpPathRouter` would::
+      
+          >>> path_router.match('/') == (DummyIndex, (), {})
+          True
+          >>> path_router.match('/items/1/foo') == (DummyItem, ('1', 'foo'), {})
+          True
+          >>> path_router.match('/items/a/foo') == (Dummy404, ('items/a/foo',), {})
+          True
+      
+      Including looking the mapping items up in order::
+      
+          >>> mapping.reverse()
+          >>> path_router = CombinedRegExpPathRouter(mapping)
+          >>> path_router.match('/') == (Dummy404, ('',), {})
+          True
+          >>> path_router = CombinedRegExpPathRouter([])
+          >>> path_router.match('/')
+          (None, None, None)
+      
+      Python's `regular expression`_ engine limits the number of groups in a
+      pattern (to ``99`` in Python 2), so large mappings are split into
+      several alternations of at most ``max_groups`` groups each::
+      
+          >>> mapping = [(r'/%d/(\d+)' % i, DummyItem) for i in range(10)]
+          >>> path_router = CombinedRegExpPathRouter(mapping, max_groups=8)
+          >>> len(path_router._combined)
+          3
+          >>> path_router.match('/9/42') == (DummyItem, ('42',), {})
+          True
+      
+      ``max_groups`` defaults to that limit.  Each pattern takes one group
+      to wrap it, plus its own groups, so ``99`` patterns without groups fit
+      in one alternation and the ``100th`` starts another::
+      
+          >>> mapping = [(r'/r%d' % i, DummyIndex) for i in range(100)]
+          >>> path_router = CombinedRegExpPathRouter(mapping)
+          >>> [item[0].groups for item in path_router._combined]
+          [99, 1]
+          >>> path_router.match('/r99') == (DummyIndex, (), {})
+          True
+          >>> mapping = [(r'/r%d/(\d)/(\w)' % i, DummyItem) for i in range(34)]
+          >>> path_router = CombinedRegExpPathRouter(mapping)
+          >>> [item[0].groups for item in path_router._combined]
+          [99, 3]
+          >>> path_router.match('/r33/1/a') == (DummyItem, ('1', 'a'), {})
+          True
+      
+      Patterns that can't safely be combined with their neighbours (because
+      they use numbered backreferences, different flags or clashing group
+      names) are matched on their own::
+      
+          >>> mapping = [
+          ...     (r'/(\w+)/\\1', DummyItem),
+          ...     (re.compile(r'^/FOO$', re.I), DummyIndex),
+          ...     (r'/(?P<name>\w+)', DummyItem),
+          ...     (r'/a/(?P<name>\w+)', Dummy404),
+          ... ]
+          >>> path_router = CombinedRegExpPathRouter(mapping)
+          >>> len(path_router._combined)
+          4
+          >>> path_router.match('/a/a') == (DummyItem, ('a',), {})
+          True
+          >>> path_router.match('/foo') == (DummyIndex, (), {})
+          True
+          >>> path_router.match('/a/b') == (Dummy404, ('b',), {})
+          True
+      
+      .. _`regular expression`: http://docs.python.org/library/re.html
+    """
+    
+    def __init__(
+            self, 
+            raw_mapping, 
+            compile_=None, 
+            max_groups=_MAX_GROUPS,
+            **kwargs
+        ):
+        """ Compiles ``raw_mapping`` into ``self._mapping`` as per
+          :py:class:`RegExpPathRouter` and then combines the compiled
+          patterns into ``self._combined``.
+        """
+        
+        RegExpPathRouter.__init__(self, raw_mapping, compile_=compile_, **kwargs)
+        
+        self._combined = []
+        
+        chunk = []
+        for entry in self._mapping:
+            regexp = entry[0]
+            if not self._is_combinable(regexp, max_groups):
+                self._add_chunk(chunk)
+                self._combined.append((regexp, None, entry))
+                chunk = []
+            elif not self._fits_chunk(chunk, regexp, max_groups):
+                self._add_chunk(chunk)
+                chunk = [entry]
+            else:
+                chunk.append(entry)
+        self._add_chunk(chunk)
+        
+    
+    def _is_combinable(self, regexp, max_groups):
+        """ Can ``regexp`` be wrapped in a group and alternated with others?
+        """
+        
+        if regexp.groups + 1 > max_groups:
+            return False
+        return not _NUMBERED_BACKREFERENCE.search(regexp.pattern)
+        
+    
+    def _fits_chunk(self, chunk, regexp, max_groups):
+        """ Can ``regexp`` be added to the alternation ``chunk``?
+        """
+        
+        if not chunk:
+            return True
+        
+        if chunk[0][0].flags != regexp.flags:
+            return False
+        
+        groups = regexp.groups + 1
+        names = set(regexp.groupindex)
+        for entry in chunk:
+            item = entry[0]
+            groups += item.groups + 1
+            if names.intersection(item.groupindex):
+                return False
+        return groups <= max_groups
+        
+    
+    def _add_chunk(self, chunk):
+        """ Compile ``chunk`` into a single alternation, with each pattern
+          wrapped in a group, and store it in ``self._combined`` along with a
+          lookup from the index of each wrapping group to the handler class,
+          the slice of ``match.groups()`` the pattern's own groups occupy and
+          the pattern's arguments spec.
+        """
+        
+        if not chunk:
+            return
+        
+        patterns = []
+        lookup = {}
+        
+        index = 1
+        for regexp, handler_class, spec in chunk:
+            patterns.append('(%s)' % regexp.pattern)
+            lookup[index] = (handler_class, index, index + regexp.groups, spec)
+            index += regexp.groups + 1
+        
+        combined = re.compile('|'.join(patterns), chunk[0][0].flags)
+        self._combined.append((combined, lookup, None))
+        
+    
+    def match(self, path):
+        """ Try each alternation in ``self._combined`` in turn.  When one
+          matches, ``match.lastindex`` is the index of the wrapping group of
+          the pattern that matched, which is used to find the handler class
+          and the groups to return.
+          
+          Otherwise return ``(None, None, None)``.
+        """
+        
+        for regexp, lookup, entry in self._combined:
+            match = regexp.match(path)
+            if match:
+                if lookup is None:
+                    handler_class, start, end, spec = entry[1], 0, None, entry[2]
+                else:
+                    handler_class, start, end, spec = lookup[match.lastindex]
+                if spec is None:
+                    return handler_class, match.groups()[start:end], {}
+                args, kwargs = _arguments(match.groups(), start, spec)
+                return handler_class, args, kwargs
+        
+        return None, None, None
+        
+    
+    
+
+class PrefixTriePathRouter(RegExpPathRouter):
+    """ Routes paths to request handlers using regexp patterns, indexed by the
+      literal path segments each pattern starts with, so that only the
+      patterns whose prefix matches the request path are tried::
+      
+          >>> class DummyIndex(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class DummyUser(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class DummyPost(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class Dummy404(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> mapping = [
+          ...     (r'/', DummyIndex),
+          ...     (r'/api/v2/users/(\d+)', DummyUser),
+          ...     (r'/api/v2/posts/(\d+)', DummyPost),
+          ...     (r'/(.*)', Dummy404)
+          ... ]
+          >>> path_router = PrefixTriePathRouter(mapping)
+      
+      Only the candidate patterns are tried, in mapping order::
+      
+          >>> path_router._candidates('/api/v2/users/1')
+          [0, 1, 3]
+          >>> path_router._candidates('/foo')
+          [0, 3]
+      
+      Matches return exactly what :py:class:`RegExpPathRouter` would::
+      
+          >>> path_router.match('/') == (DummyIndex, (), {})
+          True
+          >>> path_router.match('/api/v2/users/1') == (DummyUser, ('1',), {})
+          True
+          >>> path_router.match('/api/v2/posts/2') == (DummyPost, ('2',), {})
+          True
+          >>> path_router.match('/api/v2/users/') == (
+          ...     Dummy404, 
+          ...     ('api/v2/users/',), 
+          ...     {}
+          ... )
+          True
+      
+      Including looking the mapping items up in order::
+      
+          >>> mapping.reverse()
+          >>> path_router = PrefixTriePathRouter(mapping)
+          >>> path_router.match('/api/v2/users/1') == (
+          ...     Dummy404, 
+          ...     ('api/v2/users/1',), 
+          ...     {}
+          ... )
+          True
+          >>> path_router = PrefixTriePathRouter([(r'/foo', DummyIndex)])
+          >>> path_router.match('/bar')
+          (None, None, None)
+      
+    """
+    
+    def __init__(self, raw_mapping, compile_=None, **kwargs):
+        """ Compiles ``raw_mapping`` into ``self._mapping`` as per
+          :py:class:`RegExpPathRouter` and then builds ``self._trie``, a tree
+          of ``[children, indexes]`` nodes keyed by path segment, where
+          ``indexes`` lists the positions in ``self._mapping`` of the patterns
+          whose literal prefix ends at that node.
+        """
+        
+        RegExpPathRouter.__init__(self, raw_mapping, compile_=compile_, **kwargs)
+        
+        self._trie = [{}, []]
+        
+        for index, entry in enumerate(self._mapping):
+            node = self._trie
+            for segment in _literal_prefix(entry[0]).split('/')[:-1]:
+                node = node[0].setdefault(segment, [{}, []])
+            node[1].append(index)
+            
+        
+        
+    
+    def _candidates(self, path):
+        """ Returns the sorted indexes of the patterns whose literal prefix
+          ``path`` starts with.
+        """
+        
+        node = self._trie
+        candidates = node[1]
+        
+        walked = False
+        for segment in path.split('/')[:-1]:
+            node = node[0].get(segment)
+            if node is None:
+                break
+            if node[1]:
+                if not walked:
+                    candidates = candidates[:]
+                    walked = True
+                candidates.extend(node[1])
+        
+        if walked:
+            candidates.sort()
+        return candidates
+        
+    
+    def match(self, path):
+        """ Try the candidate patterns for ``path`` in order.  If one matches,
+          return the handler class, match groups and an empty dict, unless 
+          the pattern has an arguments spec, in which case named groups are
+          returned as ``kwargs``, converted to Python values (see
+          :py:func:`_arguments_spec`), as per 
+          :py:meth:`RegExpPathRouter.match`.
+          
+          Otherwise return ``(None, None, None)``.
+        """
+        
+        for index in self._candidates(path):
+            regexp, handler_class, spec = self._mapping[index]
+            match = regexp.match(path)
+            if match:
+                if spec is None:
+                    return handler_class, match.groups(), {}
+                args, kwargs = _arguments(match.groups(), 0, spec)
+                return handler_class, args, kwargs
+        
+        return None, None, None
+        
+    
+    
+
+
+class LRUCachedPathRouter(object):
+    """ Wraps any :py:class:`~weblayer.interfaces.IPathRouter` to memoise
+      its matches in a thread safe, size bounded, least recently used cache::
+      
+          >>> class DummyIndex(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> class Dummy404(object):
+          ...     implements(IRequestHandler)
+          ... 
+          >>> from mock import Mock
+          >>> path_router = RegExpPathRouter([(r'/', DummyIndex)])
+          >>> path_router.match = Mock(wraps=path_router.match)
+          >>> cached = LRUCachedPathRouter(path_router, max_size=10)
+          >>> cached.match('/') == (DummyIndex, (), {})
+          True
+          >>> cached.match('/') == (DummyIndex, (), {})
+          True
+          >>> path_router.match.call_count
+          1
+          >>> cached.hits, cached.misses
+          (1, 1)
+      
+      Paths that don't match are cached in a separate, smaller cache, so
+      requests for lots of different missing paths (e.g.: from a scanner)
+      only ever evict each other::
+      
+          >>> cached = LRUCachedPathRouter(
+          ...     path_router, 
+          ...     max_size=10,
+          ...     max_negative_size=2
+          ... )
+          >>> for i in range(100):
+          ...     result = cached.match('/missing/%d' % i)
+          ... 
+          >>> len(cached._cache), len(cached._negative_cache)
+          (0, 2)
+      
+      The same goes for paths matched by ``negative_handler_classes``, e.g.: a
+      catch all 404 handler::
+      
+          >>> path_router = RegExpPathRouter([
+          ...     (r'/', DummyIndex),
+          ...     (r'/(.*)', Dummy404)
+          ... ])
+          >>> cached = LRUCachedPathRouter(
+          ...     path_router, 
+          ...     negative_handler_classes=[Dummy404]
+          ... )
+          >>> cached.match('/foo') == (Dummy404, ('foo',), {})
+          True
+          >>> '/foo' in cached._negative_cache
+          True
+          >>> cached.match('/foo') == (Dummy404, ('foo',), {})
+          True
+      
+    """
+    
+    implements(IPathRouter)
+    
+    def __init__(
+            self, 
+            path_router, 
+            max_size=1000, 
+            max_negative_size=100,
+            negative_handler_classes=None
+        ):
+        self._path_router = path_router
+        self._cache = LRUCache(max_size=max_size)
+        self._negative_cache = LRUCache(max_size=max_negative_size)
+        if negative_handler_classes is None:
+            self._negative_handler_classes = ()
+        else:
+            self._negative_handler_classes = tuple(negative_handler_classes)
+        
+    
+    @property
+    def hits(self):
+        """ Number of matches served from the cache.
+        """
+        
+        return self._cache.hits + self._negative_cache.hits
+        
+    
+    @property
+    def misses(self):
+        """ Number of matches passed through to the wrapped path router.
+        """
+        
+        return self._negative_cache.misses
+        
+    
+    def match(self, path):
+        """ Return the cached result of matching ``path`` if there is one.
+          Otherwise match ``path`` using the wrapped path router and cache the
+          result.
+          
+          As the ``kwargs`` dict is mutable, a copy is returned.
+        """
+        
+        result = self._cache.get(path)
+        if result is None:
+            result = self._negative_cache.get(path)
+        
+        if result is None:
+            result = self._path_router.match(path)
+            handler_class = result[0]
+            if handler_class is None or (
+                    handler_class in self._negative_handler_classes
+                ):
+                self._negative_cache.set(path, result)
+            else:
+                self._cache.set(path, result)
+        
+        handler_class, args, kwargs = result
+        if kwargs is not None:
+            kwargs = dict(kwargs)
+        return handler_class, args, kwargs
+        
+    
+    
+
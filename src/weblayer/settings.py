@@ -313,7 +313,7 @@ class RequirableSettings(object, DictMixin):
         """
         
         missing = []
-        for k, v in self.__required_settings__.iteritems():
+        for k, v in sorted(self.__required_settings__.iteritems()):
             if not k in items:
                 default = v[0]
                 if default is not None:
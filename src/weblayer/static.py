@@ -22,8 +22,10 @@
       >>> settings['static_files_path'] = static_files_path
       >>> settings['static_url_prefix'] = u'/static/'
       >>> MemoryCachedStaticURLGenerator._cache = {}
-      >>> static = MemoryCachedStaticURLGenerator(request, settings)
-      >>> static._cache_path = Mock()
+      >>> class MockCachedStaticURLGenerator(MemoryCachedStaticURLGenerator):
+      ...     _cache_path = Mock()
+      ... 
+      >>> static = MockCachedStaticURLGenerator(request, settings)
   
   When :py:meth:`~MemoryCachedStaticURLGenerator.get_url` is called, it looks
   for a file at the ``path`` passed in, relative to 
@@ -43,7 +45,7 @@
   be requested on (if this is different from the request url)::
   
       >>> settings['static_host_url'] = 'http://static.foo.com'
-      >>> static = MemoryCachedStaticURLGenerator(request, settings)
+      >>> static = MockCachedStaticURLGenerator(request, settings)
       >>> static.get_url('foo.js')
       u'http://static.foo.com/static/foo.js?v=abcdefg'
   
@@ -63,13 +65,41 @@
   :py:class:`~weblayer.static.MemoryCachedStaticURLGenerator` and overriding
   the :py:meth:`~MemoryCachedStaticURLGenerator._cache_path` method).
   
+  :py:class:`StoreCachedStaticURLGenerator` is one such implementation.  It
+  shares digests between processes using an 
+  :py:class:`~weblayer.interfaces.IStaticDigestStore`, so each file is hashed 
+  once per host and new worker processes start with a warm cache.  Set 
+  ``settings['static_digest_store']`` to ``'sqlite'`` (the default) or 
+  ``'mmap'`` to store the digests in the file at 
+  ``settings['static_digest_store_path']`` or pass in your own
+  :py:class:`~weblayer.interfaces.IStaticDigestStore` (e.g.: one backed by
+  `redis`_).  There's no default path: it should be in a directory only the
+  application's user can write to.  The file is created readable and 
+  writable by its owner only and the built in stores refuse to use a file
+  that's owned by another user or that other users can write to.
+  
+  To avoid hashing files inside live requests, the digests can be computed
+  up front, in parallel, and written to a JSON manifest using 
+  :py:func:`build_manifest` and :py:func:`write_manifest` (or the
+  ``weblayer-build-static-manifest`` command line script).  Pass
+  ``load_static_manifest=True`` to the 
+  :py:class:`~weblayer.bootstrap.Bootstrapper` to load the manifest at
+  ``settings['static_manifest_path']`` into the cache at startup (see
+  :py:meth:`MemoryCachedStaticURLGenerator.load_manifest`), so that every
+  worker process serves identical versions.
+  
+  Cached digests are invalidated when a file's size, modification time or
+  inode changes.  To keep this cheap, each file is stat'd at most once every
+  ``settings['static_check_interval']`` seconds (which defaults to ``2``).
+  Set it to ``0`` to check on every call or ``None`` to never check.
+  
   .. note::
   
       Alternative implementations must consider invalidating the hash
-      digests when files change.  One benefit of the default 
-      :py:class:`~weblayer.static.MemoryCachedStaticURLGenerator` implementation
-      is that, as hash digests are invalidated when the application restarts,
-      deployment setups that watch for changes to the underlying source code and 
+      digests when files change.  As well as checking file signatures, the
+      default :py:class:`~weblayer.static.MemoryCachedStaticURLGenerator`
+      implementation invalidates hash digests when the application restarts,
+      so deployment setups that watch for changes to the underlying source code and 
       restart when files change cause the cache to be invalidated.
       
       For example, one way to integrate with `paste.reloader`_ so it reloaded your
@@ -93,27 +123,208 @@
 """
 
 __all__ = [
-    'MemoryCachedStaticURLGenerator'
+    'MemoryCachedStaticURLGenerator',
+    'MmapStaticDigestStore',
+    'SQLiteStaticDigestStore',
+    'StoreCachedStaticURLGenerator',
+    'build_manifest',
+    'read_manifest',
+    'write_manifest'
 ]
 
 import logging
-from os.path import join
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+try: # pragma: no cover
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None
+
+from optparse import OptionParser
+from os import stat
+from os.path import exists, join
 
 from zope.component import adapts
 from zope.interface import implements
 
-from interfaces import IRequest, ISettings, IStaticURLGenerator
+from interfaces import IRequest, ISettings
+from interfaces import IStaticDigestStore, IStaticURLGenerator
 from settings import require_setting
-from utils import generate_hash
+from utils import encode_to_utf8, generate_hash, json_decode, json_encode
 
 require_setting('static_files_path')
 require_setting('static_url_prefix', default=u'/static/')
+require_setting('static_check_interval', default=2)
+require_setting('static_hash_algorithm', default='sha512')
+require_setting('static_digest_store', default='sqlite')
+require_setting('static_manifest_path', default='')
+require_setting('static_digest_store_path', default='')
+
+def _signature(stat_result):
+    """ Returns the ``(size, mtime, inode)`` of a file's ``stat_result``::
+      
+          >>> from mock import Mock
+          >>> stat_result = Mock()
+          >>> stat_result.st_size = 1024
+          >>> stat_result.st_mtime = 1300000000.0
+          >>> stat_result.st_ino = 42
+          >>> _signature(stat_result)
+          (1024, 1300000000.0, 42)
+      
+    """
+    
+    return stat_result.st_size, stat_result.st_mtime, stat_result.st_ino
+    
+
+def _hash_file(file_path, algorithm='sha512'):
+    """ Returns the hash digest of the file at ``file_path``.
+    """
+    
+    sock = open(file_path, 'rb')
+    try:
+        return generate_hash(s=sock, algorithm=algorithm)
+    finally:
+        sock.close()
+    
+
+def build_manifest(
+        static_files_path, 
+        threads=4, 
+        algorithm='sha512', 
+        hash_file_=None
+    ):
+    """ Walk ``static_files_path``, skipping hidden files and folders, hash
+      every file with ``algorithm`` using ``threads`` threads and return a
+      dictionary mapping each file's path, relative to 
+      ``static_files_path``, to its digest::
+      
+          >>> import tempfile, shutil
+          >>> static_files_path = tempfile.mkdtemp()
+          >>> os.mkdir(join(static_files_path, 'js'))
+          >>> os.mkdir(join(static_files_path, '.svn'))
+          >>> for name in 'foo.css', 'js/bar.js', '.hidden', '.svn/baz':
+          ...     sock = open(join(static_files_path, name), 'w')
+          ...     sock.write(name)
+          ...     sock.close()
+          ... 
+          >>> manifest = build_manifest(static_files_path)
+          >>> sorted(manifest.keys())
+          ['foo.css', 'js/bar.js']
+          >>> manifest['foo.css'] == generate_hash(s='foo.css')
+          True
+          >>> manifest = build_manifest(static_files_path, algorithm='md5')
+          >>> manifest['foo.css'] == generate_hash(s='foo.css', algorithm='md5')
+          True
+      
+      Files that can't be read are left out::
+      
+          >>> def hash_file(file_path, algorithm):
+          ...     if file_path.endswith('foo.css'):
+          ...         raise IOError
+          ...     return 'digest'
+          ... 
+          >>> build_manifest(static_files_path, hash_file_=hash_file)
+          {'js/bar.js': 'digest'}
+          >>> shutil.rmtree(static_files_path)
+    
+    """
+    
+    if hash_file_ is None:
+        hash_file_ = _hash_file
+    
+    static_files_path = os.path.normpath(static_files_path)
+    
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(static_files_path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.startswith('.'):
+                continue
+            file_path = join(dirpath, filename)
+            relative_path = file_path[len(static_files_path):].lstrip(os.sep)
+            paths.append((relative_path.replace(os.sep, '/'), file_path))
+    
+    manifest = {}
+    
+    def hash_files(items):
+        for path, file_path in items:
+            try:
+                manifest[path] = hash_file_(file_path, algorithm)
+            except (IOError, OSError):
+                logging.warning(u'Couldn\'t hash static file %s' % file_path)
+        
+    
+    threads = max(1, threads)
+    workers = [
+        threading.Thread(target=hash_files, args=(paths[i::threads],))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return manifest
+    
+
+def read_manifest(manifest_path):
+    """ Read and return the manifest written to ``manifest_path``.
+    """
+    
+    sock = open(manifest_path, 'rb')
+    try:
+        return json_decode(sock.read())
+    finally:
+        sock.close()
+    
+
+def write_manifest(manifest, manifest_path):
+    """ Write ``manifest`` to ``manifest_path`` as JSON.  The manifest is
+      written to a temporary file which is then renamed, so processes reading
+      it never see a partial manifest::
+      
+          >>> import tempfile
+          >>> fd, manifest_path = tempfile.mkstemp()
+          >>> os.close(fd)
+          >>> write_manifest({'foo.js': 'abcdef'}, manifest_path)
+          >>> read_manifest(manifest_path)
+          {u'foo.js': u'abcdef'}
+          >>> os.remove(manifest_path)
+    
+    """
+    
+    tmp_path = '%s.%d.tmp' % (manifest_path, os.getpid())
+    sock = open(tmp_path, 'wb')
+    try:
+        sock.write(json_encode(manifest, sort_keys=True, indent=2))
+    finally:
+        sock.close()
+    os.rename(tmp_path, manifest_path)
+    
 
 class MemoryCachedStaticURLGenerator(object):
     """ Adapter to generate static URLs from a request.
     """
     
+    __slots__ = (
+        '_host_url', 
+        '_static_files_path', 
+        '_static_url_prefix', 
+        '_join_path', 
+        '_open_file', 
+        '_generate_hash',
+        '_stat_file',
+        '_get_time',
+        '_check_interval',
+        '_hash_algorithm'
+    )
+    
     _cache = {}
+    _stats = {}
     
     adapts(IRequest, ISettings)
     implements(IStaticURLGenerator)
@@ -124,7 +335,9 @@ class MemoryCachedStaticURLGenerator(object):
             settings,
             join_path_=None, 
             open_file_=None, 
-            generate_hash_=None
+            generate_hash_=None,
+            stat_file_=None,
+            get_time_=None
         ):
         """ ``request.host_url`` is available as ``self._host_url``::
           
@@ -207,6 +420,28 @@ class MemoryCachedStaticURLGenerator(object):
               >>> static._generate_hash
               'generate'
           
+          ``stat_file_`` and ``get_time_`` default to ``os.stat`` and
+          ``time.time`` and are available as ``self._stat_file`` and
+          ``self._get_time``::
+          
+              >>> static = MemoryCachedStaticURLGenerator(req, settings)
+              >>> static._stat_file == stat and static._get_time == time.time
+              True
+          
+          ``settings['static_check_interval']`` is available as
+          ``self._check_interval``, defaulting to ``2``::
+          
+              >>> static._check_interval
+              2
+          
+          ``settings['static_hash_algorithm']`` is available as 
+          ``self._hash_algorithm``, defaulting to ``'sha512'``.  As the
+          digests are only used for cache busting, a faster algorithm like
+          ``'md5'`` can safely be used instead::
+          
+              >>> static._hash_algorithm
+              'sha512'
+        
         """
         
         self._host_url = settings.get('static_host_url', request.host_url)
@@ -228,6 +463,103 @@ class MemoryCachedStaticURLGenerator(object):
         else:
             self._generate_hash = generate_hash_
         
+        if stat_file_ is None:
+            self._stat_file = stat
+        else:
+            self._stat_file = stat_file_
+        
+        if get_time_ is None:
+            self._get_time = time.time
+        else:
+            self._get_time = get_time_
+        
+        self._check_interval = settings.get('static_check_interval', 2)
+        self._hash_algorithm = settings.get('static_hash_algorithm', 'sha512')
+        
+    
+    @classmethod
+    def load_manifest(cls, settings, build_manifest_=None):
+        """ Load the manifest at ``settings['static_manifest_path']`` into
+          the cache.  If the manifest doesn't exist yet, it's built from
+          ``settings['static_files_path']`` and, if a manifest path is set
+          (it defaults to ``''``, i.e.: not set), written there.  Returns the
+          manifest::
+          
+              >>> import tempfile
+              >>> from mock import Mock
+              >>> build_manifest = Mock()
+              >>> build_manifest.return_value = {'foo.js': 'abcdef'}
+              >>> fd, manifest_path = tempfile.mkstemp()
+              >>> os.close(fd)
+              >>> os.remove(manifest_path)
+              >>> settings = {
+              ...     'static_files_path': '/var/www/static',
+              ...     'static_manifest_path': manifest_path
+              ... }
+              >>> MemoryCachedStaticURLGenerator.load_manifest(
+              ...     settings,
+              ...     build_manifest_=build_manifest
+              ... )
+              {'foo.js': 'abcdef'}
+              >>> build_manifest.assert_called_with(
+              ...     '/var/www/static',
+              ...     algorithm='sha512'
+              ... )
+              >>> MemoryCachedStaticURLGenerator._cache['/var/www/static/foo.js']
+              'abcdef'
+          
+          Once written, the manifest is read rather than rebuilt::
+          
+              >>> build_manifest.reset_mock()
+              >>> MemoryCachedStaticURLGenerator.load_manifest(
+              ...     settings,
+              ...     build_manifest_=build_manifest
+              ... )
+              {u'foo.js': u'abcdef'}
+              >>> build_manifest.called
+              False
+          
+          Digests loaded from a manifest are trusted, i.e.: they're not
+          invalidated when the files change.
+          
+          Cleanup::
+          
+              >>> os.remove(manifest_path)
+              >>> MemoryCachedStaticURLGenerator._cache = {}
+        
+        """
+        
+        if build_manifest_ is None:
+            build_manifest_ = build_manifest
+        
+        static_files_path = settings['static_files_path']
+        manifest_path = settings.get('static_manifest_path', '')
+        
+        if manifest_path and exists(manifest_path):
+            manifest = read_manifest(manifest_path)
+        else:
+            manifest = build_manifest_(
+                static_files_path,
+                algorithm=settings.get('static_hash_algorithm', 'sha512')
+            )
+            if manifest_path:
+                write_manifest(manifest, manifest_path)
+        
+        for path, digest in manifest.iteritems():
+            cls._cache[join(static_files_path, path)] = digest
+        return manifest
+        
+    
+    def _stat_path(self, file_path):
+        """ Returns the ``(size, mtime, inode)`` signature of ``file_path``,
+          or ``None`` if it can't be stat'd.
+        """
+        
+        try:
+            return _signature(self._stat_file(file_path))
+        except OSError:
+            return None
+        
     
     def _cache_path(self, file_path):
         """ Check to see if ``file_path`` exists.  I it does, hash it and store
@@ -241,6 +573,10 @@ class MemoryCachedStaticURLGenerator(object):
               >>> open_file.return_value = sock
               >>> generate_hash = Mock()
               >>> generate_hash.return_value = 'digest'
+              >>> stat_file = Mock()
+              >>> stat_file.return_value.st_size = 1024
+              >>> stat_file.return_value.st_mtime = 1300000000.0
+              >>> stat_file.return_value.st_ino = 42
               >>> settings = {
               ...     'static_files_path': '/var/www/static', 
               ...     'static_url_prefix': u'/static/'
@@ -249,7 +585,9 @@ class MemoryCachedStaticURLGenerator(object):
               ...     request, 
               ...     settings,
               ...     open_file_=open_file,
-              ...     generate_hash_=generate_hash
+              ...     generate_hash_=generate_hash,
+              ...     stat_file_=stat_file,
+              ...     get_time_=lambda: 10.0
               ... )
               >>> static._cache_path('/var/www/static/foo.js')
           
@@ -259,13 +597,18 @@ class MemoryCachedStaticURLGenerator(object):
           
           It's hashed::
           
-              >>> generate_hash.assert_called_with(s=sock)
+              >>> generate_hash.assert_called_with(s=sock, algorithm='sha512')
           
           The hash is cached::
           
               >>> static._cache['/var/www/static/foo.js']
               'digest'
           
+          Along with the file's signature and when it was checked::
+          
+              >>> static._stats['/var/www/static/foo.js']
+              [(1024, 1300000000.0, 42), 10.0]
+          
           Unless the file_path can't be opened::
           
               >>> def open_file(file_path):
@@ -275,23 +618,112 @@ class MemoryCachedStaticURLGenerator(object):
               ...     request, 
               ...     settings,
               ...     open_file_=open_file,
-              ...     generate_hash_=generate_hash
+              ...     generate_hash_=generate_hash,
+              ...     stat_file_=stat_file
               ... )
               >>> static._cache_path('/var/www/static/foo.js')
               >>> static._cache['/var/www/static/foo.js'] is None
               True
           
+          Cleanup::
+          
+              >>> MemoryCachedStaticURLGenerator._cache = {}
+              >>> MemoryCachedStaticURLGenerator._stats = {}
+        
+        """
+        
+        signature = self._stat_path(file_path)
+        self._cache[file_path] = self._hash_path(file_path)
+        self._stats[file_path] = [signature, self._get_time()]
+        
+    
+    def _hash_path(self, file_path):
+        """ Returns the hash digest of ``file_path`` or ``None`` if it can't
+          be opened.
         """
         
         try:
             sock = self._open_file(file_path)
         except IOError:
             logging.warning(u'Couldn\'t open static file %s' % file_path)
-            self._cache[file_path] = None
-        else:
-            digest = self._generate_hash(s=sock)
+            return None
+        try:
+            return self._generate_hash(s=sock, algorithm=self._hash_algorithm)
+        finally:
             sock.close()
-            self._cache[file_path] = digest
+        
+    
+    def _check_path(self, file_path):
+        """ If ``file_path`` hasn't been checked within the last
+          ``self._check_interval`` seconds, stat it and, if its signature has
+          changed, call ``self._cache_path()``::
+          
+              >>> from mock import Mock
+              >>> request = Mock()
+              >>> settings = {
+              ...     'static_files_path': '/var/www/static', 
+              ...     'static_url_prefix': u'/static/',
+              ...     'static_check_interval': 5
+              ... }
+              >>> stat_file = Mock()
+              >>> now = [100.0]
+              >>> class MockCachedStaticURLGenerator(
+              ...         MemoryCachedStaticURLGenerator
+              ...     ):
+              ...     _cache_path = Mock()
+              ... 
+              >>> static = MockCachedStaticURLGenerator(
+              ...     request, 
+              ...     settings,
+              ...     stat_file_=stat_file,
+              ...     get_time_=lambda: now[0]
+              ... )
+              >>> static._stats['foo.js'] = [(1, 1.0, 1), 98.0]
+          
+          Within the interval, the file isn't stat'd::
+          
+              >>> static._check_path('foo.js')
+              >>> stat_file.called
+              False
+          
+          After it, the file is stat'd, but only re-hashed if it's changed::
+          
+              >>> now[0] = 104.0
+              >>> stat_file.return_value.st_size = 1
+              >>> stat_file.return_value.st_mtime = 1.0
+              >>> stat_file.return_value.st_ino = 1
+              >>> static._check_path('foo.js')
+              >>> stat_file.called, static._cache_path.called
+              (True, False)
+              >>> now[0] = 110.0
+              >>> stat_file.return_value.st_mtime = 2.0
+              >>> static._check_path('foo.js')
+              >>> static._cache_path.assert_called_with('foo.js')
+          
+          Files without a recorded signature aren't checked::
+          
+              >>> stat_file.reset_mock()
+              >>> static._check_path('bar.js')
+              >>> stat_file.called
+              False
+          
+          Cleanup::
+          
+              >>> MemoryCachedStaticURLGenerator._stats = {}
+        
+        """
+        
+        entry = self._stats.get(file_path)
+        if entry is None:
+            return
+        
+        now = self._get_time()
+        if now - entry[1] < self._check_interval:
+            return
+        entry[1] = now
+        
+        if self._stat_path(file_path) != entry[0]:
+            self._cache_path(file_path)
         
     
     def get_url(self, path, snip_digest_at=7):
@@ -306,12 +738,16 @@ class MemoryCachedStaticURLGenerator(object):
               >>> join_path = Mock()
               >>> join_path.return_value = '/var/www/static/foo.js'
               >>> MemoryCachedStaticURLGenerator._cache = {}
-              >>> static = MemoryCachedStaticURLGenerator(
+              >>> class MockCachedStaticURLGenerator(
+              ...         MemoryCachedStaticURLGenerator
+              ...     ):
+              ...     _cache_path = Mock()
+              ... 
+              >>> static = MockCachedStaticURLGenerator(
               ...     request, 
               ...     settings,
               ...     join_path_=join_path
               ... )
-              >>> static._cache_path = Mock()
           
           ``path`` is expanded into ``file_path``::
           
@@ -322,6 +758,10 @@ class MemoryCachedStaticURLGenerator(object):
           
               >>> static._cache_path.assert_called_with('/var/www/static/foo.js')
           
+          Otherwise, unless ``self._check_interval`` is ``None``, calls 
+          ``self._check_path()`` to invalidate the digest if the file's 
+          changed.
+          
           If the digest is ``None``, just joins the host url, prefix and path::
           
               >>> static._cache['/var/www/static/foo.js'] = None
@@ -347,6 +787,8 @@ class MemoryCachedStaticURLGenerator(object):
         
         if not file_path in self._cache:
             self._cache_path(file_path)
+        elif self._check_interval is not None:
+            self._check_path(file_path)
         
         digest = self._cache.get(file_path)
         
@@ -367,3 +809,505 @@ class MemoryCachedStaticURLGenerator(object):
     
     
 
+def _check_private(stat_result, path):
+    """ Raises a ``ValueError`` unless ``stat_result`` is of a file owned by
+      the current user that no one else can write to, so other users can't
+      plant or poison the digests stored in it::
+      
+          >>> from mock import Mock
+          >>> stat_result = Mock()
+          >>> stat_result.st_uid = os.getuid()
+          >>> stat_result.st_mode = 0100600
+          >>> _check_private(stat_result, '/var/lib/digests')
+          >>> stat_result.st_mode = 0100666
+          >>> _check_private(stat_result, '/var/lib/digests')
+          Traceback (most recent call last):
+          ...
+          ValueError: `/var/lib/digests` is writable by other users
+          >>> stat_result.st_mode = 0100600
+          >>> stat_result.st_uid = os.getuid() + 1
+          >>> _check_private(stat_result, '/var/lib/digests')
+          Traceback (most recent call last):
+          ...
+          ValueError: `/var/lib/digests` is owned by another user
+      
+    """
+    
+    if hasattr(os, 'getuid') and stat_result.st_uid != os.getuid():
+        raise ValueError(u'`%s` is owned by another user' % path)
+    if stat_result.st_mode & 022:
+        raise ValueError(u'`%s` is writable by other users' % path)
+    
+
+def _open_private(path, flags):
+    """ Opens ``path`` with ``flags``, creating it, readable and writable by
+      its owner only, if it doesn't exist.  Returns the file descriptor, 
+      having checked the file with :py:func:`_check_private`::
+      
+          >>> import tempfile
+          >>> directory = tempfile.mkdtemp()
+          >>> path = os.path.join(directory, 'digests')
+          >>> os.close(_open_private(path, os.O_RDONLY))
+          >>> oct(os.stat(path).st_mode & 0777)
+          '0600'
+          >>> os.chmod(path, 0666)
+          >>> _open_private(path, os.O_RDONLY) #doctest: +ELLIPSIS
+          Traceback (most recent call last):
+          ...
+          ValueError: `...` is writable by other users
+          >>> os.remove(path)
+          >>> os.rmdir(directory)
+      
+    """
+    
+    fd = os.open(path, flags | os.O_CREAT, 0600)
+    try:
+        _check_private(os.fstat(fd), path)
+    except:
+        os.close(fd)
+        raise
+    return fd
+    
+
+class SQLiteStaticDigestStore(object):
+    """ :py:class:`~weblayer.interfaces.IStaticDigestStore` that keeps the
+      digests in a `SQLite`_ database file, which any number of processes can
+      read from and write to::
+      
+          >>> import tempfile
+          >>> fd, path = tempfile.mkstemp()
+          >>> os.close(fd)
+          >>> store = SQLiteStaticDigestStore(path)
+          >>> store.get('/var/www/static/foo.js') is None
+          True
+          >>> store.set('/var/www/static/foo.js', 'signature', 'digest')
+          >>> store.get('/var/www/static/foo.js')
+          ('signature', 'digest')
+      
+      Values set by one store are available to others using the same file::
+      
+          >>> SQLiteStaticDigestStore(path).get('/var/www/static/foo.js')
+          ('signature', 'digest')
+          >>> store.set('/var/www/static/foo.js', 'changed', 'new digest')
+          >>> SQLiteStaticDigestStore(path).get('/var/www/static/foo.js')
+          ('changed', 'new digest')
+          >>> os.remove(path)
+      
+      Each thread (and each process, should the store be created before the
+      application forks) uses its own connection.  The database file is 
+      checked with :py:func:`_check_private`, and created readable and 
+      writable by its owner only, before it's connected to.
+      
+      .. _`SQLite`: http://www.sqlite.org/
+    """
+    
+    implements(IStaticDigestStore)
+    
+    def __init__(self, path, timeout=10):
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+        
+    
+    def _connection(self):
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            os.close(_open_private(self._path, os.O_RDWR))
+            connection = sqlite3.connect(
+                self._path, 
+                timeout=self._timeout,
+                isolation_level=None
+            )
+            connection.text_factory = str
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS static_digests ('
+                'file_path TEXT PRIMARY KEY, '
+                'signature TEXT NOT NULL, '
+                'digest TEXT NOT NULL)'
+            )
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+        
+    
+    def get(self, file_path):
+        row = self._connection().execute(
+            'SELECT signature, digest FROM static_digests WHERE file_path = ?',
+            (encode_to_utf8(file_path),)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+        
+    
+    def set(self, file_path, signature, digest):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO static_digests VALUES (?, ?, ?)',
+            (encode_to_utf8(file_path), signature, digest)
+        )
+        
+    
+    
+
+class MmapStaticDigestStore(object):
+    """ :py:class:`~weblayer.interfaces.IStaticDigestStore` that appends
+      digests to a shared log file, one ``file_path\\tsignature\\tdigest``
+      line per digest, and reads new lines back through a memory map::
+      
+          >>> import tempfile
+          >>> fd, path = tempfile.mkstemp()
+          >>> os.close(fd)
+          >>> store = MmapStaticDigestStore(path)
+          >>> store.get('/var/www/static/foo.js') is None
+          True
+          >>> store.set('/var/www/static/foo.js', 'signature', 'digest')
+          >>> store.get('/var/www/static/foo.js')
+          ('signature', 'digest')
+      
+      Later lines take precedence, including those written by other
+      processes::
+      
+          >>> other = MmapStaticDigestStore(path)
+          >>> other.set('/var/www/static/foo.js', 'changed', 'new digest')
+          >>> store.get('/var/www/static/foo.js')
+          ('changed', 'new digest')
+      
+      Values that can't be written as a single line are ignored::
+      
+          >>> store.set('/var/www/static/foo\\n.js', 'signature', 'digest')
+          >>> store.get('/var/www/static/foo\\n.js') is None
+          True
+          >>> os.remove(path)
+      
+      Appends are serialised between processes using ``fcntl.flock``, where
+      available.  As the log is never compacted, it suits files that change
+      rarely, i.e.: static files.  The log file is checked with 
+      :py:func:`_check_private` before it's read from or written to, and is 
+      created readable and writable by its owner only.
+    """
+    
+    implements(IStaticDigestStore)
+    
+    def __init__(self, path):
+        self._path = path
+        self._index = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+        
+    
+    def _refresh(self):
+        """ Read any lines appended since we last looked into 
+          ``self._index``.
+        """
+        
+        try:
+            sock = open(self._path, 'rb')
+        except IOError:
+            return
+        try:
+            stat_result = os.fstat(sock.fileno())
+            _check_private(stat_result, self._path)
+            size = stat_result.st_size
+            if size < self._offset:
+                self._index = {}
+                self._offset = 0
+            if size == self._offset:
+                return
+            mapped = mmap.mmap(sock.fileno(), size, access=mmap.ACCESS_READ)
+            try:
+                end = mapped.rfind('\n', self._offset, size) + 1
+                if end <= self._offset:
+                    return
+                data = mapped[self._offset:end]
+            finally:
+                mapped.close()
+        finally:
+            sock.close()
+        
+        for line in data.splitlines():
+            parts = line.split('\t')
+            if len(parts) == 3:
+                self._index[parts[0]] = (parts[1], parts[2])
+        self._offset = end
+        
+    
+    def get(self, file_path):
+        self._lock.acquire()
+        try:
+            self._refresh()
+            return self._index.get(encode_to_utf8(file_path))
+        finally:
+            self._lock.release()
+        
+    
+    def set(self, file_path, signature, digest):
+        values = [encode_to_utf8(v) for v in file_path, signature, digest]
+        for value in values:
+            if '\t' in value or '\n' in value:
+                return
+        line = '%s\n' % '\t'.join(values)
+        
+        fd = _open_private(self._path, os.O_WRONLY | os.O_APPEND)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        
+    
+    
+
+_digest_stores = {
+    'mmap': MmapStaticDigestStore,
+    'sqlite': SQLiteStaticDigestStore
+}
+
+class StoreCachedStaticURLGenerator(MemoryCachedStaticURLGenerator):
+    """ Adapter to generate static URLs from a request, sharing hash digests
+      between processes using an 
+      :py:class:`~weblayer.interfaces.IStaticDigestStore`.
+      
+      Digests are still cached in memory, per process.  When a digest isn't
+      in the memory cache (or the file's signature changes), it's looked up
+      in the store and the file is only hashed if the store doesn't have a
+      digest for the file's current signature and hash algorithm.
+    """
+    
+    __slots__ = ('_store',)
+    
+    _cache = {}
+    _stats = {}
+    _stores = {}
+    
+    def __init__(self, request, settings, store_=None, **kwargs):
+        """ ``store_`` is available as ``self._store``::
+          
+              >>> from mock import Mock
+              >>> req = Mock()
+              >>> settings = {
+              ...     'static_files_path': '/var/www/static', 
+              ...     'static_url_prefix': u'/static/'
+              ... }
+              >>> static = StoreCachedStaticURLGenerator(
+              ...     req, 
+              ...     settings, 
+              ...     store_='store'
+              ... )
+              >>> static._store
+              'store'
+          
+          It defaults to the store configured in ``settings`` (see
+          :py:meth:`get_store`)::
+          
+              >>> class MockStoreCachedStaticURLGenerator(
+              ...         StoreCachedStaticURLGenerator
+              ...     ):
+              ...     get_store = Mock()
+              ... 
+              >>> MockStoreCachedStaticURLGenerator.get_store.return_value = 'store'
+              >>> static = MockStoreCachedStaticURLGenerator(req, settings)
+              >>> static.get_store.assert_called_with(settings)
+              >>> static._store
+              'store'
+          
+        """
+        
+        super(StoreCachedStaticURLGenerator, self).__init__(
+            request, 
+            settings, 
+            **kwargs
+        )
+        
+        if store_ is None:
+            self._store = self.get_store(settings)
+        else:
+            self._store = store_
+        
+    
+    @classmethod
+    def get_store(cls, settings):
+        """ ``settings['static_digest_store']`` can be an
+          :py:class:`~weblayer.interfaces.IStaticDigestStore`::
+          
+              >>> store = MmapStaticDigestStore('/var/lib/weblayer/digests')
+              >>> settings = {'static_digest_store': store}
+              >>> StoreCachedStaticURLGenerator.get_store(settings) == store
+              True
+          
+          Or the name of a built in store, ``'sqlite'`` or ``'mmap'``, which
+          is created with ``settings['static_digest_store_path']`` once per
+          process::
+          
+              >>> settings = {
+              ...     'static_digest_store': 'mmap',
+              ...     'static_digest_store_path': '/var/lib/weblayer/digests'
+              ... }
+              >>> store = StoreCachedStaticURLGenerator.get_store(settings)
+              >>> isinstance(store, MmapStaticDigestStore)
+              True
+              >>> StoreCachedStaticURLGenerator.get_store(settings) == store
+              True
+              >>> settings['static_digest_store'] = 'foo'
+              >>> StoreCachedStaticURLGenerator.get_store(settings)
+              Traceback (most recent call last):
+              ...
+              ValueError: Unknown static digest store `foo`
+          
+          The built in stores require ``settings['static_digest_store_path']``::
+          
+              >>> settings = {'static_digest_store': 'sqlite'}
+              >>> StoreCachedStaticURLGenerator.get_store(settings)
+              Traceback (most recent call last):
+              ...
+              ValueError: Required setting `static_digest_store_path` is missing
+          
+          Teardown::
+          
+              >>> StoreCachedStaticURLGenerator._stores = {}
+          
+        """
+        
+        store = settings.get('static_digest_store', 'sqlite')
+        if IStaticDigestStore.providedBy(store):
+            return store
+        
+        path = settings.get('static_digest_store_path', '')
+        key = (store, path)
+        if not key in cls._stores:
+            if not store in _digest_stores:
+                raise ValueError(u'Unknown static digest store `%s`' % store)
+            if not path:
+                msg = u'Required setting `static_digest_store_path` is missing'
+                raise ValueError(msg)
+            cls._stores[key] = _digest_stores[store](path)
+        return cls._stores[key]
+        
+    
+    def _cache_path(self, file_path):
+        """ Look for a digest of ``file_path``, matching its current
+          signature, in ``self._store``::
+          
+              >>> from mock import Mock
+              >>> request = Mock()
+              >>> store = Mock()
+              >>> store.get.return_value = ('sha512:1024:1.0:42', 'stored')
+              >>> stat_file = Mock()
+              >>> stat_file.return_value.st_size = 1024
+              >>> stat_file.return_value.st_mtime = 1.0
+              >>> stat_file.return_value.st_ino = 42
+              >>> generate_hash = Mock()
+              >>> generate_hash.return_value = 'hashed'
+              >>> settings = {
+              ...     'static_files_path': '/var/www/static', 
+              ...     'static_url_prefix': u'/static/'
+              ... }
+              >>> static = StoreCachedStaticURLGenerator(
+              ...     request, 
+              ...     settings,
+              ...     store_=store,
+              ...     open_file_=Mock(),
+              ...     generate_hash_=generate_hash,
+              ...     stat_file_=stat_file,
+              ...     get_time_=lambda: 10.0
+              ... )
+              >>> static._cache_path('/var/www/static/foo.js')
+              >>> store.get.assert_called_with('/var/www/static/foo.js')
+          
+          If there is one, the file isn't hashed::
+          
+              >>> generate_hash.called
+              False
+              >>> static._cache['/var/www/static/foo.js']
+              'stored'
+              >>> static._stats['/var/www/static/foo.js']
+              [(1024, 1.0, 42), 10.0]
+          
+          Otherwise, the file is hashed and the digest is stored::
+          
+              >>> stat_file.return_value.st_mtime = 2.0
+              >>> static._cache_path('/var/www/static/foo.js')
+              >>> static._cache['/var/www/static/foo.js']
+              'hashed'
+              >>> store.set.assert_called_with(
+              ...     '/var/www/static/foo.js', 
+              ...     'sha512:1024:2.0:42', 
+              ...     'hashed'
+              ... )
+          
+          Files that can't be stat'd are hashed (if they can be opened) but
+          not stored::
+          
+              >>> store.reset_mock()
+              >>> stat_file.side_effect = OSError
+              >>> static._cache_path('/var/www/static/foo.js')
+              >>> store.get.called or store.set.called
+              False
+          
+          Cleanup::
+          
+              >>> StoreCachedStaticURLGenerator._cache = {}
+              >>> StoreCachedStaticURLGenerator._stats = {}
+          
+        """
+        
+        signature = self._stat_path(file_path)
+        
+        key = digest = None
+        if signature is not None:
+            key = '%s:%d:%r:%d' % ((self._hash_algorithm,) + signature)
+            stored = self._store.get(file_path)
+            if stored is not None and stored[0] == key:
+                digest = stored[1]
+        
+        if digest is None:
+            digest = self._hash_path(file_path)
+            if digest is not None and key is not None:
+                self._store.set(file_path, key, digest)
+        
+        self._cache[file_path] = digest
+        self._stats[file_path] = [signature, self._get_time()]
+        
+    
+    
+
+def main(args=None):
+    """ Hash the files in a static files directory ahead of time and write
+      the manifest::
+      
+          weblayer-build-static-manifest [-t N] [-a ALGORITHM] STATIC_FILES_PATH MANIFEST_PATH
+    
+    """
+    
+    parser = OptionParser(
+        usage='%prog [options] STATIC_FILES_PATH MANIFEST_PATH'
+    )
+    parser.add_option(
+        '-t', '--threads', dest='threads', type='int', default=4,
+        help='number of threads to hash files with [%default]'
+    )
+    parser.add_option(
+        '-a', '--algorithm', dest='algorithm', default='sha512',
+        help='hashlib algorithm to hash files with [%default]'
+    )
+    options, args = parser.parse_args(args)
+    if len(args) != 2:
+        parser.error('a static files path and a manifest path are required')
+    
+    static_files_path, manifest_path = args
+    manifest = build_manifest(
+        static_files_path, 
+        threads=options.threads,
+        algorithm=options.algorithm
+    )
+    write_manifest(manifest, manifest_path)
+    
+    sys.stdout.write(
+        'Wrote %d digests to %s\n' % (len(manifest), manifest_path)
+    )
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main()
+
@@ -39,11 +39,75 @@
           "datetime": datetime
       }
   
+  Renderers configured the same way share a single, thread safe
+  `TemplateLookup`_, so `Mako`_'s in memory template cache survives from one
+  request to the next::
+  
+      >>> another_renderer = MakoTemplateRenderer(settings)
+      >>> another_renderer.template_lookup == template_renderer.template_lookup
+      True
+  
+  The size of the in memory cache and whether to check template files for
+  changes are controlled by ``settings['template_collection_size']`` (which 
+  defaults to ``-1``, i.e.: unbounded) and 
+  ``settings['template_filesystem_checks']`` (which defaults to ``True``).
+  
+  Large pages can be rendered with :py:meth:`~MakoTemplateRenderer.stream`,
+  which returns an iterable of encoded chunks rather than one string, so the
+  rendered output is never joined or copied into a single buffer::
+  
+      >>> chunks = template_renderer.stream(tmpl_name, foo='&')
+      >>> ''.join(chunks)
+      '<h1>&amp;</h1>'
+  
+  Compiled template modules are written to
+  ``settings['template_module_directory']`` (which defaults to
+  ``'/tmp/mako_modules'``).  Rather than compiling each template the first
+  time it's rendered, you can compile them all ahead of time, either by
+  calling :py:meth:`~MakoTemplateRenderer.precompile`::
+  
+      >>> tmpl_dir = tempfile.mkdtemp()
+      >>> os.mkdir(os.path.join(tmpl_dir, 'foo'))
+      >>> for tmpl_path in 'index.tmpl', 'foo/bar.tmpl', '.hidden.tmpl':
+      ...     sock = open(os.path.join(tmpl_dir, tmpl_path), 'w')
+      ...     sock.write(u'<h1>${foo}</h1>')
+      ...     sock.close()
+      >>> settings = {
+      ...     'template_directories': [tmpl_dir],
+      ...     'template_module_directory': tempfile.mkdtemp()
+      ... }
+      >>> template_renderer = MakoTemplateRenderer(settings)
+      >>> template_renderer.precompile()
+      ['index.tmpl', 'foo/bar.tmpl']
+  
+  Only files ending with one of ``settings['template_extensions']`` (which
+  defaults to ``('.tmpl', '.html', '.mako')``) are treated as templates, so 
+  stray files in the template directories are left alone::
+  
+      >>> sock = open(os.path.join(tmpl_dir, 'README'), 'w')
+      >>> sock.write(u'${')
+      >>> sock.close()
+      >>> template_renderer.precompile()
+      ['index.tmpl', 'foo/bar.tmpl']
+  
+  Or from the command line, e.g. as part of a deployment::
+  
+      $ weblayer-compile-templates -m /var/cache/mako -e .tmpl templates
+  
+  With ``settings['template_filesystem_checks']`` set to ``False``, workers
+  then load the precompiled modules without checking the template sources
+  for changes (see the ``precompile_templates`` option of
+  :py:class:`~weblayer.bootstrap.Bootstrapper`).
+  
   Cleanup::
   
+      >>> import shutil
+      >>> shutil.rmtree(tmpl_dir)
+      >>> shutil.rmtree(settings['template_module_directory'])
       >>> os.unlink(abs_path)
   
   .. _`Mako`: http://www.makotemplates.org/
+  .. _`TemplateLookup`: http://www.makotemplates.org/docs/usage.html#usage_lookup
 """
 
 __all__ = [
@@ -51,12 +115,18 @@ __all__ = [
 ]
 
 import datetime
+import os
+import sys
+import threading
 import utils
 
+from optparse import OptionParser
+
 from zope.component import adapts
 from zope.interface import implements
 
 from mako.lookup import TemplateLookup
+from mako.runtime import Context
 
 from interfaces import ISettings, ITemplateRenderer
 from settings import require_setting
@@ -69,11 +139,134 @@ DEFAULT_BUILT_INS = {
 }
 
 require_setting('template_directories')
+require_setting('template_collection_size', default=-1)
+require_setting('template_filesystem_checks', default=True)
+require_setting('template_module_directory', default='/tmp/mako_modules')
+require_setting('template_extensions', default=('.tmpl', '.html', '.mako'))
+
+_template_lookups = {}
+_template_lookups_lock = threading.Lock()
+
+def _get_template_lookup(template_lookup_class, **kwargs):
+    """ Returns a ``template_lookup_class`` instance initialised with 
+      ``kwargs``, shared with any other caller passing the same arguments::
+      
+          >>> from mock import Mock
+          >>> lookup_class = Mock()
+          >>> lookup_class.side_effect = lambda **kwargs: object()
+          >>> a = _get_template_lookup(lookup_class, directories=['a'])
+          >>> b = _get_template_lookup(lookup_class, directories=['a'])
+          >>> c = _get_template_lookup(lookup_class, directories=['c'])
+          >>> a == b and a != c
+          True
+          >>> lookup_class.call_count
+          2
+      
+      Arguments that can't be hashed mean the lookup isn't shared::
+      
+          >>> a = _get_template_lookup(lookup_class, imports={})
+          >>> b = _get_template_lookup(lookup_class, imports={})
+          >>> a == b
+          False
+      
+    """
+    
+    items = []
+    for k, v in sorted(kwargs.items()):
+        if isinstance(v, list):
+            v = tuple(v)
+        items.append((k, v))
+    key = (template_lookup_class, tuple(items))
+    
+    try:
+        hash(key)
+    except TypeError:
+        return template_lookup_class(**kwargs)
+    
+    _template_lookups_lock.acquire()
+    try:
+        if not key in _template_lookups:
+            _template_lookups[key] = template_lookup_class(**kwargs)
+        return _template_lookups[key]
+    finally:
+        _template_lookups_lock.release()
+    
+
+class _ChunkBuffer(object):
+    """ Buffer that keeps the strings a template writes as a list of 
+      ``chunks``, rather than joining them::
+      
+          >>> buf = _ChunkBuffer()
+          >>> buf.write(u'a')
+          >>> buf.write('b')
+          >>> buf.chunks
+          [u'a', 'b']
+      
+    """
+    
+    def __init__(self):
+        self.chunks = []
+        self.write = self.chunks.append
+        
+    
+    def getvalue(self):
+        return u''.join(self.chunks)
+        
+    
+    
+
+def _iter_chunks(chunks, encoding=None, errors='strict', chunk_size=8192):
+    """ Yields ``chunks``, coalesced into strings of at least ``chunk_size``
+      and encoded with ``encoding`` as they're yielded::
+      
+          >>> result = _iter_chunks([u'a', u'b', u'\\xe9'], encoding='utf-8')
+          >>> list(result)
+          ['ab\\xc3\\xa9']
+          >>> result = _iter_chunks([u'ab', u'c', u'd'], chunk_size=2)
+          >>> list(result)
+          [u'ab', u'cd']
+      
+      ``chunks`` is consumed as it's iterated over, so the memory used by the
+      rendered output is released progressively::
+      
+          >>> chunks = ['a', 'b']
+          >>> result = _iter_chunks(chunks, chunk_size=1)
+          >>> result.next()
+          'a'
+          >>> chunks
+          ['b']
+      
+    """
+    
+    chunks.reverse()
+    pending = []
+    size = 0
+    while chunks:
+        chunk = chunks.pop()
+        if encoding is not None and isinstance(chunk, unicode):
+            chunk = chunk.encode(encoding, errors)
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield pending[0][:0].join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield pending[0][:0].join(pending)
+    
 
 class MakoTemplateRenderer(object):
     """ `Mako <http://www.makotemplates.org/>`_ template renderer.
     """
     
+    __slots__ = (
+        'built_ins', 
+        'directories', 
+        'extensions', 
+        'stream_chunk_size', 
+        'template_lookup'
+    )
+    
     adapts(ISettings)
     implements(ITemplateRenderer)
     
@@ -82,28 +275,64 @@ class MakoTemplateRenderer(object):
             settings,
             built_ins=None,
             template_lookup_class=None,
-            module_directory='/tmp/mako_modules',
+            module_directory=None,
             input_encoding='utf-8', 
             output_encoding='utf-8', 
             encoding_errors='replace',
+            collection_size=None,
+            filesystem_checks=None,
+            stream_chunk_size=8192,
+            extensions=None,
             **kwargs
         ):
-        """
+        """ Gets the template lookup shared by renderers with the same
+          configuration, creating it if need be.  ``module_directory``,
+          ``collection_size`` and ``filesystem_checks`` default to
+          ``settings['template_module_directory']``,
+          ``settings['template_collection_size']`` and
+          ``settings['template_filesystem_checks']``.
+          
+          ``stream_chunk_size`` is the minimum size of the chunks yielded by
+          :py:meth:`stream`.  ``extensions`` defaults to 
+          ``settings['template_extensions']`` and is used by 
+          :py:meth:`precompile`.
         """
         
         directories = settings['template_directories']
+        self.directories = directories
+        
+        if extensions is None:
+            extensions = settings.get(
+                'template_extensions',
+                ('.tmpl', '.html', '.mako')
+            )
+        self.extensions = tuple(extensions)
+        
+        if module_directory is None:
+            module_directory = settings.get(
+                'template_module_directory',
+                '/tmp/mako_modules'
+            )
+        if collection_size is None:
+            collection_size = settings.get('template_collection_size', -1)
+        if filesystem_checks is None:
+            filesystem_checks = settings.get('template_filesystem_checks', True)
         
         self.built_ins = built_ins is None and DEFAULT_BUILT_INS or built_ins
+        self.stream_chunk_size = stream_chunk_size
         
         if template_lookup_class is None:
             template_lookup_class = TemplateLookup
         
-        self.template_lookup = template_lookup_class(
+        self.template_lookup = _get_template_lookup(
+            template_lookup_class,
             directories=directories,
             module_directory=module_directory,
             input_encoding=input_encoding, 
             output_encoding=output_encoding, 
             encoding_errors=encoding_errors,
+            collection_size=collection_size,
+            filesystem_checks=filesystem_checks,
             **kwargs
         )
         
@@ -120,5 +349,112 @@ class MakoTemplateRenderer(object):
         return t.render(**params)
         
     
+    def stream(self, tmpl_name, **kwargs):
+        """ Render ``tmpl_name`` into a list of chunks and return an iterator
+          that encodes them lazily, in pieces of ``self.stream_chunk_size``.
+          
+          The template is rendered before this method returns, so rendering
+          errors are raised within the request handler, not whilst the
+          response is being sent.
+        """
+        
+        params = self.built_ins.copy()
+        params.update(kwargs)
+        
+        t = self.template_lookup.get_template(tmpl_name)
+        buf = _ChunkBuffer()
+        context = Context(buf, **params)
+        t.render_context(context, **params)
+        return _iter_chunks(
+            buf.chunks, 
+            encoding=t.output_encoding, 
+            errors=t.encoding_errors,
+            chunk_size=self.stream_chunk_size
+        )
+        
+    
+    def precompile(self, extensions=None):
+        """ Walk ``self.directories``, skipping hidden files and folders, and
+          get every template from the template lookup, so its module is
+          compiled into the module directory and its template is cached in
+          memory.  Only files ending with one of ``extensions`` (which 
+          defaults to ``self.extensions``) are treated as templates.  Returns
+          a list of the template names.
+        """
+        
+        if extensions is None:
+            extensions = self.extensions
+        else:
+            extensions = tuple(extensions)
+        
+        tmpl_names = []
+        for directory in self.directories:
+            directory = os.path.normpath(directory)
+            for dirpath, dirnames, filenames in os.walk(directory):
+                dirnames[:] = sorted(
+                    d for d in dirnames if not d.startswith('.')
+                )
+                for filename in sorted(filenames):
+                    if filename.startswith('.'):
+                        continue
+                    if not filename.endswith(extensions):
+                        continue
+                    file_path = os.path.join(dirpath, filename)
+                    relative_path = file_path[len(directory):].lstrip(os.sep)
+                    tmpl_name = relative_path.replace(os.sep, '/')
+                    if tmpl_name in tmpl_names:
+                        continue
+                    self.template_lookup.get_template(tmpl_name)
+                    tmpl_names.append(tmpl_name)
+        return tmpl_names
+        
+    
+    
+
+def main(args=None):
+    """ Compile the templates in the directories passed in ahead of time::
+    
+          weblayer-compile-templates [-m DIR] [-e EXT] TEMPLATE_DIRECTORY ...
+    
+    """
+    
+    parser = OptionParser(
+        usage='%prog [options] TEMPLATE_DIRECTORY [TEMPLATE_DIRECTORY ...]'
+    )
+    parser.add_option(
+        '-m', '--module-directory', dest='module_directory',
+        default='/tmp/mako_modules',
+        help='directory to write the compiled modules to [%default]'
+    )
+    parser.add_option(
+        '-e', '--extension', dest='extensions', action='append',
+        help=(
+            'only compile files ending with EXTENSION (can be repeated) '
+            '[.tmpl, .html and .mako]'
+        )
+    )
+    options, directories = parser.parse_args(args)
+    if not directories:
+        parser.error('at least one template directory is required')
+    
+    settings = {
+        'template_directories': directories,
+        'template_module_directory': options.module_directory
+    }
+    if options.extensions:
+        settings['template_extensions'] = options.extensions
+    template_renderer = MakoTemplateRenderer(settings)
+    tmpl_names = template_renderer.precompile()
     
+    sys.stdout.write(
+        'Compiled %d templates into %s\n' % (
+            len(tmpl_names),
+            options.module_directory
+        )
+    )
+    
+
+if __name__ == '__main__': # pragma: no cover
+    main()
+
 
@@ -710,7 +710,7 @@ class TestXSRF(unittest.TestCase):
     """ Sanity check validating against XSRF attacks.
     """
     
-    def make_app(self, mapping):
+    def make_app(self, mapping, **extra_config):
         from webtest import TestApp
         from weblayer import Bootstrapper, WSGIApplication
         config = {
@@ -718,6 +718,7 @@ class TestXSRF(unittest.TestCase):
             'static_files_path': 'static',
             'template_directories': ['templates']
         }
+        config.update(extra_config)
         bootstrapper = Bootstrapper(settings=config, url_mapping=mapping)
         application = WSGIApplication(*bootstrapper())
         return TestApp(application)
@@ -796,6 +797,41 @@ class TestXSRF(unittest.TestCase):
             self.assertTrue('403 Forbidden' in str(err))
         
     
+    def test_form_post_using_compact_cookie(self):
+        """ With ``settings['cookie_format']`` set to ``'compact'``, the 
+          ``_xsrf`` cookie still validates ``self.xsrf_input``.
+        """
+        
+        from weblayer import RequestHandler
+        
+        class Handler(RequestHandler):
+            
+            __all__ = ('get', 'post')
+            
+            def get(self):
+                inputs = u'%s<input name="name" />' % self.xsrf_input
+                form = u'<form method="post">%s</form>' % inputs
+                return u'What is your name? %s' % form
+                
+            
+            def post(self):
+                return u'Hello %s!' % self.request.params.get('name')
+                
+            
+            
+        
+        
+        mapping = [(r'/', Handler)]
+        app = self.make_app(mapping, cookie_format='compact')
+        
+        res = app.get('/')
+        form = res.form
+        form['name'] = 'Brian'
+        
+        res = form.submit()
+        self.assertTrue(res.body == 'Hello Brian!')
+        
+    
     
 
 
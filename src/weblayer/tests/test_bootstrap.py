@@ -190,6 +190,71 @@ class TestCallBootstrapper(unittest.TestCase):
         self.assertTrue(path_router == 'registered utility')
         
     
+    def test_precompile_templates(self):
+        """ If `precompile_templates` is `True`, calls `precompile()` on the
+          registered template renderer.
+        """
+        
+        from weblayer.interfaces import ITemplateRenderer
+        
+        bootstrapper = self.make_one()
+        bootstrapper()
+        self.assertTrue(not self.registry.queryAdapter.called)
+        
+        bootstrapper(precompile_templates=True)
+        self.registry.queryAdapter.assert_called_with(
+            'registered utility', 
+            ITemplateRenderer
+        )
+        template_renderer = self.registry.queryAdapter.return_value
+        self.assertTrue(template_renderer.precompile.called)
+        
+    
+    def test_precompile_templates_no_renderer(self):
+        """ If there's no template renderer registered, `precompile_templates`
+          is ignored.
+        """
+        
+        self.registry.queryAdapter.return_value = None
+        bootstrapper = self.make_one()
+        settings, path_router = bootstrapper(precompile_templates=True)
+        self.assertTrue(settings == 'registered utility')
+        
+    
+    def test_load_static_manifest(self):
+        """ If `load_static_manifest` is `True`, calls `load_manifest()` on
+          the registered static url generator.
+        """
+        
+        from weblayer.interfaces import IRequest, ISettings
+        from weblayer.interfaces import IStaticURLGenerator
+        
+        bootstrapper = self.make_one()
+        bootstrapper()
+        self.assertTrue(not self.registry.adapters.lookup.called)
+        
+        bootstrapper(load_static_manifest=True)
+        self.registry.adapters.lookup.assert_called_with(
+            [IRequest, ISettings], 
+            IStaticURLGenerator
+        )
+        static_url_generator = self.registry.adapters.lookup.return_value
+        static_url_generator.load_manifest.assert_called_with(
+            'registered utility'
+        )
+        
+    
+    def test_load_static_manifest_no_generator(self):
+        """ If there's no static url generator registered, 
+          `load_static_manifest` is ignored.
+        """
+        
+        self.registry.adapters.lookup.return_value = None
+        bootstrapper = self.make_one()
+        settings, path_router = bootstrapper(load_static_manifest=True)
+        self.assertTrue(settings == 'registered utility')
+        
+    
     
 
 class TestBootstrapperRequireSettings(unittest.TestCase):
@@ -373,11 +438,15 @@ class TestBootstrapperRegisterComponents(unittest.TestCase):
         self.registry.registerUtility.return_value = 'registered utility'
         self.registry.registerAdapter.return_value = 'registered adapter'
         bootstrap.registry = self.registry
+        self.__use_json_backend = bootstrap.use_json_backend
+        self.use_json_backend = Mock()
+        bootstrap.use_json_backend = self.use_json_backend
         
     
     def tearDown(self):
         from weblayer import bootstrap
         bootstrap.registry = self.__registry
+        bootstrap.use_json_backend = self.__use_json_backend
         
     
     def make_one(self, *args, **kwargs):
@@ -482,6 +551,29 @@ class TestBootstrapperRegisterComponents(unittest.TestCase):
         )
         
     
+    def test_settings_json_backend(self):
+        """ Registering `settings` selects `settings['json_backend']`, which
+          defaults to `'auto'`.
+        """
+        
+        bootstrapper = self.make_one()
+        settings = Mock()
+        settings.get.return_value = 'json'
+        bootstrapper.register_components(settings=settings)
+        
+        settings.get.assert_called_with('json_backend', 'auto')
+        self.use_json_backend.assert_called_with('json')
+        
+    
+    def test_settings_false_json_backend(self):
+        """ If `settings` is `False`, the JSON backend is left alone.
+        """
+        
+        bootstrapper = self.make_one()
+        bootstrapper.register_components(settings=False)
+        self.assertTrue(not self.use_json_backend.called)
+        
+    
     def test_path_router_false(self):
         """ If `path_router` is `False`, nothing is registered.
         """
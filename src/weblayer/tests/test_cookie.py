@@ -49,6 +49,55 @@ class TestInitCookie(unittest.TestCase):
         """
         
         self.assertTrue(self.cookie_wrapper._cookie_secret == 'psst')
+        self.assertTrue(self.cookie_wrapper._cookie_secrets == ('psst',))
+        
+    
+    def test_cookie_secrets(self):
+        """ If `settings['cookie_secret']` is a list, the first is available
+          as `self._cookie_secret` and all of them as `self._cookie_secrets`.
+        """
+        
+        from weblayer.cookie import SignedSecureCookieWrapper
+        self.settings['cookie_secret'] = ['new', 'old']
+        cookie_wrapper = SignedSecureCookieWrapper(
+            self.request,
+            self.response,
+            self.settings
+        )
+        self.assertTrue(cookie_wrapper._cookie_secret == 'new')
+        self.assertTrue(cookie_wrapper._cookie_secrets == ('new', 'old'))
+        
+    
+    def test_cookie_digest(self):
+        """ `settings['cookie_digest']` is available as `self._cookie_digest`,
+          defaulting to `'sha1'`.
+        """
+        
+        from weblayer.cookie import SignedSecureCookieWrapper
+        self.assertTrue(self.cookie_wrapper._cookie_digest == 'sha1')
+        self.settings['cookie_digest'] = 'sha256'
+        cookie_wrapper = SignedSecureCookieWrapper(
+            self.request,
+            self.response,
+            self.settings
+        )
+        self.assertTrue(cookie_wrapper._cookie_digest == 'sha256')
+        
+    
+    def test_max_age_days(self):
+        """ `settings['cookie_max_age_days']` is available as 
+          `self._max_age_days`, defaulting to `31`.
+        """
+        
+        from weblayer.cookie import SignedSecureCookieWrapper
+        self.assertTrue(self.cookie_wrapper._max_age_days == 31)
+        self.settings['cookie_max_age_days'] = 7
+        cookie_wrapper = SignedSecureCookieWrapper(
+            self.request,
+            self.response,
+            self.settings
+        )
+        self.assertTrue(cookie_wrapper._max_age_days == 7)
         
     
     
@@ -99,6 +148,24 @@ class TestSetCookie(unittest.TestCase):
         self.assertTrue(kwargs['value'] == value)
         
     
+    def test_value_compact(self):
+        """ If `self._cookie_format` is `'compact'`, the value is written as 
+          padding free, url safe base64 of a version byte, the timestamp, 
+          the value and the raw hmac signature.
+        """
+        
+        import base64
+        
+        self.cookie_wrapper._cookie_format = 'compact'
+        self.cookie_wrapper.set('name', 'value', timestamp='1')
+        kwargs = self.response.set_cookie.call_args[1]
+        value = 'AQAAAAF2YWx1Za6hOrINRGvFkz48TEhhLt-eeFmg'
+        self.assertTrue(kwargs['value'] == value)
+        data = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        self.assertTrue(data[:10] == '\x01\x00\x00\x00\x01value')
+        self.assertTrue(len(data) == 10 + 20)
+        
+    
     def test_value_is_basestring(self):
         """ The cookie value must be a basestring.
         """
@@ -118,6 +185,39 @@ class TestSetCookie(unittest.TestCase):
         self.assertTrue(kwargs['max_age'] == five_days_as_seconds)
         
     
+    def test_expires_days_defaults_to_max_age_days(self):
+        """ If `expires_days` isn't passed, the cookie expires after 
+          `max_age_days`, which defaults to `self._max_age_days`.
+        """
+        
+        self.cookie_wrapper.set('name', 'value')
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(kwargs['max_age'] == 31 * 24 * 60 * 60)
+        
+        self.cookie_wrapper.set('name', 'value', max_age_days=365)
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(kwargs['max_age'] == 365 * 24 * 60 * 60)
+        
+    
+    def test_expires_days_capped_by_max_age_days(self):
+        """ The cookie doesn't outlive `max_age_days`, which defaults to
+          `self._max_age_days`.
+        """
+        
+        self.cookie_wrapper.set('name', 'value', expires_days=365)
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(kwargs['max_age'] == 31 * 24 * 60 * 60)
+        
+        self.cookie_wrapper.set(
+            'name', 
+            'value', 
+            expires_days=365, 
+            max_age_days=400
+        )
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(kwargs['max_age'] == 365 * 24 * 60 * 60)
+        
+    
     def test_expires_days_is_none(self):
         """ If the `expires_days` keyword argument is `None`,
           `max_age` is `None`.
@@ -163,6 +263,7 @@ class TestGetCookie(unittest.TestCase):
     
     def setUp(self):
         from weblayer.cookie import SignedSecureCookieWrapper
+        SignedSecureCookieWrapper._verified.clear()
         self.request = Mock()
         self.response = Mock()
         self.settings = {'cookie_secret': ''}
@@ -191,6 +292,41 @@ class TestGetCookie(unittest.TestCase):
         self.assertTrue(self.cookie_wrapper.get('name') is None)
         
     
+    def test_get_memoised(self):
+        """ Getting a request cookie memoises the result until the cookie is
+          set or deleted.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ts = str(int(time.time()))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(cs, 'name', 'dmFsdWU=', ts)
+        self.request.cookies.get.return_value = 'dmFsdWU=|%s|%s' % (ts, sig)
+        
+        self.assertTrue(self.cookie_wrapper.get('name') == 'value')
+        self.assertTrue(self.cookie_wrapper.get('name') == 'value')
+        self.assertTrue(self.request.cookies.get.call_count == 1)
+        
+        self.cookie_wrapper.set('name', 'other')
+        self.assertTrue(self.cookie_wrapper.get('name') == 'value')
+        self.assertTrue(self.request.cookies.get.call_count == 2)
+        
+        self.cookie_wrapper.delete('name')
+        self.request.cookies.get.return_value = None
+        self.assertTrue(self.cookie_wrapper.get('name') is None)
+        self.assertTrue(self.request.cookies.get.call_count == 3)
+        
+    
+    def test_get_value_not_memoised(self):
+        """ Explicitly passed in values aren't memoised against `name`.
+        """
+        
+        self.request.cookies.get.return_value = None
+        self.assertTrue(self.cookie_wrapper.get('name', value='a|b') is None)
+        self.assertTrue(not self.cookie_wrapper._decoded)
+        
+    
     def test_split_value(self):
         """ If the cookie value doesn't split into three parts,
           delimited by '|' returns `None`.
@@ -221,6 +357,25 @@ class TestGetCookie(unittest.TestCase):
         self.assertTrue(result is None)
         
     
+    def test_max_age_days(self):
+        """ Cookies signed more than `max_age_days` ago return `None`.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ten_days_ago = str(int(time.time() - 10 * 24 * 60 * 60))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(cs, 'name', 'dmFsdWU=', ten_days_ago)
+        value = 'dmFsdWU=|%s|%s' % (ten_days_ago, sig)
+        
+        get = self.cookie_wrapper.get
+        self.assertTrue(get('name', value=value) == 'value')
+        self.assertTrue(get('name', value=value, max_age_days=7) is None)
+        self.cookie_wrapper._max_age_days = 7
+        self.assertTrue(get('name', value=value) is None)
+        self.assertTrue(get('name', value=value, max_age_days=11) == 'value')
+        
+    
     def test_signature_doesnt_match(self):
         """ If the signature doesn't match, returns `None`.
         """
@@ -271,6 +426,249 @@ class TestGetCookie(unittest.TestCase):
         self.assertTrue(result == 'value')
         
     
+    def test_get_value_rotated_secret(self):
+        """ Values signed with any of `self._cookie_secrets` validate.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ts = str(int(time.time()))
+        sig = _generate_cookie_signature('old', 'name', 'dmFsdWU=', ts)
+        value = 'dmFsdWU=|%s|%s' % (ts, sig)
+        
+        self.cookie_wrapper._cookie_secrets = ('new',)
+        self.assertTrue(self.cookie_wrapper.get('name', value=value) is None)
+        
+        self.cookie_wrapper._cookie_secrets = ('new', 'old')
+        self.assertTrue(self.cookie_wrapper.get('name', value=value) == 'value')
+        
+    
+    def test_get_value_digest(self):
+        """ Values are signed and verified using `self._cookie_digest`.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ts = str(int(time.time()))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(
+            cs, 
+            'name', 
+            'dmFsdWU=', 
+            ts, 
+            digest='sha256'
+        )
+        value = 'dmFsdWU=|%s|%s' % (ts, sig)
+        
+        self.assertTrue(self.cookie_wrapper.get('name', value=value) is None)
+        self.cookie_wrapper._cookie_digest = 'sha256'
+        self.assertTrue(self.cookie_wrapper.get('name', value=value) == 'value')
+        
+    
+    def test_get_value_compact(self):
+        """ Compact values can be read whatever `self._cookie_format` is,
+          as can text values.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ts = str(int(time.time()))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(cs, 'name', 'dmFsdWU=', ts)
+        text = 'dmFsdWU=|%s|%s' % (ts, sig)
+        
+        self.cookie_wrapper._cookie_format = 'compact'
+        compact = self.cookie_wrapper._encode_compact('name', 'value', int(ts))
+        
+        for cookie_format in 'text', 'compact':
+            self.cookie_wrapper._cookie_format = cookie_format
+            for value in text, compact:
+                result = self.cookie_wrapper.get('name', value=value)
+                self.assertTrue(result == 'value')
+        
+    
+    def test_get_compact_from_request(self):
+        """ Compact cookies set on a response can be read back from a real
+          request, whose cookie values are `unicode`.
+        """
+        
+        from webob import Request, Response
+        from weblayer.cookie import SignedSecureCookieWrapper
+        
+        self.settings['cookie_format'] = 'compact'
+        response = Response()
+        setter = SignedSecureCookieWrapper(Mock(), response, self.settings)
+        setter.set('sid', 'hello')
+        cookie = response.headers['Set-Cookie'].split(';')[0]
+        
+        request = Request.blank('/', headers={'Cookie': cookie})
+        self.assertTrue(isinstance(request.cookies['sid'], unicode))
+        getter = SignedSecureCookieWrapper(request, Response(), self.settings)
+        self.assertTrue(getter.get('sid') == 'hello')
+        
+    
+    def test_get_value_compact_unicode(self):
+        """ `unicode` compact values are read as ASCII and those that aren't
+          ASCII return `None`.
+        """
+        
+        now = int(time.time())
+        compact = self.cookie_wrapper._encode_compact('name', 'value', now)
+        result = self.cookie_wrapper.get('name', value=unicode(compact))
+        self.assertTrue(result == 'value')
+        result = self.cookie_wrapper.get('name', value=u'\xe9' + compact)
+        self.assertTrue(result is None)
+        
+    
+    def test_get_value_compact_invalid(self):
+        """ Compact values that have been tampered with, have expired, have
+          an unknown version or are too short return `None`.
+        """
+        
+        import base64
+        import struct
+        from weblayer.cookie import _generate_compact_signature
+        
+        def encode(data):
+            return base64.urlsafe_b64encode(data).rstrip('=')
+            
+        
+        def make_value(version, timestamp, value, signed_value=None):
+            header = struct.pack('!BI', version, timestamp)
+            signed_value = signed_value is None and value or signed_value
+            signature = _generate_compact_signature(
+                '', 
+                'name', 
+                header + signed_value
+            )
+            return encode(header + value + signature)
+            
+        
+        get = self.cookie_wrapper.get
+        now = int(time.time())
+        self.assertTrue(get('name', value=make_value(1, now, 'a')) == 'a')
+        
+        tampered = make_value(1, now, 'b', signed_value='a')
+        self.assertTrue(get('name', value=tampered) is None)
+        too_old = now - 32 * 24 * 60 * 60
+        self.assertTrue(get('name', value=make_value(1, too_old, 'a')) is None)
+        self.assertTrue(get('name', value=make_value(2, now, 'a')) is None)
+        self.assertTrue(get('name', value=encode('\x01\x00')) is None)
+        self.assertTrue(get('name', value='not base64!') is None)
+        
+    
+    def test_refresh(self):
+        """ `refresh()` returns the value and only sets the cookie again if
+          it was signed more than `refresh_after_days` ago.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ten_days_ago = str(int(time.time() - 10 * 24 * 60 * 60))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(cs, 'name', 'dmFsdWU=', ten_days_ago)
+        self.request.cookies.get.return_value = 'dmFsdWU=|%s|%s' % (
+            ten_days_ago, 
+            sig
+        )
+        
+        result = self.cookie_wrapper.refresh('name', 20)
+        self.assertTrue(result == 'value')
+        self.assertTrue(not self.response.set_cookie.called)
+        
+        result = self.cookie_wrapper.refresh('name', 7, path='/foo')
+        self.assertTrue(result == 'value')
+        args = self.response.set_cookie.call_args[0]
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(args[0] == 'name')
+        self.assertTrue(kwargs['path'] == '/foo')
+        value = self.cookie_wrapper.get('name', value=kwargs['value'])
+        self.assertTrue(value == 'value')
+        
+    
+    def test_refresh_keeps_max_age_days(self):
+        """ Refreshing a cookie with a `max_age_days` of more than 30 days
+          keeps its lifetime.
+        """
+        
+        from weblayer.cookie import _generate_cookie_signature
+        
+        ten_days_ago = str(int(time.time() - 10 * 24 * 60 * 60))
+        cs = self.settings['cookie_secret']
+        sig = _generate_cookie_signature(cs, 'name', 'dmFsdWU=', ten_days_ago)
+        self.request.cookies.get.return_value = 'dmFsdWU=|%s|%s' % (
+            ten_days_ago, 
+            sig
+        )
+        
+        result = self.cookie_wrapper.refresh('name', 7, max_age_days=365)
+        self.assertTrue(result == 'value')
+        kwargs = self.response.set_cookie.call_args[1]
+        self.assertTrue(kwargs['max_age'] == 365 * 24 * 60 * 60)
+        
+    
+    def test_refresh_invalid(self):
+        """ `refresh()` returns `None`, without setting the cookie, if it
+          doesn't validate.
+        """
+        
+        self.request.cookies.get.return_value = None
+        self.assertTrue(self.cookie_wrapper.refresh('name', 7) is None)
+        self.assertTrue(not self.response.set_cookie.called)
+        
+    
+    def test_get_value_cached(self):
+        """ Once a value has validated, getting it again doesn't recompute
+          the signature.
+        """
+        
+        from weblayer import cookie
+        
+        ts = str(int(time.time()))
+        cs = self.settings['cookie_secret']
+        sig = cookie._generate_cookie_signature(cs, 'name', 'dmFsdWU=', ts)
+        value = 'dmFsdWU=|%s|%s' % (ts, sig)
+        
+        _generate_cookie_signature = cookie._generate_cookie_signature
+        cookie._generate_cookie_signature = Mock(
+            wraps=_generate_cookie_signature
+        )
+        get = self.cookie_wrapper.get
+        try:
+            self.assertTrue(get('name', value=value) == 'value')
+            self.assertTrue(get('name', value=value) == 'value')
+            self.assertTrue(cookie._generate_cookie_signature.call_count == 1)
+            # keyed by the name and secret too
+            self.assertTrue(get('other', value=value) is None)
+            self.cookie_wrapper._cookie_secrets = ('changed',)
+            self.assertTrue(get('name', value=value) is None)
+        finally:
+            cookie._generate_cookie_signature = _generate_cookie_signature
+        
+    
+    def test_get_value_cached_expires(self):
+        """ Cached values still expire.
+        """
+        
+        from weblayer import cookie
+        
+        t = time.time()
+        ts = str(int(t))
+        cs = self.settings['cookie_secret']
+        sig = cookie._generate_cookie_signature(cs, 'name', 'dmFsdWU=', ts)
+        value = 'dmFsdWU=|%s|%s' % (ts, sig)
+        get = self.cookie_wrapper.get
+        self.assertTrue(get('name', value=value) == 'value')
+        
+        _time = cookie.time
+        cookie.time = Mock()
+        cookie.time.time.return_value = t + 32 * 24 * 60 * 60
+        try:
+            self.assertTrue(get('name', value=value) is None)
+        finally:
+            cookie.time = _time
+        
+    
     def test_delete(self):
         """ Calls `self.context.response.set_cookie` with
           `expires=datetime.timedelta(days=-5)`.
@@ -103,6 +103,35 @@ class TestExposedMethodSelector(unittest.TestCase):
     
     
 
+    def test_raw_request_method(self):
+        """ The raw, upper case, request method is looked up directly.
+        """
+        
+        self.assertTrue(self.method_selector.select_method('A') == 'method_a')
+        self.assertTrue(self.method_selector._methods == {'A': 'a'})
+        
+    
+    
+    def test_allow(self):
+        """ The methods the context allows are available as `allow`.
+        """
+        
+        self.assertTrue(self.method_selector.allow == 'A')
+        
+    
+    
+    def test_table_is_cached_per_class(self):
+        """ The method table is worked out once per context class.
+        """
+        
+        from weblayer.method import ExposedMethodSelector
+        
+        other = ExposedMethodSelector(self.context.__class__())
+        self.assertTrue(other._methods is self.method_selector._methods)
+        
+    
+    
+
 class TestHEADSpecialCase(unittest.TestCase):
     """ Test special casing HEAD requests to use ``def get()`` iff:
       
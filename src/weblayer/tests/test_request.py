@@ -56,10 +56,10 @@ class TestInitBaseHandler(unittest.TestCase):
         self.mock_registry = Mock()
         self.mock_registry.getUtility = Mock()
         self.mock_registry.getUtility.return_value = 'utility'
-        self.mock_registry.getAdapter = Mock()
-        self.mock_registry.getAdapter.return_value = 'adapted from registry'
-        self.mock_registry.getMultiAdapter = Mock()
-        self.mock_registry.getMultiAdapter.return_value = 'multi adapted'
+        self.mock_registry.getCachedAdapter = Mock()
+        self.mock_registry.getCachedAdapter.return_value = 'adapted from registry'
+        self.mock_registry.getCachedMultiAdapter = Mock()
+        self.mock_registry.getCachedMultiAdapter.return_value = 'multi adapted'
         
         import weblayer.request
         weblayer.request.registry = self.mock_registry
@@ -122,8 +122,8 @@ class TestInitBaseHandler(unittest.TestCase):
             '',
             template_renderer_adapter=self.adapter
         )
-        self.adapter.assert_called_with(handler.settings)
         self.assertTrue(handler.template_renderer == 'adapted')
+        self.adapter.assert_called_with(handler.settings)
         
     
     def test_template_renderer_adapter_from_registry(self):
@@ -132,16 +132,18 @@ class TestInitBaseHandler(unittest.TestCase):
         """
         
         from weblayer.interfaces import ITemplateRenderer
+        from weblayer.request import BaseHandler
         
         handler = self._make_one('', '', '')
+        self.assertTrue(handler.template_renderer == 'adapted from registry')
         self.assertTrue(
             _was_called_with(
-                self.mock_registry.getAdapter, 
+                self.mock_registry.getCachedAdapter, 
                 '',
-                ITemplateRenderer
+                ITemplateRenderer,
+                BaseHandler
             )
         )
-        self.assertTrue(handler.template_renderer == 'adapted from registry')
         
         handler = self._make_one(
             '', 
@@ -164,8 +166,8 @@ class TestInitBaseHandler(unittest.TestCase):
             '',
             static_url_generator_adapter=self.adapter
         )
-        self.adapter.assert_called_with(handler.request, handler.settings)
         self.assertTrue(handler.static == 'adapted')
+        self.adapter.assert_called_with(handler.request, handler.settings)
         
     
     def test_static_url_generator_adapter_from_registry(self):
@@ -174,19 +176,20 @@ class TestInitBaseHandler(unittest.TestCase):
         """
         
         from weblayer.interfaces import IStaticURLGenerator
+        from weblayer.request import BaseHandler
         
         handler = self._make_one('', '', '')
-        
+        self.assertTrue(handler.static == 'multi adapted')
         self.assertTrue(
             _was_called_with(
-                self.mock_registry.getMultiAdapter, (
+                self.mock_registry.getCachedMultiAdapter, (
                     handler.request, 
                     handler.settings
                 ),
-                IStaticURLGenerator
+                IStaticURLGenerator,
+                BaseHandler
             )
         )
-        self.assertTrue(handler.static == 'multi adapted')
         
         handler = self._make_one(
             '', 
@@ -208,8 +211,8 @@ class TestInitBaseHandler(unittest.TestCase):
             '',
             authentication_manager_adapter=self.adapter
         )
-        self.adapter.assert_called_with(handler.request)
         self.assertTrue(handler.auth == 'adapted')
+        self.adapter.assert_called_with(handler.request)
         
     
     def test_authentication_manager_adapter_from_registry(self):
@@ -218,17 +221,18 @@ class TestInitBaseHandler(unittest.TestCase):
         """
         
         from weblayer.interfaces import IAuthenticationManager
+        from weblayer.request import BaseHandler
         
         handler = self._make_one('', '', '')
-        
+        self.assertTrue(handler.auth == 'adapted from registry')
         self.assertTrue(
             _was_called_with(
-                self.mock_registry.getAdapter,
+                self.mock_registry.getCachedAdapter,
                 handler.request,
-                IAuthenticationManager
+                IAuthenticationManager,
+                BaseHandler
             )
         )
-        self.assertTrue(handler.auth == 'adapted from registry')
         
         handler = self._make_one(
             '', 
@@ -250,12 +254,12 @@ class TestInitBaseHandler(unittest.TestCase):
             '', 
             secure_cookie_wrapper_adapter=self.adapter
         )
+        self.assertTrue(handler.cookies == 'adapted')
         self.adapter.assert_called_with(
             handler.request, 
             handler.response, 
             handler.settings
         )
-        self.assertTrue(handler.cookies == 'adapted')
         
     
     def test_secure_cookie_wrapper_adapter_from_registry(self):
@@ -264,20 +268,21 @@ class TestInitBaseHandler(unittest.TestCase):
         """
         
         from weblayer.interfaces import ISecureCookieWrapper
+        from weblayer.request import BaseHandler
         
         handler = self._make_one('', '', '')
-        
+        self.assertTrue(handler.cookies == 'multi adapted')
         self.assertTrue(
             _was_called_with(
-                self.mock_registry.getMultiAdapter, (
+                self.mock_registry.getCachedMultiAdapter, (
                     handler.request, 
                     handler.response, 
                     handler.settings
                 ),
-                ISecureCookieWrapper
+                ISecureCookieWrapper,
+                BaseHandler
             )
         )
-        self.assertTrue(handler.cookies == 'multi adapted')
         
         handler = self._make_one(
             '', 
@@ -288,6 +293,31 @@ class TestInitBaseHandler(unittest.TestCase):
         self.assertTrue(handler.cookies == 'multi adapted')
         
     
+    def test_adapters_are_lazy(self):
+        """ The template renderer, static url generator, authentication
+          manager and secure cookie wrapper adapters aren't called until
+          the attribute they provide is first accessed, and then only once.
+        """
+        
+        handler = self._make_one(
+            '', 
+            '', 
+            '',
+            template_renderer_adapter=self.adapter,
+            static_url_generator_adapter=self.adapter,
+            authentication_manager_adapter=self.adapter,
+            secure_cookie_wrapper_adapter=self.adapter
+        )
+        self.assertTrue(self.adapter.call_count == 0)
+        
+        for i in range(2):
+            handler.template_renderer
+            handler.static
+            handler.auth
+            handler.cookies
+        self.assertTrue(self.adapter.call_count == 4)
+        
+    
     def test_method_selector_adapter(self):
         """ If `method_selector_adapter` is not None, it's called with `self`
           and the return value is available as `self._method_selector`.
@@ -309,14 +339,16 @@ class TestInitBaseHandler(unittest.TestCase):
         """
         
         from weblayer.interfaces import IMethodSelector
+        from weblayer.request import BaseHandler
         
         handler = self._make_one('', '', '')
         
         self.assertTrue(
             _was_called_with(
-                self.mock_registry.getAdapter,
+                self.mock_registry.getCachedAdapter,
                 handler,
-                IMethodSelector
+                IMethodSelector,
+                BaseHandler
             )
         )
         self.assertTrue(handler._method_selector == 'adapted from registry')
@@ -593,6 +625,23 @@ class TestBaseHandlerRender(unittest.TestCase):
         self.assertTrue(kwargs['request'] == 'bar')
         
     
+    def test_stream(self):
+        """ `stream` passes `tmpl_name`, `params` and `kwargs` to 
+          `self.template_renderer.stream` and returns the result.
+        """
+        
+        template_renderer = self.handler.template_renderer
+        template_renderer.stream.return_value = 'chunks'
+        
+        result = self.handler.stream('foo.tmpl', foo='bar')
+        self.assertTrue(result == 'chunks')
+        
+        args = template_renderer.stream.call_args
+        self.assertTrue(args[0][0] == 'foo.tmpl')
+        self.assertTrue(args[1]['foo'] == 'bar')
+        self.assertTrue(args[1]['request'] == self.handler.request)
+        
+    
     
 
 class TestBaseHandlerRedirect(unittest.TestCase):
@@ -795,6 +844,7 @@ class TestBaseHandlerError(unittest.TestCase):
         """ `handle_method_not_found` calls `self.error(status=405)`.
         """
         
+        self.handler._method_selector.allow = None
         self.handler.error = Mock()
         self.handler.error.return_value = '405 response'
         response = self.handler.handle_method_not_found('method_name')
@@ -802,6 +852,20 @@ class TestBaseHandlerError(unittest.TestCase):
         self.assertTrue(response == '405 response')
         
     
+    def test_handle_method_not_found_allow(self):
+        """ If the method selector provides `allow`, it's passed to 
+          `self.error` as an `Allow` header.
+        """
+        
+        self.handler._method_selector.allow = 'GET, HEAD'
+        self.handler.error = Mock()
+        self.handler.handle_method_not_found('method_name')
+        self.handler.error.assert_called_with(
+            status=405, 
+            headers=[('Allow', 'GET, HEAD')]
+        )
+        
+    
     def test_handle_xsrf_error_requires_err(self):
         """ `handle_method_not_found` requires `err`.
         """
@@ -1109,9 +1173,10 @@ class TestCallBaseHandler(unittest.TestCase):
         
         self.handler._response_normaliser_adapter = None
         self.handler('foo')
-        mock_registry.getAdapter.assert_called_with(
+        mock_registry.getCachedAdapter.assert_called_with(
             self.handler.response,
-            IResponseNormaliser
+            IResponseNormaliser,
+            request.BaseHandler
         )
         
         request.registry = __registry
@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Unit tests for `weblayer.static`.
+"""
+
+import unittest
+
+try: # pragma: no cover
+    from mock import Mock
+except: # pragma: no cover
+    pass
+
+class StoreTests(object):
+    """ Tests shared by the `IStaticDigestStore` implementations.
+    """
+    
+    def setUp(self):
+        import os
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'digests')
+        
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.directory)
+        
+    
+    def test_provides_interface(self):
+        """ Stores provide `IStaticDigestStore`.
+        """
+        
+        from weblayer.interfaces import IStaticDigestStore
+        store = self.make_one(self.path)
+        self.assertTrue(IStaticDigestStore.providedBy(store))
+        
+    
+    def test_get_missing(self):
+        """ `get()` returns `None` for a file that hasn't been `set()`.
+        """
+        
+        store = self.make_one(self.path)
+        self.assertTrue(store.get('/static/foo.js') is None)
+        
+    
+    def test_set_get(self):
+        """ `get()` returns the latest `(signature, digest)` `set()` by any
+          store using the same file.
+        """
+        
+        store = self.make_one(self.path)
+        store.set('/static/foo.js', 'sig', 'digest')
+        self.assertTrue(store.get('/static/foo.js') == ('sig', 'digest'))
+        
+        other = self.make_one(self.path)
+        self.assertTrue(other.get('/static/foo.js') == ('sig', 'digest'))
+        other.set('/static/foo.js', 'changed', 'new digest')
+        value = store.get('/static/foo.js')
+        self.assertTrue(value == ('changed', 'new digest'))
+        
+    
+    def test_creates_private_file(self):
+        """ The file is created readable and writable by its owner only.
+        """
+        
+        import os
+        store = self.make_one(self.path)
+        store.set('/static/foo.js', 'sig', 'digest')
+        self.assertTrue(os.stat(self.path).st_mode & 0777 == 0600)
+        
+    
+    def test_refuses_writable_file(self):
+        """ A file other users can write to is refused, rather than trusted.
+        """
+        
+        import os
+        sock = open(self.path, 'w')
+        sock.close()
+        os.chmod(self.path, 0666)
+        
+        store = self.make_one(self.path)
+        self.assertRaises(ValueError, store.set, '/static/foo.js', 's', 'd')
+        self.assertRaises(ValueError, store.get, '/static/foo.js')
+        
+    
+    def test_concurrent_writers(self):
+        """ Stores writing to the same file at the same time don't lose or
+          corrupt each other's digests.
+        """
+        
+        import threading
+        
+        errors = []
+        
+        def write(i):
+            store = self.make_one(self.path)
+            try:
+                for j in range(50):
+                    path = '/static/%d/%d.js' % (i, j)
+                    store.set(path, 'sig %d' % j, 'digest %d %d' % (i, j))
+            except Exception, err:
+                errors.append(err)
+        
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        
+        self.assertTrue(errors == [])
+        store = self.make_one(self.path)
+        for i in range(8):
+            for j in range(50):
+                value = store.get('/static/%d/%d.js' % (i, j))
+                expected = ('sig %d' % j, 'digest %d %d' % (i, j))
+                self.assertTrue(value == expected)
+        
+    
+    
+
+class TestSQLiteStaticDigestStore(StoreTests, unittest.TestCase):
+    """ Test the logic of the `SQLiteStaticDigestStore`.
+    """
+    
+    def make_one(self, *args, **kwargs):
+        from weblayer.static import SQLiteStaticDigestStore
+        return SQLiteStaticDigestStore(*args, **kwargs)
+        
+    
+    
+
+class TestMmapStaticDigestStore(StoreTests, unittest.TestCase):
+    """ Test the logic of the `MmapStaticDigestStore`.
+    """
+    
+    def make_one(self, *args, **kwargs):
+        from weblayer.static import MmapStaticDigestStore
+        return MmapStaticDigestStore(*args, **kwargs)
+        
+    
+    def test_ignores_partial_lines(self):
+        """ Lines that haven't been completely written yet are ignored until
+          they have been.
+        """
+        
+        store = self.make_one(self.path)
+        store.set('/static/foo.js', 'sig', 'digest')
+        sock = open(self.path, 'a')
+        sock.write('/static/bar.js\tsig')
+        sock.flush()
+        self.assertTrue(store.get('/static/bar.js') is None)
+        sock.write('\tdigest\n')
+        sock.close()
+        self.assertTrue(store.get('/static/bar.js') == ('sig', 'digest'))
+        
+    
+    
+
+class TestStoreCachedStaticURLGenerator(unittest.TestCase):
+    """ Test the logic of the `StoreCachedStaticURLGenerator`.
+    """
+    
+    def setUp(self):
+        self.request = Mock()
+        self.request.host_url = 'http://foo.com'
+        self.settings = {
+            'static_files_path': '/var/www/static', 
+            'static_url_prefix': u'/static/'
+        }
+        self.store = Mock()
+        self.store.get.return_value = None
+        self.stat_file = Mock()
+        self.stat_file.return_value.st_size = 1024
+        self.stat_file.return_value.st_mtime = 1.0
+        self.stat_file.return_value.st_ino = 42
+        self.generate_hash = Mock()
+        self.generate_hash.return_value = 'abcdefghijk'
+        
+    
+    def tearDown(self):
+        from weblayer.static import StoreCachedStaticURLGenerator
+        StoreCachedStaticURLGenerator._cache = {}
+        StoreCachedStaticURLGenerator._stats = {}
+        StoreCachedStaticURLGenerator._stores = {}
+        
+    
+    def make_one(self, *args, **kwargs):
+        from weblayer.static import StoreCachedStaticURLGenerator
+        kwargs.setdefault('open_file_', Mock())
+        kwargs.setdefault('generate_hash_', self.generate_hash)
+        kwargs.setdefault('stat_file_', self.stat_file)
+        return StoreCachedStaticURLGenerator(*args, **kwargs)
+        
+    
+    def test_get_store_requires_path(self):
+        """ The built in stores require `settings['static_digest_store_path']`
+          rather than defaulting to a shared location.
+        """
+        
+        from weblayer.static import StoreCachedStaticURLGenerator
+        get_store = StoreCachedStaticURLGenerator.get_store
+        self.assertRaises(ValueError, get_store, self.settings)
+        self.settings['static_digest_store_path'] = ''
+        self.assertRaises(ValueError, get_store, self.settings)
+        
+    
+    def test_get_store(self):
+        """ Built in stores are created once per `(store, path)`.
+        """
+        
+        from weblayer.static import SQLiteStaticDigestStore
+        from weblayer.static import StoreCachedStaticURLGenerator
+        get_store = StoreCachedStaticURLGenerator.get_store
+        self.settings['static_digest_store_path'] = '/var/lib/digests'
+        
+        store = get_store(self.settings)
+        self.assertTrue(isinstance(store, SQLiteStaticDigestStore))
+        self.assertTrue(get_store(self.settings) is store)
+        self.settings['static_digest_store_path'] = '/var/lib/other'
+        self.assertTrue(get_store(self.settings) is not store)
+        
+    
+    def test_hashes_and_stores(self):
+        """ Files the store doesn't have a digest for are hashed and the
+          digest is stored against the file's signature.
+        """
+        
+        static = self.make_one(self.request, self.settings, store_=self.store)
+        url = static.get_url('foo.js')
+        
+        self.assertTrue(url == u'http://foo.com/static/foo.js?v=abcdefg')
+        self.store.set.assert_called_with(
+            '/var/www/static/foo.js',
+            'sha512:1024:1.0:42',
+            'abcdefghijk'
+        )
+        
+    
+    def test_shares_digests(self):
+        """ A digest stored by one process is used by another, without
+          hashing the file again.
+        """
+        
+        from weblayer.static import SQLiteStaticDigestStore
+        from weblayer.static import StoreCachedStaticURLGenerator
+        import os
+        import shutil
+        import tempfile
+        
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'digests')
+            static = self.make_one(
+                self.request, 
+                self.settings, 
+                store_=SQLiteStaticDigestStore(path)
+            )
+            static.get_url('foo.js')
+            self.assertTrue(self.generate_hash.call_count == 1)
+            
+            # a new process starts with an empty memory cache
+            StoreCachedStaticURLGenerator._cache = {}
+            StoreCachedStaticURLGenerator._stats = {}
+            static = self.make_one(
+                self.request, 
+                self.settings, 
+                store_=SQLiteStaticDigestStore(path)
+            )
+            url = static.get_url('foo.js')
+        finally:
+            shutil.rmtree(directory)
+        
+        self.assertTrue(url == u'http://foo.com/static/foo.js?v=abcdefg')
+        self.assertTrue(self.generate_hash.call_count == 1)
+        
+    
+    def test_rehashes_changed_files(self):
+        """ Stored digests for a different signature or hash algorithm are
+          ignored.
+        """
+        
+        self.store.get.return_value = ('sha512:1024:0.5:42', 'stale')
+        static = self.make_one(self.request, self.settings, store_=self.store)
+        url = static.get_url('foo.js')
+        self.assertTrue(url == u'http://foo.com/static/foo.js?v=abcdefg')
+        
+        self.store.get.return_value = ('md5:1024:1.0:42', 'stale')
+        self.settings['static_hash_algorithm'] = 'md5'
+        static = self.make_one(self.request, self.settings, store_=self.store)
+        static._cache_path('/var/www/static/foo.js')
+        self.assertTrue(static._cache['/var/www/static/foo.js'] == 'stale')
+        
+    
+    
+
+class TestMain(unittest.TestCase):
+    """ Test the `weblayer-build-static-manifest` command line script.
+    """
+    
+    def setUp(self):
+        import os
+        import sys
+        import tempfile
+        from StringIO import StringIO
+        self.static_files_path = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.static_files_path, 'js'))
+        for file_path in 'foo.css', 'js/bar.js':
+            sock = open(os.path.join(self.static_files_path, file_path), 'w')
+            sock.write(file_path)
+            sock.close()
+        self.manifest_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.manifest_dir, 'manifest.json')
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+        
+    
+    def tearDown(self):
+        import shutil
+        import sys
+        sys.stdout = self.stdout
+        shutil.rmtree(self.static_files_path)
+        shutil.rmtree(self.manifest_dir)
+        
+    
+    def test_writes_manifest(self):
+        """ Hashes the files in the static files path and writes their
+          digests to the manifest path.
+        """
+        
+        import sys
+        from weblayer.static import main, read_manifest
+        from weblayer.utils import generate_hash
+        
+        main([self.static_files_path, self.manifest_path])
+        
+        manifest = read_manifest(self.manifest_path)
+        self.assertTrue(sorted(manifest) == ['foo.css', 'js/bar.js'])
+        digest = generate_hash(s='js/bar.js', algorithm='sha512')
+        self.assertTrue(manifest['js/bar.js'] == digest)
+        output = sys.stdout.getvalue()
+        self.assertTrue(output.startswith('Wrote 2 digests to '))
+        
+    
+    def test_options(self):
+        """ `-t` and `-a` set the number of threads and the hash algorithm.
+        """
+        
+        from weblayer.static import main, read_manifest
+        from weblayer.utils import generate_hash
+        
+        args = ['-t', '1', '-a', 'md5']
+        main(args + [self.static_files_path, self.manifest_path])
+        
+        manifest = read_manifest(self.manifest_path)
+        digest = generate_hash(s='foo.css', algorithm='md5')
+        self.assertTrue(manifest['foo.css'] == digest)
+        
+    
+    def test_requires_two_paths(self):
+        """ A static files path and a manifest path are required.
+        """
+        
+        import sys
+        from StringIO import StringIO
+        from weblayer.static import main
+        
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, main, [self.static_files_path])
+        finally:
+            sys.stderr = stderr
+        
+    
+    
+
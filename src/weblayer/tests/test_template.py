@@ -64,6 +64,8 @@ class TestMakoTemplateRenderer(unittest.TestCase):
             input_encoding='utf-8',
             output_encoding='utf-8', 
             encoding_errors='replace',
+            collection_size=-1,
+            filesystem_checks=True,
             foo='bar'
         )
         
@@ -91,12 +93,56 @@ class TestMakoTemplateRenderer(unittest.TestCase):
             input_encoding='utf-8',
             output_encoding='utf-8', 
             encoding_errors='replace',
+            collection_size=-1,
+            filesystem_checks=True,
             foo='bar'
         )
         
         template.TemplateLookup = __TemplateLookup
         
     
+    def test_init_template_lookup_settings(self):
+        """ `collection_size` and `filesystem_checks` default to the 
+          `template_collection_size` and `template_filesystem_checks` settings.
+        """
+        
+        self.settings['template_collection_size'] = 50
+        self.settings['template_filesystem_checks'] = False
+        template_renderer = self.make_one(
+            self.settings,
+            module_directory='c',
+            template_lookup_class=self.template_lookup_class
+        )
+        
+        self.template_lookup_class.assert_called_with(
+            directories=['a', 'b'],
+            module_directory='c',
+            input_encoding='utf-8',
+            output_encoding='utf-8', 
+            encoding_errors='replace',
+            collection_size=50,
+            filesystem_checks=False
+        )
+        
+    
+    def test_init_template_lookup_shared(self):
+        """ The template lookup is shared between renderers with the same
+          configuration.
+        """
+        
+        a = self.make_one(
+            self.settings,
+            template_lookup_class=self.template_lookup_class
+        )
+        b = self.make_one(
+            self.settings,
+            template_lookup_class=self.template_lookup_class
+        )
+        
+        self.assertTrue(a.template_lookup is b.template_lookup)
+        self.assertTrue(self.template_lookup_class.call_count == 1)
+        
+    
     def test_render_get_template(self):
         """ Calling `render(tmpl_name, ...)` on the `MakoTemplateRenderer` 
           instance calls get_template(tmpl_name) on the lookup instance. 
@@ -144,6 +190,159 @@ class TestMakoTemplateRenderer(unittest.TestCase):
         self.template.render.assert_called_with(d='elephants')
         
     
+    def test_stream_template(self):
+        """ Calling `stream(tmpl_name, **kwargs)` renders the template into a
+          context, passing through the `built_ins` updated with the `kwargs`,
+          and returns an iterator over the encoded output.
+        """
+        
+        def render_context(context, **kwargs):
+            context.write(u'\xe9')
+            context.write(u'a')
+        
+        self.template.render_context.side_effect = render_context
+        self.template.output_encoding = 'utf-8'
+        self.template.encoding_errors = 'replace'
+        
+        template_renderer = self.make_one(
+            self.settings,
+            module_directory='c',
+            built_ins={'d': 'e'},
+            template_lookup_class=self.template_lookup_class,
+            foo='bar'
+        )
+        chunks = template_renderer.stream('foo.tmpl', baz='blah')
+        
+        self.template_lookup_instance.get_template.assert_called_with(
+            'foo.tmpl'
+        )
+        kwargs = self.template.render_context.call_args[1]
+        self.assertTrue(kwargs == {'baz': 'blah', 'd': 'e'})
+        self.assertTrue(list(chunks) == ['\xc3\xa9a'])
+        
+    
+    def test_init_extensions(self):
+        """ `extensions` default to `settings['template_extensions']`, which
+          defaults to `('.tmpl', '.html', '.mako')`.
+        """
+        
+        template_renderer = self.make_one(
+            self.settings,
+            template_lookup_class=self.template_lookup_class
+        )
+        extensions = template_renderer.extensions
+        self.assertTrue(extensions == ('.tmpl', '.html', '.mako'))
+        
+        self.settings['template_extensions'] = ['.txt']
+        template_renderer = self.make_one(
+            self.settings,
+            template_lookup_class=self.template_lookup_class
+        )
+        self.assertTrue(template_renderer.extensions == ('.txt',))
+        
+    
+    def test_precompile_skips_stray_files(self):
+        """ `precompile()` only gets files ending with one of 
+          `self.extensions`, skipping hidden and stray files.
+        """
+        
+        import os
+        import shutil
+        import tempfile
+        
+        tmpl_dir = tempfile.mkdtemp()
+        try:
+            for filename in 'a.tmpl', 'b.html', 'README', 'c.png', '.d.tmpl':
+                sock = open(os.path.join(tmpl_dir, filename), 'w')
+                sock.write('')
+                sock.close()
+            template_renderer = self.make_one(
+                {'template_directories': [tmpl_dir]},
+                template_lookup_class=self.template_lookup_class
+            )
+            tmpl_names = template_renderer.precompile()
+        finally:
+            shutil.rmtree(tmpl_dir)
+        
+        self.assertTrue(tmpl_names == ['a.tmpl', 'b.html'])
+        get_template = self.template_lookup_instance.get_template
+        got = [args[0][0] for args in get_template.call_args_list]
+        self.assertTrue(got == tmpl_names)
+        
+    
     
 
+class TestMain(unittest.TestCase):
+    """ Test the `weblayer-compile-templates` command line script.
+    """
+    
+    def setUp(self):
+        import os
+        import sys
+        import tempfile
+        from StringIO import StringIO
+        self.tmpl_dir = tempfile.mkdtemp()
+        self.module_dir = tempfile.mkdtemp()
+        for filename in 'index.tmpl', 'README':
+            sock = open(os.path.join(self.tmpl_dir, filename), 'w')
+            sock.write(u'<h1>${foo}</h1>')
+            sock.close()
+        self.stdout = sys.stdout
+        sys.stdout = StringIO()
+        
+    
+    def tearDown(self):
+        import shutil
+        import sys
+        sys.stdout = self.stdout
+        shutil.rmtree(self.tmpl_dir)
+        shutil.rmtree(self.module_dir)
+        
+    
+    def test_compiles_templates(self):
+        """ Compiles the templates in the directories passed in into the 
+          module directory.
+        """
+        
+        import os
+        import sys
+        from weblayer.template import main
+        
+        main(['-m', self.module_dir, self.tmpl_dir])
+        
+        output = sys.stdout.getvalue()
+        self.assertTrue(output.startswith('Compiled 1 templates into '))
+        self.assertTrue(os.listdir(self.module_dir))
+        
+    
+    def test_extensions(self):
+        """ `-e` overrides the extensions treated as templates.
+        """
+        
+        import sys
+        from weblayer.template import main
+        
+        main(['-m', self.module_dir, '-e', '.tmpl', '-e', '', self.tmpl_dir])
+        
+        output = sys.stdout.getvalue()
+        self.assertTrue(output.startswith('Compiled 2 templates into '))
+        
+    
+    def test_no_directories(self):
+        """ At least one template directory is required.
+        """
+        
+        import sys
+        from StringIO import StringIO
+        from weblayer.template import main
+        
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, main, ['-m', self.module_dir])
+        finally:
+            sys.stderr = stderr
+        
+    
+    
 
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""" Unit tests for `weblayer.utils`.
+"""
+
+import sys
+import unittest
+
+try: # pragma: no cover
+    from mock import Mock
+except: # pragma: no cover
+    pass
+
+def _json_dumps(value, ensure_ascii=True, **kwargs):
+    return 'dumped'
+    
+
+def _ujson_dumps(value, ensure_ascii=True, double_precision=9):
+    return 'dumped'
+    
+
+def _yajl_dumps(value, indent=None):
+    return 'dumped'
+    
+
+def _loads(value):
+    return 'loaded'
+    
+
+class TestJSONBackends(unittest.TestCase):
+    """ Test `json_encode()` and `json_decode()` through each registered JSON
+      backend, using mock modules with the backend's `dumps()` signature.
+    """
+    
+    signatures = {
+        'simplejson': _json_dumps,
+        'django': _json_dumps,
+        'json': _json_dumps,
+        'ujson': _ujson_dumps,
+        'yajl': _yajl_dumps
+    }
+    
+    def setUp(self):
+        from weblayer import utils
+        self.json_backends = utils._json_backends.copy()
+        self.json_dumps = utils._json_dumps
+        self.json_loads = utils._json_loads
+        self.modules = {}
+        for name, (backend, unsupported_kwargs) in self.json_backends.items():
+            module = Mock()
+            module.dumps = Mock(wraps=self.signatures[name])
+            module.loads = Mock(wraps=_loads)
+            self.modules[name] = module
+            utils._json_backends[name] = (module, unsupported_kwargs)
+        
+    
+    def tearDown(self):
+        from weblayer import utils
+        utils._json_backends.clear()
+        utils._json_backends.update(self.json_backends)
+        utils._json_dumps = self.json_dumps
+        utils._json_loads = self.json_loads
+        
+    
+    def test_json_encode(self):
+        """ `json_encode()`, which always passes `ensure_ascii`, works with
+          each registered backend's `dumps()` signature.
+        """
+        
+        from weblayer.utils import json_encode, use_json_backend
+        for name, (backend, unsupported_kwargs) in self.json_backends.items():
+            use_json_backend(name)
+            self.assertTrue(json_encode({'a': 'b'}) == 'dumped')
+            self.assertTrue(json_encode([], ensure_ascii=True) == 'dumped')
+            kwargs = self.modules[name].dumps.call_args[1]
+            if 'ensure_ascii' in unsupported_kwargs:
+                self.assertTrue(kwargs == {})
+            else:
+                self.assertTrue(kwargs == {'ensure_ascii': True})
+        
+    
+    def test_json_decode(self):
+        """ `json_decode()` works with each registered backend's `loads()`.
+        """
+        
+        from weblayer.utils import json_decode, use_json_backend
+        for name in self.json_backends:
+            use_json_backend(name)
+            self.assertTrue(json_decode('{}') == 'loaded')
+            self.modules[name].loads.assert_called_with(u'{}')
+        
+    
+    
+
@@ -319,3 +319,334 @@ class TestCallWSGIApplication(unittest.TestCase):
     
     
 
+class TestFastPathWSGIApplication(unittest.TestCase):
+    """ Test the logic of `FastPathWSGIApplication`.
+    """
+    
+    def setUp(self):
+        from weblayer import wsgi
+        self.__registry = wsgi.registry
+        self.registry = Mock()
+        self.registry.queryAdapter.return_value = 'template renderer'
+        self.registry.adapters.lookup.return_value = 'factory'
+        wsgi.registry = self.registry
+        self.settings = {'foo': 'bar'}
+        self.environ = {'REQUEST_METHOD': 'FOO'}
+        self.path_router = Mock()
+        self.Request = Mock()
+        self.request_instance = Mock()
+        self.request_instance.path = '/path'
+        self.Request.return_value = self.request_instance
+        self.Response = Mock()
+        self.response_instance = Mock()
+        self.Response.return_value = self.response_instance
+        
+    
+    def tearDown(self):
+        from weblayer import wsgi
+        wsgi.registry = self.__registry
+        
+    
+    def make_one(self):
+        from weblayer.wsgi import FastPathWSGIApplication
+        return FastPathWSGIApplication(
+            self.settings,
+            self.path_router,
+            request_class=self.Request,
+            response_class=self.Response
+        )
+        
+    
+    def test_handler_not_base_handler(self):
+        """ Handlers that don't subclass `BaseHandler` are initialised with
+          `request`, `response` and `settings`.
+        """
+        
+        handler_class = Mock()
+        self.path_router.match.return_value = (handler_class, (), {})
+        app = self.make_one()
+        app(self.environ, 'start response')
+        handler_class.assert_called_with(
+            self.request_instance, 
+            self.response_instance,
+            self.settings
+        )
+        
+    
+    def test_handler_kwargs(self):
+        """ `BaseHandler` subclasses are passed the template renderer and
+          the adapter factories.
+        """
+        
+        from weblayer.request import BaseHandler
+        
+        calls = []
+        class Handler(BaseHandler):
+            def __init__(self, *args, **kwargs):
+                calls.append((args, kwargs))
+            
+            def __call__(self, method_name, *args, **kwargs):
+                return Mock()
+            
+        
+        
+        self.path_router.match.return_value = (Handler, (), {})
+        app = self.make_one()
+        app(self.environ, 'start response')
+        
+        args, kwargs = calls[0]
+        self.assertTrue(args[2] == self.settings)
+        template_renderer_adapter = kwargs.pop('template_renderer_adapter')
+        self.assertTrue(template_renderer_adapter(None) == 'template renderer')
+        self.assertTrue(
+            sorted(kwargs.keys()) == [
+                'authentication_manager_adapter', 
+                'method_selector_adapter', 
+                'response_normaliser_adapter', 
+                'secure_cookie_wrapper_adapter', 
+                'static_url_generator_adapter'
+            ]
+        )
+        self.assertTrue(set(kwargs.values()) == set(['factory']))
+        
+    
+    def test_handler_kwargs_cached(self):
+        """ The components are only looked up once per handler class.
+        """
+        
+        from weblayer.request import BaseHandler
+        
+        class Handler(BaseHandler):
+            def __init__(self, *args, **kwargs):
+                pass
+            
+            def __call__(self, method_name, *args, **kwargs):
+                return Mock()
+            
+        
+        
+        self.path_router.match.return_value = (Handler, (), {})
+        app = self.make_one()
+        app(self.environ, 'start response')
+        app(self.environ, 'start response')
+        self.assertTrue(self.registry.queryAdapter.call_count == 1)
+        self.assertTrue(self.registry.adapters.lookup.call_count == 5)
+        
+    
+    
+
+class TestLoadShedder(unittest.TestCase):
+    """ Test the logic of `LoadShedder`.
+    """
+    
+    def setUp(self):
+        self.environ = {
+            'REQUEST_METHOD': 'GET', 
+            'PATH_INFO': '/',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'wsgi.url_scheme': 'http'
+        }
+        self.statuses = []
+        
+    
+    def start_response(self, status, headers, exc_info=None):
+        self.statuses.append((status, headers))
+        
+    
+    def make_one(self, *args, **kwargs):
+        from weblayer.wsgi import LoadShedder
+        return LoadShedder(*args, **kwargs)
+        
+    
+    def send(self, shedder):
+        """ Call `shedder` and consume and close the response, as a `WSGI`
+          server would.
+        """
+        
+        app_iter = shedder(self.environ, self.start_response)
+        try:
+            return list(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+        
+    
+    def test_calls_application(self):
+        """ When there's a free slot, returns the application's response.
+        """
+        
+        application = Mock()
+        application.return_value = ['response']
+        shedder = self.make_one(application)
+        
+        response = self.send(shedder)
+        application.assert_called_with(self.environ, self.start_response)
+        self.assertTrue(response == ['response'])
+        
+    
+    def test_slot_released_when_application_raises(self):
+        """ The slot is released when the application raises.
+        """
+        
+        def application(environ, start_response):
+            raise Exception
+        
+        shedder = self.make_one(application, max_concurrent=1, max_queued=0)
+        self.assertRaises(Exception, shedder, self.environ, self.start_response)
+        self.assertTrue(shedder._active == 0)
+        
+    
+    def test_slot_held_until_app_iter_closed(self):
+        """ The slot is held whilst the response is being sent, so requests
+          are shed whilst an unfinished `app_iter` is open, and released when
+          it's closed.
+        """
+        
+        def application(environ, start_response):
+            start_response('200 OK', [])
+            return iter(['a', 'b'])
+        
+        shedder = self.make_one(application, max_concurrent=1, max_queued=0)
+        app_iter = shedder(self.environ, self.start_response)
+        self.assertTrue(app_iter.next() == 'a')
+        
+        self.send(shedder)
+        self.assertTrue(self.statuses[-1][0].startswith('503'))
+        
+        app_iter.close()
+        self.assertTrue(shedder._active == 0)
+        self.assertTrue(self.send(shedder) == ['a', 'b'])
+        self.assertTrue(self.statuses[-1][0].startswith('200'))
+        
+    
+    def test_slot_released_when_app_iter_exhausted(self):
+        """ The slot is released when the `app_iter` is exhausted, even if
+          the server doesn't call `close()`.
+        """
+        
+        application = Mock()
+        application.return_value = ['a']
+        shedder = self.make_one(application, max_concurrent=1, max_queued=0)
+        
+        app_iter = shedder(self.environ, self.start_response)
+        self.assertTrue(shedder._active == 1)
+        self.assertTrue(list(app_iter) == ['a'])
+        self.assertTrue(shedder._active == 0)
+        
+    
+    def test_slot_released_when_app_iter_raises(self):
+        """ The slot is released when iterating over the `app_iter` raises.
+        """
+        
+        def app_iter():
+            yield 'a'
+            raise ValueError
+        
+        application = Mock()
+        application.return_value = app_iter()
+        shedder = self.make_one(application, max_concurrent=1, max_queued=0)
+        
+        self.assertRaises(ValueError, self.send, shedder)
+        self.assertTrue(shedder._active == 0)
+        
+    
+    def test_closes_app_iter(self):
+        """ Closing the response closes the application's `app_iter`.
+        """
+        
+        application = Mock()
+        application.return_value.__iter__ = Mock(return_value=iter([]))
+        shedder = self.make_one(application)
+        
+        self.send(shedder)
+        self.assertTrue(application.return_value.close.called)
+        
+    
+    def test_sheds_when_queue_full(self):
+        """ When all slots are taken and the queue is full, returns a 503 
+          with a `Retry-After` header.
+        """
+        
+        def application(environ, start_response):
+            self.send(shedder)
+            return ['response']
+        
+        shedder = self.make_one(
+            application, 
+            max_concurrent=1, 
+            max_queued=0,
+            retry_after=5
+        )
+        response = self.send(shedder)
+        
+        self.assertTrue(response == ['response'])
+        status, headers = self.statuses[0]
+        self.assertTrue(status.startswith('503'))
+        self.assertTrue(('Retry-After', '5') in headers)
+        
+    
+    def test_sheds_after_max_wait(self):
+        """ Queued requests that don't get a slot within `max_wait` seconds
+          are shed.
+        """
+        
+        application = Mock()
+        application.return_value = ['a']
+        shedder = self.make_one(
+            application, 
+            max_concurrent=1, 
+            max_queued=1,
+            max_wait=0.05
+        )
+        app_iter = shedder(self.environ, self.start_response)
+        
+        self.send(shedder)
+        self.assertTrue(self.statuses[-1][0].startswith('503'))
+        self.assertTrue(shedder._queued == 0)
+        self.assertTrue(application.call_count == 1)
+        
+        app_iter.close()
+        
+    
+    def test_queued_requests_wait_for_a_slot(self):
+        """ When all slots are taken but the queue isn't full, requests wait
+          for a free slot.
+        """
+        
+        import threading
+        
+        started = threading.Event()
+        finish = threading.Event()
+        calls = []
+        
+        def application(environ, start_response):
+            calls.append(environ)
+            started.set()
+            finish.wait(5)
+            return ['response']
+        
+        shedder = self.make_one(application, max_concurrent=1, max_queued=1)
+        first = threading.Thread(target=self.send, args=(shedder,))
+        first.start()
+        started.wait(5)
+        
+        second = threading.Thread(target=self.send, args=(shedder,))
+        second.start()
+        while not shedder._queued:
+            second.join(0.01)
+        
+        # the queue is now full
+        self.send(shedder)
+        self.assertTrue(self.statuses[0][0].startswith('503'))
+        
+        finish.set()
+        first.join(5)
+        second.join(5)
+        self.assertTrue(len(calls) == 2)
+        self.assertTrue(shedder._queued == 0)
+        self.assertTrue(shedder._active == 0)
+        
+    
+    
+
@@ -13,11 +13,17 @@ __all__ = [
     'unicode_urlencode',
     'json_encode',
     'json_decode',
-    'generate_hash'
+    'register_json_backend',
+    'get_json_backend',
+    'available_json_backends',
+    'use_json_backend',
+    'generate_hash',
+    'LRUCache'
 ]
 
 import hashlib
 import random
+import threading
 import time
 import urllib
 import xml.sax.saxutils
@@ -31,6 +37,16 @@ except ImportError: # pragma: no cover
         import json
     
 
+_json_backends = {
+    'simplejson': ('simplejson', ()),
+    'django': ('django.utils.simplejson', ()),
+    'json': ('json', ()),
+    'ujson': ('ujson', ()),
+    'yajl': ('yajl', ('ensure_ascii',))
+}
+_json_dumps = json.dumps
+_json_loads = json.loads
+
 def encode_to_utf8(value):
     """ Converts a ``unicode`` to a utf-8 encoded ``str``::
       
@@ -245,7 +261,7 @@ def json_encode(value, ensure_ascii=False, **kwargs):
       
     """
     
-    return json.dumps(value, ensure_ascii=ensure_ascii, **kwargs)
+    return _json_dumps(value, ensure_ascii=ensure_ascii, **kwargs)
     
 
 def json_decode(value, **kwargs):
@@ -274,11 +290,147 @@ def json_decode(value, **kwargs):
       
     """
     
-    return json.loads(decode_to_unicode(value), **kwargs)
+    return _json_loads(decode_to_unicode(value), **kwargs)
+    
+
+def _drop_kwargs(f, unsupported_kwargs):
+    """ Wraps ``f`` so that the keyword arguments named in 
+      ``unsupported_kwargs`` are dropped rather than passed through::
+      
+          >>> from mock import Mock
+          >>> f = Mock()
+          >>> wrapped = _drop_kwargs(f, ('ensure_ascii',))
+          >>> wrapped('a', ensure_ascii=True, indent=4) == f.return_value
+          True
+          >>> f.call_args == (('a',), {'indent': 4})
+          True
+      
+    """
+    
+    def wrapped(value, **kwargs):
+        for key in unsupported_kwargs:
+            kwargs.pop(key, None)
+        return f(value, **kwargs)
+    
+    return wrapped
     
 
+def register_json_backend(name, backend, unsupported_kwargs=()):
+    """ Register a JSON ``backend`` as ``name``.  The ``backend`` is either an
+      object with ``dumps`` and ``loads`` functions, or the dotted name of a 
+      module that provides them, which is only imported when the backend
+      is used::
+      
+          >>> register_json_backend('foo', 'foo.json')
+          >>> _json_backends['foo']
+          ('foo.json', ())
+          >>> del _json_backends['foo']
+      
+      Keyword arguments that :py:func:`json_encode` and :py:func:`json_decode`
+      pass through but the backend's functions don't accept (e.g.: `yajl`_ 
+      doesn't support ``ensure_ascii``) should be listed in
+      ``unsupported_kwargs``, so they're dropped rather than raising a
+      ``TypeError``.
+      
+      .. _`yajl`: http://pypi.python.org/pypi/yajl
+    """
+    
+    _json_backends[name] = (backend, tuple(unsupported_kwargs))
+    
+
+def get_json_backend(name):
+    """ Returns the ``(dumps, loads)`` functions of the JSON backend 
+      registered as ``name``::
+      
+          >>> import json as stdlib_json
+          >>> get_json_backend('json') == (stdlib_json.dumps, stdlib_json.loads)
+          True
+      
+      ``'auto'`` is the first of ``simplejson``, ``django.utils.simplejson``
+      and the standard library ``json`` module that can be imported::
+      
+          >>> get_json_backend('auto') == (json.dumps, json.loads)
+          True
+      
+      Raises a ``ValueError`` if no backend is registered as ``name`` and an
+      ``ImportError`` if the backend isn't installed::
+      
+          >>> get_json_backend('foo')
+          Traceback (most recent call last):
+          ...
+          ValueError: No JSON backend registered as `foo`
+          >>> register_json_backend('foo', 'foo.json')
+          >>> get_json_backend('foo')
+          Traceback (most recent call last):
+          ...
+          ImportError: No module named foo.json
+          >>> del _json_backends['foo']
+      
+    """
+    
+    if name == 'auto':
+        return json.dumps, json.loads
+    
+    try:
+        backend, unsupported_kwargs = _json_backends[name]
+    except KeyError:
+        raise ValueError(u'No JSON backend registered as `%s`' % name)
+    
+    if isinstance(backend, basestring):
+        backend = __import__(backend, {}, {}, ['dumps', 'loads'])
+    
+    dumps, loads = backend.dumps, backend.loads
+    if unsupported_kwargs:
+        dumps = _drop_kwargs(dumps, unsupported_kwargs)
+        loads = _drop_kwargs(loads, unsupported_kwargs)
+    return dumps, loads
+    
+
+def available_json_backends():
+    """ Returns a sorted list of the names of the registered JSON backends 
+      that are installed::
+      
+          >>> 'json' in available_json_backends()
+          True
+      
+    """
+    
+    names = []
+    for name in _json_backends:
+        try:
+            get_json_backend(name)
+        except ImportError:
+            pass
+        else:
+            names.append(name)
+    return sorted(names)
+    
 
-def generate_hash(s=None, algorithm='sha512', block_size=512):
+def use_json_backend(name):
+    """ Make :py:func:`json_encode` and :py:func:`json_decode` use the JSON
+      backend registered as ``name``::
+      
+          >>> use_json_backend('json')
+          >>> json_encode({'a': 'b'})
+          '{"a": "b"}'
+      
+      Backends that are C extensions, like `ujson`_ or `yajl`_, are never
+      chosen automatically, as they handle edge cases (like which characters
+      are escaped or how unserializable values fail) differently.  The 
+      default is ``'auto'``::
+      
+          >>> use_json_backend('auto')
+      
+      .. _`ujson`: http://pypi.python.org/pypi/ujson
+      .. _`yajl`: http://pypi.python.org/pypi/yajl
+    """
+    
+    global _json_dumps, _json_loads
+    _json_dumps, _json_loads = get_json_backend(name)
+    
+
+
+def generate_hash(s=None, algorithm='sha512', block_size=65536):
     """ Generates a :py:func:`~hashlib.hash.hexdigest` string, either randomly
       or from a string or file like object (like an open file or a buffer).
       
@@ -323,13 +475,13 @@ def generate_hash(s=None, algorithm='sha512', block_size=512):
           True
       
       Reading the contents into memory in blocks of ``block_size``, which
-      defaults to ``512``::
+      defaults to ``65536``::
       
           >>> from mock import Mock
           >>> sock = Mock()
           >>> sock.read.return_value = None
           >>> s10 = generate_hash(s=sock)
-          >>> sock.read.assert_called_with(512)
+          >>> sock.read.assert_called_with(65536)
           >>> s10 = generate_hash(s=sock, block_size=1024)
           >>> sock.read.assert_called_with(1024)
       
@@ -376,3 +528,165 @@ def generate_hash(s=None, algorithm='sha512', block_size=512):
     return hasher.hexdigest()
     
 
+
+class LRUCache(object):
+    """ A thread safe, size bounded, least recently used cache::
+      
+          >>> cache = LRUCache(max_size=2)
+          >>> cache.set('a', 1)
+          >>> cache.set('b', 2)
+          >>> cache.get('a')
+          1
+      
+      When full, setting a new key evicts the least recently used item::
+      
+          >>> cache.set('c', 3)
+          >>> cache.get('b') is None
+          True
+          >>> cache.get('b', 'default')
+          'default'
+          >>> len(cache)
+          2
+          >>> 'a' in cache and 'c' in cache
+          True
+      
+      Hits and misses are counted::
+      
+          >>> cache.hits, cache.misses
+          (1, 2)
+      
+      Items can be deleted and the cache cleared, which resets the counters::
+      
+          >>> cache.delete('a')
+          >>> cache.delete('a')
+          >>> 'a' in cache
+          False
+          >>> cache.clear()
+          >>> len(cache), cache.hits, cache.misses
+          (0, 0, 0)
+      
+      A ``max_size`` of ``0`` disables the cache::
+      
+          >>> cache = LRUCache(max_size=0)
+          >>> cache.set('a', 1)
+          >>> cache.get('a') is None
+          True
+      
+    """
+    
+    def __init__(self, max_size=1000):
+        if max_size < 0:
+            raise ValueError(u'`%s` must not be negative' % max_size)
+        
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._clear()
+        
+    
+    def _clear(self):
+        """ Items are stored in ``self._items`` as ``[prev, next, key, value]``
+          links in a circular, doubly linked list, with the most recently used
+          link at ``self._root[0]`` and the least recently used at 
+          ``self._root[1]``.
+        """
+        
+        self._items = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self.hits = 0
+        self.misses = 0
+        
+    
+    def _append(self, link):
+        root = self._root
+        last = root[0]
+        link[0] = last
+        link[1] = root
+        last[1] = root[0] = link
+        
+    
+    def _unlink(self, link):
+        prev, next_ = link[0], link[1]
+        prev[1] = next_
+        next_[0] = prev
+        
+    
+    def get(self, key, default=None):
+        """ Return the value for ``key``, marking it as the most recently used,
+          or ``default``.
+        """
+        
+        self._lock.acquire()
+        try:
+            link = self._items.get(key)
+            if link is None:
+                self.misses += 1
+                return default
+            self._unlink(link)
+            self._append(link)
+            self.hits += 1
+            return link[3]
+        finally:
+            self._lock.release()
+        
+    
+    def set(self, key, value):
+        """ Store ``value`` against ``key``, evicting the least recently used
+          item if the cache is full.
+        """
+        
+        if not self.max_size:
+            return
+        
+        self._lock.acquire()
+        try:
+            link = self._items.get(key)
+            if link is not None:
+                self._unlink(link)
+                link[3] = value
+            else:
+                if len(self._items) >= self.max_size:
+                    oldest = self._root[1]
+                    self._unlink(oldest)
+                    del self._items[oldest[2]]
+                link = [None, None, key, value]
+                self._items[key] = link
+            self._append(link)
+        finally:
+            self._lock.release()
+        
+    
+    def delete(self, key):
+        """ Remove ``key`` from the cache, if present.
+        """
+        
+        self._lock.acquire()
+        try:
+            link = self._items.pop(key, None)
+            if link is not None:
+                self._unlink(link)
+        finally:
+            self._lock.release()
+        
+    
+    def clear(self):
+        """ Remove all items and reset the counters.
+        """
+        
+        self._lock.acquire()
+        try:
+            self._clear()
+        finally:
+            self._lock.release()
+        
+    
+    def __contains__(self, key):
+        return key in self._items
+        
+    
+    def __len__(self):
+        return len(self._items)
+        
+    
+    
+
@@ -13,18 +13,49 @@
   
       >>> application = WSGIApplication(settings, path_router)
   
+  :py:class:`FastPathWSGIApplication` is an opt-in alternative that resolves
+  the components which don't depend on the request once, rather than on every
+  request, and hands them to each :py:class:`~weblayer.request.BaseHandler`
+  it instantiates::
+  
+      >>> application = FastPathWSGIApplication(settings, path_router)
+  
+  :py:class:`LoadShedder` is `WSGI`_ middleware that bounds the number of 
+  requests an application handles at once, queues a limited number of
+  requests waiting (for up to ``max_wait`` seconds) for a free slot and sheds
+  any more with a ``503 Service Unavailable`` response::
+  
+      >>> application = LoadShedder(
+      ...     application, 
+      ...     max_concurrent=10, 
+      ...     max_queued=100,
+      ...     max_wait=30
+      ... )
+  
   .. _`WSGI`: http://www.python.org/dev/peps/pep-0333/
 """
 
 __all__ = [
+    'FastPathWSGIApplication',
+    'LoadShedder',
     'WSGIApplication'
 ]
 
+import logging
+import threading
+import time
+
+import webob.exc as webob_exceptions
+
 from zope.component import adapts
-from zope.interface import implements
+from zope.interface import implementedBy, implements, providedBy
 
 from base import Request, Response
-from interfaces import IPathRouter, ISettings, IWSGIApplication
+from component import registry
+from interfaces import IAuthenticationManager, IMethodSelector, IPathRouter
+from interfaces import IResponseNormaliser, ISecureCookieWrapper, ISettings
+from interfaces import IStaticURLGenerator, ITemplateRenderer, IWSGIApplication
+from request import BaseHandler
 
 class WSGIApplication(object):
     
@@ -97,7 +128,7 @@ class WSGIApplication(object):
         
         handler_class, args, kwargs = self._path_router.match(request.path)
         if handler_class is not None:
-            handler = handler_class(request, response, self._settings)
+            handler = self._make_handler(handler_class, request, response)
             try: # handler *should* catch all exceptions
                 response = handler(environ['REQUEST_METHOD'], *args, **kwargs)
             except Exception: # unless deliberately bubbling them up
@@ -111,5 +142,294 @@ class WSGIApplication(object):
         return response(environ, start_response)
         
     
+    def _make_handler(self, handler_class, request, response):
+        """ Instantiate ``handler_class``.
+        """
+        
+        return handler_class(request, response, self._settings)
+        
+    
+    
+
+class FastPathWSGIApplication(WSGIApplication):
+    """ :py:class:`WSGIApplication` that looks up the components request 
+      handlers use once per request handler class and passes them to the
+      handler, rather than having each request look them up:
+      
+      * the :py:class:`~weblayer.interfaces.ITemplateRenderer`, which only
+        depends on the settings, is instantiated once and shared
+      * the adapter factories for the method selector (which works out
+        the exposed methods once per request handler class), response 
+        normaliser, static url generator, authentication manager and
+        secure cookie wrapper are resolved up front
+      
+      .. note::
+      
+          Components are looked up the first time each request handler class
+          handles a request, so components registered after that aren't 
+          used.  Request handlers that don't subclass 
+          :py:class:`~weblayer.request.BaseHandler` are instantiated as 
+          normal.
+      
+    """
+    
+    def __init__(self, settings, path_router, **kwargs):
+        """ Calls :py:meth:`WSGIApplication.__init__` and sets up an empty
+          cache of handler keyword arguments::
+          
+              >>> app = FastPathWSGIApplication({}, None)
+              >>> app._handler_kwargs
+              {}
+          
+        """
+        
+        WSGIApplication.__init__(self, settings, path_router, **kwargs)
+        self._handler_kwargs = {}
+        
+    
+    def _get_handler_kwargs(self, handler_class):
+        """ Returns the keyword arguments to instantiate ``handler_class``
+          with, working them out the first time ``handler_class`` is used.
+        """
+        
+        try:
+            return self._handler_kwargs[handler_class]
+        except KeyError:
+            pass
+        
+        handler_kwargs = {}
+        if isinstance(handler_class, type) and \
+                issubclass(handler_class, BaseHandler):
+            adapters = registry.adapters
+            request = implementedBy(self._Request)
+            response = implementedBy(self._Response)
+            settings = providedBy(self._settings)
+            
+            template_renderer = registry.queryAdapter(
+                self._settings, 
+                ITemplateRenderer
+            )
+            if template_renderer is not None:
+                handler_kwargs['template_renderer_adapter'] = \
+                    lambda settings: template_renderer
+            
+            factories = (
+                (
+                    'method_selector_adapter', 
+                    (implementedBy(handler_class),), 
+                    IMethodSelector
+                ), (
+                    'response_normaliser_adapter', 
+                    (response,), 
+                    IResponseNormaliser
+                ), (
+                    'static_url_generator_adapter', 
+                    (request, settings), 
+                    IStaticURLGenerator
+                ), (
+                    'authentication_manager_adapter', 
+                    (request,), 
+                    IAuthenticationManager
+                ), (
+                    'secure_cookie_wrapper_adapter', 
+                    (request, response, settings), 
+                    ISecureCookieWrapper
+                )
+            )
+            for name, required, interface in factories:
+                factory = adapters.lookup(required, interface)
+                if factory is not None:
+                    handler_kwargs[name] = factory
+        
+        self._handler_kwargs[handler_class] = handler_kwargs
+        return handler_kwargs
+        
+    
+    def _make_handler(self, handler_class, request, response):
+        """ Instantiate ``handler_class``, passing in the pre-resolved 
+          components.
+        """
+        
+        handler_kwargs = self._get_handler_kwargs(handler_class)
+        return handler_class(request, response, self._settings, **handler_kwargs)
+        
+    
+    
+
+class _ReleasingIterable(object):
+    """ Wraps the ``app_iter`` returned by a `WSGI`_ application and calls
+      ``release`` once, when the ``app_iter`` is exhausted, closed or raises
+      an error::
+      
+          >>> from mock import Mock
+          >>> release = Mock()
+          >>> app_iter = _ReleasingIterable(['a', 'b'], release)
+          >>> app_iter.next()
+          'a'
+          >>> release.called
+          False
+          >>> list(app_iter)
+          ['b']
+          >>> release.call_count
+          1
+          >>> app_iter.close()
+          >>> release.call_count
+          1
+      
+      Closing the ``app_iter`` before it's exhausted also closes the wrapped
+      ``app_iter``::
+      
+          >>> release = Mock()
+          >>> wrapped = Mock()
+          >>> app_iter = _ReleasingIterable(wrapped, release)
+          >>> app_iter.close()
+          >>> wrapped.close.called and release.called
+          True
+      
+    """
+    
+    def __init__(self, app_iter, release):
+        self._app_iter = app_iter
+        self._iterator = None
+        self._release = release
+        
+    
+    def __iter__(self):
+        return self
+        
+    
+    def next(self):
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._app_iter)
+            return self._iterator.next()
+        except:
+            self._done()
+            raise
+        
+    
+    def close(self):
+        try:
+            close = getattr(self._app_iter, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._done()
+        
+    
+    def _done(self):
+        release = self._release
+        self._release = None
+        if release is not None:
+            release()
+        
+    
+    
+
+class LoadShedder(object):
+    """ `WSGI`_ middleware that runs at most ``max_concurrent`` requests
+      through ``application`` at once.  Up to ``max_queued`` more requests wait
+      up to ``max_wait`` seconds for a free slot.  Beyond that, requests are 
+      shed with a ``503 Service Unavailable`` response, so a worker that's
+      already saturated fails fast rather than building up an unbounded 
+      backlog.
+      
+      A slot is held until the response body has been sent, i.e.: until the
+      ``app_iter`` returned by ``application`` is exhausted or closed, so
+      streamed responses and slow clients count against ``max_concurrent``.
+    """
+    
+    def __init__(
+            self, 
+            application, 
+            max_concurrent=10, 
+            max_queued=100, 
+            max_wait=30,
+            retry_after=None
+        ):
+        """ ``retry_after``, if provided, is sent as the ``Retry-After`` 
+          header of shed responses.
+        """
+        
+        self._application = application
+        self._max_concurrent = max_concurrent
+        self._max_queued = max_queued
+        self._max_wait = max_wait
+        self._active = 0
+        self._queued = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._retry_after = retry_after
+        
+    
+    def _acquire(self):
+        """ Returns ``True`` once the caller has taken a slot, or ``False`` if
+          the queue is full or no slot is freed within ``self._max_wait``
+          seconds.
+        """
+        
+        self._condition.acquire()
+        try:
+            if self._active < self._max_concurrent:
+                self._active += 1
+                return True
+            if self._queued >= self._max_queued:
+                return False
+            self._queued += 1
+            try:
+                deadline = time.time() + self._max_wait
+                while self._active >= self._max_concurrent:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self._active += 1
+                return True
+            finally:
+                self._queued -= 1
+        finally:
+            self._condition.release()
+        
+    
+    def _release(self):
+        """ Free a slot and wake up a request waiting for one.
+        """
+        
+        self._condition.acquire()
+        try:
+            self._active -= 1
+            self._condition.notify()
+        finally:
+            self._condition.release()
+        
+    
+    def shed(self, environ, start_response):
+        """ Log a warning and return a ``503 Service Unavailable`` response.
+        """
+        
+        logging.warning(u'Shedding request for %s' % environ.get('PATH_INFO'))
+        headers = []
+        if self._retry_after is not None:
+            headers.append(('Retry-After', str(self._retry_after)))
+        exc = webob_exceptions.HTTPServiceUnavailable(headers=headers)
+        return exc(environ, start_response)
+        
+    
+    def __call__(self, environ, start_response):
+        """ Call ``self._application`` once a slot is free, or 
+          :py:meth:`shed` the request if there isn't one in time.  The slot is
+          freed when the returned ``app_iter`` is exhausted or closed.
+        """
+        
+        if not self._acquire():
+            return self.shed(environ, start_response)
+        
+        try:
+            app_iter = self._application(environ, start_response)
+        except:
+            self._release()
+            raise
+        return _ReleasingIterable(app_iter, self._release)
+        
+    
     
 